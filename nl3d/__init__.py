@@ -15,4 +15,6 @@ from nl3d.nlgraph import NlGraph
 from nl3d.nlsolver import solve_nlink
 from nl3d.nlcnfencoder import NlCnfEncoder
 from nl3d.nlsolution import NlSolution
+from nl3d.nlbinaryio import NlBinaryIO
+from nl3d.nlcorpusreader import NlCorpusReader
 #from nl3d.gui import gui
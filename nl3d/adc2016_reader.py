@@ -7,11 +7,31 @@
 # Copyright (C) 2017 Yusuke Matsunaga
 # All rights reserved.
 
+import mmap
 import re
+import warnings
 from nl3d.nlproblem import NlProblem
 from nl3d.nlsolution import NlSolution
 from nl3d.nlpoint import NlPoint
 
+try :
+    import numpy
+except ImportError :
+    # numpy がなくても動くようにしておく．
+    numpy = None
+
+## @brief 解答ファイルの値の文字列から値への辞書
+#
+# '0' 〜 '99' と '00' 〜 '09' を登録しておく．
+_VAL_DICT = {'{:02d}'.format(val): val for val in range(0, 100)}
+_VAL_DICT.update({str(val): val for val in range(0, 10)})
+
+## @brief 解答ファイルの値の最小値(NlSolution は int16 で値を保持する)
+_VAL_MIN = -32768
+
+## @brief 解答ファイルの値の最大値
+_VAL_MAX = 32767
+
 ## @brief 3D版(ADC2016)のファイルを読み込むためのパーサークラス
 #
 # @code
@@ -29,6 +49,13 @@ from nl3d.nlpoint import NlPoint
 # @endcode
 #
 # という風に用いる．
+# ファイルオブジェクトの代わりに文字列や bytes，mmap を渡すこともできる．
+# read_problem_file(), read_solution_file() はファイル名を受け取り，
+# mmap した領域から直接文字列に変換して読み込む．
+#
+# 読み込みはファイル全体を一度に読んでから1行ずつ処理する．
+# 各行は先頭のキーワードで種類を判別して対応する関数でのみ処理する．
+# 解答ファイルの各層の値はまとめて変換する．
 class ADC2016_Reader :
 
     ## @brief 初期化
@@ -73,16 +100,11 @@ class ADC2016_Reader :
         # そのビアを定義している行番号を入れる．
         self._via_dict = dict()
 
-        # 基本的には1行づつ読み込んで処理していく．
-        while True :
-            # 1行を読み出し末尾の改行を取る．
-            # ほぼ定石のコード
-            line = fin.readline()
-            self._cur_lineno += 1
-            if line == '' :
-                # EOF
-                break
+        # 基本的には1行づつ処理していく．
+        for lineno, line in enumerate(self._read_lines(fin), 1) :
+            self._cur_lineno = lineno
 
+            # 末尾の改行と空白を取る．
             line = line.rstrip()
             if line == '' :
                 # 空行を読み飛ばす．
@@ -90,22 +112,26 @@ class ADC2016_Reader :
 
             self._cur_line = line
 
-            # SIZE 行の処理
-            if self.read_SIZE() :
-                self._problem.set_size(self._width, self._height, self._depth)
-                continue;
-
-            # LINE_NUM 行の処理
-            if self.read_LINE_NUM() :
-                continue
-
-            # LINE# 行の処理
-            if self.read_LINE() :
-                continue
-
-            # VIA# 行の処理
-            if self.read_VIA() :
-                continue
+            # 先頭のキーワードで行の種類を判別する．
+            key = line[:4].upper()
+            if key == 'SIZE' :
+                # SIZE 行の処理
+                if self.read_SIZE() :
+                    self._problem.set_size(self._width, self._height, self._depth)
+                    continue
+            elif key == 'LINE' :
+                if line[4:5] == '_' :
+                    # LINE_NUM 行の処理
+                    if self.read_LINE_NUM() :
+                        continue
+                else :
+                    # LINE# 行の処理
+                    if self.read_LINE() :
+                        continue
+            elif key == 'VIA#' :
+                # VIA# 行の処理
+                if self.read_VIA() :
+                    continue
 
             # それ以外はエラー
             self.error('syntax error')
@@ -132,16 +158,15 @@ class ADC2016_Reader :
         self._cur_y = 0
         self._cur_z = 0
 
-        # 基本的には1行づつ読み込んで処理していく．
-        while True :
-            # 1行を読み出し末尾の改行を取る．
-            # ほぼ定石のコード
-            line = fin.readline()
-            self._cur_lineno += 1
-            if line == '' :
-                # EOF
-                break
+        # 基本的には1行づつ処理していく．
+        line_list = self._read_lines(fin)
+        pos = 0
+        while pos < len(line_list) :
+            line = line_list[pos]
+            pos += 1
+            self._cur_lineno = pos
 
+            # 末尾の改行と空白を取る．
             line = line.rstrip()
             if line == '' :
                 # 空行を読み飛ばす．
@@ -149,14 +174,21 @@ class ADC2016_Reader :
 
             self._cur_line = line
 
+            # 先頭のキーワードで行の種類を判別する．
+            key = line[:4].upper()
+
             # SIZE 行の処理
-            if self.read_SIZE() :
+            if key == 'SIZE' and self.read_SIZE() :
                 self._solution.set_size(self._width, self._height, self._depth)
                 self._cur_y = self._height
-                continue;
+                continue
 
             # LAYER 行の処理
-            if self.read_LAYER() :
+            nerr = self._nerr
+            if key == 'LAYE' and self.read_LAYER() :
+                if self._nerr == nerr and self._read_layer(line_list[pos:pos + self._height]) :
+                    # 1層分をまとめて読み込んだ．
+                    pos += self._height
                 continue
 
             # それ以外
@@ -171,9 +203,11 @@ class ADC2016_Reader :
             if n != self._width :
                 self.error('# of elements mismatch')
                 continue
-            for x in range(0, self._width) :
-                val = int(val_list[x])
-                self._solution.set_val(x, self._cur_y, self._cur_z, val)
+            val_list = [int(val) for val in val_list]
+            if min(val_list) < _VAL_MIN or max(val_list) > _VAL_MAX :
+                self.error('value out of range')
+                continue
+            self._solution.set_row(self._cur_y, self._cur_z, val_list)
             self._cur_y += 1
             if self._cur_y == self._height :
                 self._cur_z += 1
@@ -185,6 +219,116 @@ class ADC2016_Reader :
             return None
 
 
+    ## @brief 問題ファイルを mmap を用いて読み込む．
+    # @param[in] filename ファイル名
+    # @return NlProblem を返す．
+    #
+    # 読み込んだファイルの内容に誤りがある場合には None を返す．
+    def read_problem_file(self, filename) :
+        with open(filename, 'rb') as fin :
+            with self._map_file(fin) as data :
+                return self.read_problem(data)
+
+
+    ## @brief 解答ファイルを mmap を用いて読み込む．
+    # @param[in] filename ファイル名
+    # @return NlSolution を返す．
+    #
+    # 読み込んだファイルの内容に誤りがある場合には None を返す．
+    def read_solution_file(self, filename) :
+        with open(filename, 'rb') as fin :
+            with self._map_file(fin) as data :
+                return self.read_solution(data)
+
+
+    ## @brief ファイルを mmap する．
+    # @param[in] fin ファイルオブジェクト(バイナリモード)
+    # @return mmap を返す．
+    #
+    # 空のファイルは mmap できないので空の memoryview を返す．
+    # どちらも with 文で用いることができる．
+    def _map_file(self, fin) :
+        try :
+            return mmap.mmap(fin.fileno(), 0, access = mmap.ACCESS_READ)
+        except ValueError :
+            return memoryview(b'')
+
+
+    ## @brief 入力全体を行のリストにする．
+    # @param[in] fin ファイルオブジェクト，文字列，bytes もしくは mmap
+    #
+    # 各行の末尾の改行は含まない．
+    # bytes や mmap はコピーせずにそのまま文字列に変換する．
+    def _read_lines(self, fin) :
+        if isinstance(fin, (str, bytes, bytearray, memoryview, mmap.mmap)) :
+            data = fin
+        else :
+            data = fin.read()
+        if not isinstance(data, str) :
+            data = str(data, 'utf-8')
+        return data.split('\n')
+
+
+    ## @brief 1層分の行をまとめて読み込む．
+    # @param[in] line_list 1層分の行のリスト
+    # @retval True 読み込んだ．
+    # @retval False 読み込まなかった．
+    #
+    # 行の数や要素の数が合わない場合，数値でない要素(空白だけの要素も含む)が
+    # ある場合や値が範囲外の場合は何もせずに False を返す．
+    # その場合は1行ずつ処理してエラーの報告を行う．
+    def _read_layer(self, line_list) :
+        width = self._width
+        height = self._height
+        if len(line_list) != height or self._cur_z >= self._depth :
+            return False
+        for line in line_list :
+            if line.count(',') != width - 1 or line.strip() == '' :
+                return False
+
+        text = ','.join(line_list)
+        if numpy is not None :
+            with warnings.catch_warnings() :
+                # 変換できない要素がある場合の警告は無視する．
+                # 警告ではなく ValueError となる場合もある．
+                warnings.simplefilter('ignore')
+                try :
+                    val_array = numpy.fromstring(text, dtype = numpy.int64, sep = ',')
+                except ValueError :
+                    return False
+            if len(val_array) != width * height :
+                return False
+            # fromstring() は空白や符号だけの要素や '+ 3' のような要素も
+            # 受け付けてしまうので，数字の並びの数が要素数と一致することと
+            # 符号の直後が数字であることを確かめる．
+            # 1つの要素に数字の並びが2つある場合は上で ValueError になっている．
+            code_array = numpy.frombuffer(text.encode('utf-8'), dtype = numpy.uint8)
+            is_digit = (code_array >= 0x30) & (code_array <= 0x39)
+            run_num = int(is_digit[0]) + numpy.count_nonzero(is_digit[1:] & ~is_digit[:-1])
+            if run_num != width * height :
+                return False
+            is_sign = (code_array == 0x2b) | (code_array == 0x2d)
+            if is_sign[-1] or numpy.any(is_sign[:-1] & ~is_digit[1:]) :
+                return False
+            if val_array.min() < _VAL_MIN or val_array.max() > _VAL_MAX :
+                return False
+        else :
+            # よく現れる表記は表を引いて変換する．
+            val_array = list(map(_VAL_DICT.get, text.split(',')))
+            if None in val_array :
+                try :
+                    val_array = [int(val) for val in text.split(',')]
+                except ValueError :
+                    return False
+                if min(val_array) < _VAL_MIN or max(val_array) > _VAL_MAX :
+                    return False
+
+        self._solution.set_layer(self._cur_z, val_array)
+        self._cur_y = height
+        self._cur_z += 1
+        return True
+
+
     ## @brief SIZE行の処理を行う．
     # @retval True SIZE行だった．
     # @retval False SIZE行ではなかった．
@@ -319,6 +463,7 @@ class ADC2016_Reader :
     # - 座標または層番号が範囲外だった．
     # - 層ごとのX座標またはY座標が異なっている．
     # - 層番号が連続していない．(順不同)
+    # - 1つの層にしかない．
     #
     # 返り値の真偽はエラーの有無とは関係ない．
     def read_VIA(self) :
@@ -377,6 +522,11 @@ class ADC2016_Reader :
             self.error('Some layers are missing')
             return True
 
+        if z1 == z2 :
+            # ビアは2つ以上の層にまたがっていなければならない．
+            self.error('VIA#{} has only one layer'.format(via_label))
+            return True
+
         self._problem.add_via(via_label, x0, y0, z1, z2)
         return True
 
@@ -0,0 +1,315 @@
+#! /usr/bin/env python3
+
+## @file nlbinaryio.py
+# @brief NlBinaryIO の定義ファイル
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+
+import mmap
+import struct
+import sys
+from array import array
+from nl3d.nlproblem import NlProblem
+from nl3d.nlsolution import NlSolution
+from nl3d.nlpoint import NlPoint
+from nl3d.adc2016_reader import ADC2016_Reader
+
+try :
+    import numpy
+except ImportError :
+    # numpy がなくても動くようにしておく．
+    numpy = None
+
+
+## @brief ファイルの先頭の識別子
+MAGIC = b'NL3D'
+
+## @brief フォーマットのバージョン
+VERSION = 1
+
+## @brief 問題を表す種類番号
+KIND_PROBLEM = 1
+
+## @brief 解を表す種類番号
+KIND_SOLUTION = 2
+
+# 共通のヘッダ: 識別子，バージョン，種類，幅，高さ，層数，予備
+_HEADER = struct.Struct('<4sHHHHHH')
+# 問題のヘッダ: 線分数，ビア数，ビアのラベルの表の大きさ，予備
+_PROBLEM_HEADER = struct.Struct('<IIII')
+# 線分: ラベル，始点の x, y, z，終点の x, y, z
+_NET_RECORD = struct.Struct('<i6H')
+# ビア: x, y, z1, z2
+_VIA_RECORD = struct.Struct('<4H')
+
+
+## @brief 問題と解をバイナリ形式で読み書きするクラス
+#
+# ファイルの内容は以下の通り(数値はすべてリトルエンディアン)
+# - 共通のヘッダ(16バイト)
+#   識別子 'NL3D'，バージョン(uint16)，種類(uint16)，
+#   幅，高さ，層数(uint16)，予備(uint16)
+# - 問題の場合
+#   - 線分数，ビア数，ビアのラベルの表のバイト数，予備(uint32 x 4)
+#   - 線分ごとにラベル(int32)と始点，終点の座標(uint16 x 6)
+#   - ビアごとに x, y, z1, z2 (uint16 x 4)
+#   - ビアのラベルを '\0' で区切って並べた UTF-8 の文字列
+# - 解の場合
+#   - 各マス目の値(int16)を NlGraph の節点の ID番号順に並べたもの
+#
+# 層番号は 0 から始まる値をそのまま書く．
+# 解のマス目の値は numpy がある場合は mmap の領域をコピーせずに参照する．
+#
+# @code
+# bio = NlBinaryIO()
+# with open('problem.bin', 'wb') as fout :
+#     bio.write_problem(problem, fout)
+# problem = bio.read_problem_file('problem.bin')
+# @endcode
+#
+# 読み込んだ内容に誤りがある場合はメッセージを出力して None を返す．
+class NlBinaryIO :
+
+    ## @brief 問題を書き出す．
+    # @param[in] problem 問題(NlProblem)
+    # @param[in] fout 出力先のファイルオブジェクト(バイナリモード)
+    def write_problem(self, problem, fout) :
+        label_data = '\0'.join(str(via.label) for via in problem.via_list()).encode('utf-8')
+        chunk_list = [_HEADER.pack(MAGIC, VERSION, KIND_PROBLEM,
+                                   problem.width, problem.height, problem.depth, 0),
+                      _PROBLEM_HEADER.pack(problem.net_num, problem.via_num, len(label_data), 0)]
+        for label, s, e in problem.net_list() :
+            chunk_list.append(_NET_RECORD.pack(label, s.x, s.y, s.z, e.x, e.y, e.z))
+        for via in problem.via_list() :
+            chunk_list.append(_VIA_RECORD.pack(via.x, via.y, via.z1, via.z2))
+        chunk_list.append(label_data)
+        fout.write(b''.join(chunk_list))
+
+
+    ## @brief 解を書き出す．
+    # @param[in] solution 解(NlSolution)
+    # @param[in] fout 出力先のファイルオブジェクト(バイナリモード)
+    def write_solution(self, solution, fout) :
+        fout.write(_HEADER.pack(MAGIC, VERSION, KIND_SOLUTION,
+                                solution.width, solution.height, solution.depth, 0))
+        grid = solution.node_array()
+        if numpy is not None :
+            fout.write(grid.astype('<i2').tobytes())
+        else :
+            if sys.byteorder == 'big' :
+                grid.byteswap()
+            fout.write(grid.tobytes())
+
+
+    ## @brief 問題を読み込む．
+    # @param[in] data bytes，mmap もしくはファイルオブジェクト(バイナリモード)
+    # @return NlProblem を返す．
+    def read_problem(self, data) :
+        data = self._get_buffer(data)
+        header = self._read_header(data, KIND_PROBLEM)
+        if header is None :
+            return None
+        width, height, depth = header
+
+        pos = _HEADER.size
+        if len(data) < pos + _PROBLEM_HEADER.size :
+            return self._error('truncated problem header')
+        net_num, via_num, label_size, _ = _PROBLEM_HEADER.unpack_from(data, pos)
+        pos += _PROBLEM_HEADER.size
+        net_end = pos + net_num * _NET_RECORD.size
+        via_end = net_end + via_num * _VIA_RECORD.size
+        if len(data) < via_end + label_size :
+            return self._error('truncated problem data')
+
+        net_list = list(_NET_RECORD.iter_unpack(data[pos:net_end]))
+        via_list = list(_VIA_RECORD.iter_unpack(data[net_end:via_end]))
+        label_list = bytes(data[via_end:via_end + label_size]).decode('utf-8').split('\0')
+        if via_num == 0 :
+            label_list = []
+        if len(label_list) != via_num :
+            return self._error('{} via labels, {} expected'.format(len(label_list), via_num))
+
+        # ADC2016_Reader と同様にラベルの重複と座標の範囲を調べる．
+        label_set = set()
+        for label, x1, y1, z1, x2, y2, z2 in net_list :
+            if not 1 <= label <= net_num :
+                return self._error('LINE#{} is out of range'.format(label))
+            if label in label_set :
+                return self._error('Duplicated LINE#{}'.format(label))
+            label_set.add(label)
+            if not self._check_range(x1, y1, z1, width, height, depth) or \
+               not self._check_range(x2, y2, z2, width, height, depth) :
+                return self._error('LINE#{} is out of range'.format(label))
+        if len(set(label_list)) != len(label_list) :
+            return self._error('Duplicated VIA label')
+        for label, (x, y, z1, z2) in zip(label_list, via_list) :
+            if not self._check_range(x, y, z1, width, height, depth) or \
+               not self._check_range(x, y, z2, width, height, depth) :
+                return self._error('VIA#{} is out of range'.format(label))
+            if z1 > z2 :
+                return self._error('VIA#{}: Z1({}) is greater than Z2({})'.format(label, z1, z2))
+            if z1 == z2 :
+                # ADC2016_Reader と同じくビアは2つ以上の層にまたがっていなければならない．
+                return self._error('VIA#{} has only one layer'.format(label))
+
+        problem = NlProblem()
+        problem.set_size(width, height, depth)
+        for label, x1, y1, z1, x2, y2, z2 in net_list :
+            problem.add_net(label, NlPoint(x1, y1, z1), NlPoint(x2, y2, z2))
+        for label, (x, y, z1, z2) in zip(label_list, via_list) :
+            problem.add_via(label, x, y, z1, z2)
+        return problem
+
+
+    ## @brief 解を読み込む．
+    # @param[in] data bytes，mmap もしくはファイルオブジェクト(バイナリモード)
+    # @return NlSolution を返す．
+    #
+    # numpy がある場合はマス目の値は data を直接参照する．
+    # data が書き込めない場合(bytes など)は解も書き換えられない．
+    def read_solution(self, data) :
+        data = self._get_buffer(data)
+        header = self._read_header(data, KIND_SOLUTION)
+        if header is None :
+            return None
+        width, height, depth = header
+
+        n = width * height * depth
+        if len(data) < _HEADER.size + n * 2 :
+            return self._error('truncated solution data')
+
+        if numpy is not None :
+            grid = numpy.frombuffer(data, dtype = '<i2', count = n, offset = _HEADER.size)
+            if grid.dtype != numpy.int16 :
+                # ビッグエンディアンの場合は変換が必要
+                grid = grid.astype(numpy.int16)
+            grid = grid.reshape(width, height, depth)
+        else :
+            grid = array('h')
+            grid.frombytes(data[_HEADER.size:_HEADER.size + n * 2])
+            if sys.byteorder == 'big' :
+                grid.byteswap()
+        solution = NlSolution()
+        solution.set_grid_array(width, height, depth, grid)
+        return solution
+
+
+    ## @brief 問題ファイルを mmap を用いて読み込む．
+    # @param[in] filename ファイル名
+    # @return NlProblem を返す．
+    def read_problem_file(self, filename) :
+        return self.read_problem(self._map_file(filename))
+
+
+    ## @brief 解ファイルを mmap を用いて読み込む．
+    # @param[in] filename ファイル名
+    # @return NlSolution を返す．
+    #
+    # マス目の値はファイルの mmap を参照するが，
+    # 書き換えてもファイルには反映されない．
+    def read_solution_file(self, filename) :
+        return self.read_solution(self._map_file(filename))
+
+
+    ## @brief ADC2016 フォーマットのファイルをバイナリ形式に変換する．
+    # @param[in] src_filename ADC2016 フォーマットのファイル名
+    # @param[in] dst_filename バイナリ形式のファイル名
+    # @retval True 変換した．
+    # @retval False 読み込みに失敗した．
+    #
+    # 問題か解かは 'LINE_NUM' 行があるかどうかで判断する．
+    # 読み込みは ADC2016_Reader で行う．
+    def adc2016_to_binary(self, src_filename, dst_filename) :
+        reader = ADC2016_Reader()
+        with open(src_filename, 'rb') as fin :
+            text = fin.read().decode('utf-8')
+        if 'LINE_NUM' in text.upper() :
+            obj = reader.read_problem(text)
+            write = self.write_problem
+        else :
+            obj = reader.read_solution(text)
+            write = self.write_solution
+        if obj is None :
+            return False
+        with open(dst_filename, 'wb') as fout :
+            write(obj, fout)
+        return True
+
+
+    ## @brief バイナリ形式のファイルを ADC2016 フォーマットに変換する．
+    # @param[in] src_filename バイナリ形式のファイル名
+    # @param[in] dst_filename ADC2016 フォーマットのファイル名
+    # @retval True 変換した．
+    # @retval False 読み込みに失敗した．
+    #
+    # 出力は NlProblem.print() もしくは NlSolution.print() で行う．
+    def binary_to_adc2016(self, src_filename, dst_filename) :
+        data = self._map_file(src_filename)
+        if len(data) >= _HEADER.size and _HEADER.unpack_from(data)[2] == KIND_PROBLEM :
+            obj = self.read_problem(data)
+        else :
+            obj = self.read_solution(data)
+        if obj is None :
+            return False
+        with open(dst_filename, 'wt') as fout :
+            obj.print(fout)
+        return True
+
+
+    ## @brief 共通のヘッダを読み込む．
+    # @param[in] data 内容
+    # @param[in] kind 期待する種類番号
+    # @return (幅, 高さ, 層数) のタプルを返す．
+    #
+    # エラーの場合は None を返す．
+    def _read_header(self, data, kind) :
+        if len(data) < _HEADER.size :
+            return self._error('truncated header')
+        magic, version, kind1, width, height, depth, _ = _HEADER.unpack_from(data)
+        if magic != MAGIC :
+            return self._error('not a nl3d binary file')
+        if version != VERSION :
+            return self._error('unsupported version {}'.format(version))
+        if kind1 != kind :
+            return self._error('unexpected kind {}, {} expected'.format(kind1, kind))
+        return width, height, depth
+
+
+    ## @brief (x, y, z) が範囲内にあるか調べる．
+    # @param[in] x, y, z 座標
+    # @param[in] width, height, depth サイズ
+    def _check_range(self, x, y, z, width, height, depth) :
+        return 0 <= x < width and 0 <= y < height and 0 <= z < depth
+
+
+    ## @brief 読み込む内容をバッファの形にする．
+    # @param[in] data bytes，mmap もしくはファイルオブジェクト
+    def _get_buffer(self, data) :
+        if isinstance(data, (bytes, bytearray, memoryview, mmap.mmap)) :
+            return data
+        return data.read()
+
+
+    ## @brief ファイルを mmap する．
+    # @param[in] filename ファイル名
+    #
+    # mmap は返り値から参照されている間は閉じない．
+    # 書き換えがファイルに反映されないように ACCESS_COPY を用いる．
+    def _map_file(self, filename) :
+        with open(filename, 'rb') as fin :
+            try :
+                return mmap.mmap(fin.fileno(), 0, access = mmap.ACCESS_COPY)
+            except ValueError :
+                # 空のファイルは mmap できない．
+                return b''
+
+
+    ## @brief エラー処理
+    # @param[in] msg エラーメッセージ
+    #
+    # メッセージを出力して None を返す．
+    def _error(self, msg) :
+        print('Error: {}'.format(msg))
+        return None
@@ -7,11 +7,34 @@
 # Copyright (C) 2017 Yusuke Matsunaga
 # All rights reserved.
 
+import bisect
 import math
 from nl3d.nlgraph import NlNode, NlEdge, NlGraph
+from nl3d.nlgraph import DIR_RIGHT, DIR_LOWER
 from nl3d.nlsolution import NlSolution
 from nl3d.sat.satsolver import SatSolver
-from nl3d.sat.satbool3 import SatBool3
+from nl3d.sat.satmodel import SatModel
+from nl3d.sat.clausefolder import ClauseFolder
+from nl3d.sat import cardinality
+
+try :
+    import numpy
+except ImportError :
+    # numpy がなくても動くようにしておく．
+    numpy = None
+
+## @brief ラベルの値の範囲の制約の節の数の上限(ラベルのビット数に対する倍率)
+_DOMAIN_CLAUSE_FACTOR = 2
+
+## @brief ラベルの符号化方法のリスト
+#
+# - binary: ラベルの値を log2(nn + 1) 個の変数の2進数で表す．
+# - onehot: 線分ごとに変数を作り，1つだけが真となる制約を加える．
+# - order: i 番目の変数でラベルの値が i + 1 以上であることを表す．
+# - net_edge: onehot に加えて枝ごとに通る線分を表す変数を作る．
+# net_num を nn とすると binary 以外は節点ごとに nn 個の変数を用いる．
+LABEL_ENCODING_LIST = ('binary', 'onehot', 'order', 'net_edge')
+
 
 ## @brief 問題を表すCNF式を生成するクラス
 #
@@ -21,56 +44,185 @@ class NlCnfEncoder :
     ## @brief 初期化
     # @param[in] graph 問題を表すグラフ
     # @param[in] solver SATソルバ
+    # @param[in] card_encoding 要素数の多い one-hot 制約の符号化方法
+    # @param[in] prune_domain 到達可能性を用いて変数を減らす時 True にする．
+    # @param[in] label_encoding 節点のラベルの符号化方法
     #
     # ここではSATの変数の割当のみ行う．
-    def __init__(self, graph, solver) :
+    # card_encoding については nl3d.sat.cardinality を参照のこと．
+    # 'auto' の場合は要素数に応じて選ぶ．
+    # label_encoding については LABEL_ENCODING_LIST を参照のこと．
+    #
+    # prune_domain が True の場合は NlGraph.node_net_list() を用いて
+    # - 両端を通りうる線分に共通のものがない枝
+    # - 通りうる線分が1つ以下の節点のラベル
+    # に対しては変数を作らず，値が偽に決まった変数(_false_var)
+    # もしくはその否定を割り当てる．
+    # 通りうる線分が2つ以上ある節点のラベルには
+    # make_base_constraint() でそれ以外の値をとらない制約を加える．
+    def __init__(self, graph, solver, card_encoding = 'auto', prune_domain = False,
+                 label_encoding = 'binary') :
+        if label_encoding not in LABEL_ENCODING_LIST :
+            raise ValueError('{}: unknown label encoding'.format(label_encoding))
         self._graph = graph
         self._solver = solver
+        self._card_encoding = card_encoding
+        self._label_encoding = label_encoding
+        # 節はすべて _folder を通して値の決まったリテラルを簡単化してから追加する．
+        self._folder = ClauseFolder(solver)
         nn = graph.net_num
-        vn = graph.via_num
+
+        # 値が偽に決まった変数
+        # prune_domain が False の時は 0 とする．
+        # _domain_list[node_id] に node_id を通りうる線分番号のリストを入れる．
+        if prune_domain :
+            self._false_var = solver.new_variable()
+            self._domain_list = [graph.node_net_list(node_id) for node_id in range(0, graph.node_num)]
+            self._domain_cube_cache = {}
+        else :
+            self._false_var = 0
+            self._domain_list = None
 
         # 枝に対応する変数を作る．
         # 結果は edge_var_list に格納する．
         # _edge_var_list[edge.id] に edge に対応する変数が入る．
-        self._edge_var_list = [solver.new_variable() for edge in graph.edge_list]
+        if prune_domain :
+            self._edge_var_list = [solver.new_variable() if self._is_usable_edge(edge_id) else self._false_var \
+                                   for edge_id in range(0, graph.edge_num)]
+        else :
+            self._edge_var_list = [solver.new_variable() for edge_id in range(0, graph.edge_num)]
 
         # 節点のラベルを表す変数のリストを作る．
-        # 節点のラベルは log2(nn + 1) 個の変数で表す(binaryエンコーディング)
+        # 変数の数と意味は label_encoding によって異なる．
+        # - binary: log2(nn + 1) 個の変数でラベルの値の各ビットを表す．
+        # - onehot, net_edge: nn 個の変数の i 番目でラベルの値が i + 1 であることを表す．
+        # - order: nn 個の変数の i 番目でラベルの値が i + 1 以上であることを表す．
         # 結果は node_vars_list に格納する．
         # _node_vars_list[node.id] に node に対応する変数のリストが入る．
-        nn_log2 = math.ceil(math.log2(nn + 1))
-        self._node_vars_list = [[solver.new_variable() for i in range(0, nn_log2)] \
-                                for node in graph.node_list]
+        # 値の決まったラベルの場合は _false_var を用いたリテラルのリストとなる．
+        # binary 以外では通りえない線分に対応する要素も _false_var を用いたリテラルとなる．
+        self._node_vars_list = [self._new_label_vars(node_id) for node_id in range(0, graph.node_num)]
 
         # ビアと線分の割り当てを表す変数を作る．
         # _nv_map[net_id][via_id] に net_id の線分を via_id のビアに接続する時 True となる変数を入れる．
-        self._nv_map = [[solver.new_variable() \
-                         for via_id in range(0, vn)] \
+        # 変数を作るのは graph.net_via_list() に含まれる組み合わせだけなので
+        # _nv_map[net_id] は via_id をキーとする辞書とする．
+        self._nv_map = [{via_id: solver.new_variable() \
+                         for via_id in graph.net_via_list(net_id)} \
                         for net_id in range(0, nn)]
 
+        # 回り道を禁止する節
+        # _detour_cache[k] に長さ k の回り道に対する節を入れる．
+        self._detour_cache = {}
+
+        # 枝の変数と両端の節点の配列(numpy)
+        # model_to_routes() で最初に必要になった時に作る．
+        self._edge_var_array = None
+        self._edge_node_array = None
+
+
+    ## @brief ビアと線分の割り当てを表す変数の数を返す．
+    #
+    # すべての組み合わせに変数を作った場合は net_num * via_num 個となる．
+    @property
+    def nv_var_num(self) :
+        return sum(len(nv_dict) for nv_dict in self._nv_map)
+
+
+    ## @brief 節を追加する時に行った簡単化の統計情報を返す．
+    #
+    # 内容は nl3d.sat.ClauseFolder.stats() を参照のこと．
+    def fold_stats(self) :
+        return self._folder.stats()
+
 
     ## @brief 基本的な制約を作る．
     # @param[in] no_slack すべてのマス目を使う制約を入れるとき True にするフラグ
     def make_base_constraint(self, no_slack) :
+        graph = self._graph
+
+        if self._domain_list is not None :
+            # 値の決まった変数の制約を作る．
+            self._folder.add_clause(-self._false_var)
+
+        # ラベルの変数の値の組み合わせに関する制約を作る．
+        for node_id in range(0, graph.node_num) :
+            self._make_label_domain_constraint(node_id)
+
         # 各節点に対して隣接する枝の条件を作る．
-        for node in self._graph.node_list :
-            self._make_edge_constraint(node, no_slack)
+        for node_id in range(0, graph.node_num) :
+            self._make_edge_constraint(node_id, no_slack)
 
         # 枝が選択された時にその両端のノードのラベルが等しくなるという制約を作る．
-        for edge in self._graph.edge_list :
-            self._make_adj_nodes_constraint(edge)
+        for edge_id in range(0, graph.edge_num) :
+            self._make_adj_nodes_constraint(edge_id)
 
         # 各ビアについてただ1つの線分が割り当てられるという制約を作る．
-        for via_id in range(0, self._graph.via_num) :
+        for via_id in range(0, graph.via_num) :
             self._make_via_net_constraint(via_id)
 
         # 各線分についてただ一つのビアが割り当てられるという制約を作る．
-        #for net_id in range(0, self._graph.net_num) :
+        #for net_id in range(0, graph.net_num) :
         #    self._make_net_via_constraint(net_id)
 
+        self._folder.flush()
+
 
 
 
+    ## @brief 条件付きで全マス使用制約を作る．
+    # @param[in] cvar 条件を表す変数
+    #
+    # make_base_constraint(False) と合わせて用いる．
+    # 終端でもビアでもない節点について cvar が真の時に少なくとも1つの枝が
+    # 選ばれるという節を作る．
+    # 0個か2個の枝が選ばれるという制約と合わせると，cvar が真の時は
+    # make_base_constraint(True) と同じく常に2個の枝が選ばれることになる．
+    # cvar を仮定で切り替えれば同じ CNF 式で両方の場合を解くことができる．
+    def make_no_slack_constraint(self, cvar) :
+        graph = self._graph
+        block = graph.block_array
+        edge_var_list = self._edge_var_list
+        clause_list = []
+        for node_id in range(0, graph.node_num) :
+            if block[node_id] :
+                continue
+            lit_list = [edge_var_list[edge_id] for edge_id in graph.node_edge_ids(node_id)]
+            lit_list.append(-cvar)
+            clause_list.append(lit_list)
+        self._folder.add_clauses(clause_list)
+        self._folder.flush()
+
+
+    ## @brief 長さ max_len までの回り道を禁止する制約を作る．
+    # @param[in] max_len 回り道の横方向の枝の数の最大値
+    #
+    # 2 x (k + 1) マスの窓(k = 1, ..., max_len)について
+    #
+    # node_00 -- edge_h1 -- ... -- edge_hk -- node_k0
+    #    |                                       |
+    # edge_v1                                 edge_v2
+    #    |                                       |
+    # node_01 -- edge_h1' -- ... -- edge_hk' -- node_k1
+    #
+    # 内側の節点(node_10 ... node_(k-1)0, node_11 ... node_(k-1)1)が
+    # すべて終端でもビアでもない時，
+    # - node_00, node_k0 が終端かビアでない限り，
+    #   edge_v1, edge_h1, ..., edge_hk, edge_v2 という経路は使えない．
+    # - node_01, node_k1 が終端かビアでない限り，
+    #   edge_v1, edge_h1', ..., edge_hk', edge_v2 という経路は使えない．
+    #
+    # これをタテ・ヨコの２方向に対して行う．
+    # k = 1, 2, 3 がそれぞれ make_ushape_constraint()，make_wshape_constraint()，
+    # make_w2shape_constraint() の制約となる．
+    # k = 2 以上の制約は反対側の行を近道として使える解があることを仮定している．
+    # max_len を大きくすると探索が絞り込まれる代わりに CNF 式が大きくなる．
+    # max_len = 0 の時は何もしない．
+    def make_detour_constraint(self, max_len) :
+        for k in range(1, max_len + 1) :
+            self._make_detour_constraint(k)
+
+
     ## @brief U字(コの字)制約を作る．
     #
     # node_00 -- edge1 -- node_10
@@ -84,43 +236,7 @@ class NlCnfEncoder :
     # edge1, edge2, edge3, edge4 の３つ以上が同時に使われる
     # 経路は存在しない．
     def make_ushape_constraint(self) :
-        # 変数名は上の図に対応している．
-        solver = self._solver
-        for node_00 in self._graph.node_list :
-            edge1 = node_00.right_edge
-            edge2 = node_00.lower_edge
-            if edge1 == None or edge2 == None :
-                continue
-
-            node_10 = edge1.alt_node(node_00)
-            assert node_10 != None
-
-            node_01 = edge2.alt_node(node_00)
-            assert node_01 != None
-
-            edge3 = node_10.lower_edge
-            assert edge3 != None
-
-            edge4 = node_01.right_edge
-            assert edge4 != None
-
-            node_11 = edge3.alt_node(node_10)
-            assert node_11 != None
-
-            var1 = self._edge_var(edge1)
-            var2 = self._edge_var(edge2)
-            var3 = self._edge_var(edge3)
-            var4 = self._edge_var(edge4)
-
-
-            if not (node_00.is_block or node_10.is_block) :
-                solver.add_clause(-var1, -var2, -var3)
-            if not (node_00.is_block or node_01.is_block) :
-                solver.add_clause(-var1, -var2, -var4)
-            if not (node_10.is_block or node_11.is_block) :
-                solver.add_clause(-var1, -var3, -var4)
-            if not (node_01.is_block or node_11.is_block) :
-                solver.add_clause(-var2, -var3, -var4)
+        self._make_detour_constraint(1)
 
 
     ## @brief 2x3マスのコの字経路を禁止する制約を作る．
@@ -140,47 +256,7 @@ class NlCnfEncoder :
     #
     # これをタテ・ヨコの２方向に対して行う．
     def make_wshape_constraint(self) :
-        solver = self._solver
-        for node_00 in self._graph.node_list :
-            # d は方向(0: ヨコ, 1: タテ)
-            for d in range(0, 2) :
-                edge_h1 = node_00.lower_edge if d else node_00.right_edge
-                if edge_h1 == None :
-                    continue
-                node_10 = edge_h1.alt_node(node_00)
-                if node_10.is_block :
-                    continue
-
-                edge_h2 = node_10.lower_edge if d else node_10.right_edge
-                if edge_h2 == None :
-                    continue
-                node_20 = edge_h2.alt_node(node_10)
-
-                edge_v1 = node_00.right_edge if d else node_00.lower_edge
-                if edge_v1 == None :
-                    continue
-                edge_v2 = node_20.right_edge if d else node_20.lower_edge
-
-                node_01 = edge_v1.alt_node(node_00)
-                node_21 = edge_v2.alt_node(node_20)
-
-                edge_h3 = node_01.lower_edge if d else node_01.right_edge
-                node_11 = edge_h3.alt_node(node_01)
-                if node_11.is_block :
-                    continue
-
-                edge_h4 = node_11.lower_edge if d else node_11.right_edge
-
-                var1 = self._edge_var(edge_v1)
-                var4 = self._edge_var(edge_v2)
-                if not (node_00.is_block or node_20.is_block) :
-                    var2 = self._edge_var(edge_h1)
-                    var3 = self._edge_var(edge_h2)
-                    solver.add_clause(-var1, -var2, -var3, -var4)
-                if not (node_01.is_block or node_21.is_block) :
-                    var2 = self._edge_var(edge_h3)
-                    var3 = self._edge_var(edge_h4)
-                    solver.add_clause(-var1, -var2, -var3, -var4)
+        self._make_detour_constraint(2)
 
 
     ## @brief 2x4マスのコの字経路を禁止する制約を作る．
@@ -200,102 +276,381 @@ class NlCnfEncoder :
     #
     # これをタテ・ヨコの２方向に対して行う．
     def make_w2shape_constraint(self) :
-        solver = self._solver
-        for node_00 in self._graph.node_list :
-            # d は方向(0: ヨコ, 1: タテ)
-            for d in range(0, 2) :
-                edge_h1 = node_00.lower_edge if d else node_00.right_edge
-                if edge_h1 == None :
-                    continue
-                node_10 = edge_h1.alt_node(node_00)
-                if node_10.is_block :
-                    continue
-
-                edge_h2 = node_10.lower_edge if d else node_10.right_edge
-                if edge_h2 == None :
-                    continue
-                node_20 = edge_h2.alt_node(node_10)
-                if node_20.is_block :
-                    continue
+        self._make_detour_constraint(3)
 
-                edge_h3 = node_20.lower_edge if d else node_20.right_edge
-                if edge_h3 == None :
-                    continue
-                node_30 = edge_h3.alt_node(node_20)
-
-                edge_v1 = node_00.right_edge if d else node_00.lower_edge
-                if edge_v1 == None :
-                    continue
-                node_01 = edge_v1.alt_node(node_00)
-
-                edge_v2 = node_30.right_edge if d else node_30.lower_edge
-
-                edge_h4 = node_01.lower_edge if d else node_01.right_edge
-                node_11 = edge_h4.alt_node(node_01)
-                if node_11.is_block :
-                    continue
-
-                edge_h5 = node_11.lower_edge if d else node_11.right_edge
-                node_21 = edge_h5.alt_node(node_11)
-                if node_21.is_block :
-                    continue
 
-                edge_h6 = node_21.lower_edge if d else node_21.right_edge
+    ## @brief SATモデルの中の孤立した閉路を禁止する節を作る．
+    # @param[in] model SatSolver.solve() の返した SatModel
+    # @return 閉路ごとにその枝の変数の否定からなる節のリストを返す．
+    #
+    # ラベルの等価性の制約だけでは終端を含まない閉路を禁止できない．
+    # 終端とビアは選ばれる枝が高々1つなので，
+    # 終端もビアも含まない連結成分が閉路となる．
+    def cycle_clauses(self, model) :
+        val = SatModel.from_model(model).raw
+        graph = self._graph
+        adj_node = graph.adj_node_array
+        adj_edge = graph.adj_edge_array
+        block = graph.block_array
+        edge_var_list = self._edge_var_list
+        mark = bytearray(graph.node_num)
+        clause_list = []
+        for node_id in range(0, graph.node_num) :
+            if mark[node_id] or block[node_id] :
+                continue
+            # node_id から選ばれた枝をたどって連結成分を求める．
+            lit_list = []
+            has_block = False
+            queue = [node_id]
+            mark[node_id] = 1
+            while queue :
+                node = queue.pop()
+                for dir in range(0, 4) :
+                    edge = adj_edge[node * 4 + dir]
+                    if edge < 0 or val[edge_var_list[edge]] != 1 :
+                        continue
+                    node1 = adj_node[node * 4 + dir]
+                    if node < node1 :
+                        lit_list.append(-edge_var_list[edge])
+                    if block[node1] :
+                        has_block = True
+                    elif not mark[node1] :
+                        mark[node1] = 1
+                        queue.append(node1)
+            if lit_list and not has_block :
+                clause_list.append(lit_list)
+        return clause_list
+
+
+    ## @brief SATモデルが満たしていない回り道の禁止制約を返す．
+    # @param[in] model SatSolver.solve() の返した SatModel
+    # @param[in] max_len 回り道の横方向の枝の数の最大値
+    # @return 節の集まりのリストを返す．
+    #
+    # make_detour_constraint(max_len) で作られる節のうち
+    # model のもとで偽になるものだけを返す．
+    # 節の集まりの形は _detour_clauses() と同じ．
+    def violated_detour_clauses(self, model, max_len) :
+        model = SatModel.from_model(model)
+        clauses_list = []
+        for k in range(1, max_len + 1) :
+            for clauses in self._detour_clauses(k) :
+                if numpy is not None :
+                    # 節のリテラルはすべて枝の変数の否定
+                    vals = model.as_numpy()
+                    if len(clauses) > 0 :
+                        violated = (vals[-clauses] == 1).all(axis = 1)
+                        clauses = clauses[violated]
+                    if len(clauses) > 0 :
+                        clauses_list.append(clauses)
+                else :
+                    val = model.raw
+                    clauses = [lit_list for lit_list in clauses \
+                               if all(val[-lit] == 1 for lit in lit_list)]
+                    if clauses :
+                        clauses_list.append(clauses)
+        return clauses_list
 
-                node_31 = edge_h6.alt_node(node_21)
 
-                var_v1 = self._edge_var(edge_v1)
-                var_v2 = self._edge_var(edge_v2)
-                if not (node_00.is_block or node_30.is_block) :
-                    var_h1 = self._edge_var(edge_h1)
-                    var_h2 = self._edge_var(edge_h2)
-                    var_h3 = self._edge_var(edge_h3)
-                    solver.add_clause(-var_v1, -var_v2, -var_h1, -var_h2, -var_h3)
-                if not (node_01.is_block or node_31.is_block) :
-                    var_h4 = self._edge_var(edge_h4)
-                    var_h5 = self._edge_var(edge_h5)
-                    var_h6 = self._edge_var(edge_h6)
-                    solver.add_clause(-var_v1, -var_v2, -var_h4, -var_h5, -var_h6)
+    ## @brief SATモデルから各節点のラベルの値を求める．
+    # @param[in] model SatSolver.solve() の返した SatModel
+    # @return 節点の ID番号をキーとしてラベルの値(線分番号 + 1)を持つリストを返す．
+    #
+    # 値の求め方は label_encoding によって異なる．
+    # 線分の通らない節点の値は意味を持たない．
+    def model_to_labels(self, model) :
+        val = SatModel.from_model(model).raw
+        encoding = self._label_encoding
+        label_list = []
+        for lvar_list in self._node_vars_list :
+            # lit が真の時 True となるリスト
+            bit_list = [val[lit] == 1 if lit > 0 else val[-lit] == -1 for lit in lvar_list]
+            if encoding == 'binary' :
+                label = sum(1 << i for i, bit in enumerate(bit_list) if bit)
+            elif encoding == 'order' :
+                label = sum(bit_list)
+            else :
+                label = bit_list.index(True) + 1 if True in bit_list else 0
+            label_list.append(label)
+        return label_list
 
 
     ## @brief SATモデルから解(NlSolution)を作る．
+    # @param[in] model SatSolver.solve() の返した SatModel
+    #
+    # SatBool3 のリストを渡してもよい．
+    # 解は選ばれた枝をたどって作るので label_encoding によらない．
+    # 経路の求め方は model_to_routes() を参照のこと．
+    # 線分につながっていない閉路は解に含めない．
     def model_to_solution(self, model) :
+        graph = self._graph
+        route_list, cycle_list = self.model_to_routes(model)
+        if numpy is not None :
+            grid = numpy.zeros(graph.node_num, dtype = numpy.int16)
+            for net_id, route in enumerate(route_list) :
+                grid[route] = net_id + 1
+        else :
+            grid = [0] * graph.node_num
+            for net_id, route in enumerate(route_list) :
+                val = net_id + 1
+                for node_id in route :
+                    grid[node_id] = val
         solution = NlSolution()
-        solution.set_size(self._graph.width, self._graph.height, self._graph.depth)
-        for net_id in range(0, self._graph.net_num) :
-            start, end = self._graph.terminal_node_pair(net_id)
-            prev = None
+        solution.set_from_node_array(graph, grid)
+        return solution
+
+
+    ## @brief SATモデルから各線分の経路を求める．
+    # @param[in] model SatSolver.solve() の返した SatModel
+    # @return route_list, cycle_list のタプルを返す．
+    #
+    # route_list[net_id] は net_id の線分の経路上の節点の ID番号のリストで，
+    # 始点の終端から終点の終端までの順に並んでいる．
+    # ビアを通る場合は間の層の節点も含む．
+    # cycle_list は線分の経路に含まれない選ばれた枝からなる閉路のリストで，
+    # 各閉路は節点の ID番号のリストで表す．
+    #
+    # 選ばれた枝から各節点の隣接節点(高々2つ)の表を一度に作り，
+    # それをたどって経路を求める．
+    def model_to_routes(self, model) :
+        graph = self._graph
+        node_num = graph.node_num
+        nbr = self._selected_neighbors(model)
+
+        route_list = []
+        mark = bytearray(node_num)
+        for net_id in range(0, graph.net_num) :
+            # start, end, node などは節点の ID番号
+            start, end = graph.terminal_id_pair(net_id)
+            depth = graph.depth
+            end_z = end % depth
+            route = [start]
+            mark[start] = 1
+            prev = -1
             node = start
             while node != end :
-                solution.set_val(node.x, node.y, node.z, net_id + 1)
-                next = None
-                for edge in node.edge_list :
-                    if model[self._edge_var(edge)] != SatBool3.B3True :
-                        continue
-                    node1 = edge.alt_node(node)
-                    if node1 == prev :
-                        continue
-                    next = node1
-                if next == None :
+                next = nbr[node * 2]
+                if next == prev :
+                    next = nbr[node * 2 + 1]
+                if next == -1 :
                     # このノードがビアなら end の層まで移動する．
-                    assert node.is_via
-                    assert start.z != end.z
-                    if start.z < end.z :
-                        for i in range(start.z, end.z) :
-                            solution.set_val(node.x, node.y, i + 1, net_id + 1)
-                    else :
-                        for i in range(start.z, end.z, -1) :
-                            solution.set_val(node.x, node.y, i - 1, net_id + 1)
-                    next = self._graph.node(node.x, node.y, end.z)
-                assert next != None
+                    # 同じ (x, y) の節点の ID番号は z の順に連続している．
+                    assert graph.via_id_array[node] >= 0
+                    z = node % depth
+                    assert z != end_z
+                    step = 1 if z < end_z else -1
+                    for node1 in range(node + step, node - z + end_z + step, step) :
+                        route.append(node1)
+                        mark[node1] = 1
+                    prev = -1
+                    node = node - z + end_z
+                    continue
+                route.append(next)
+                mark[next] = 1
                 prev = node
                 node = next
-            solution.set_val(node.x, node.y, node.z, net_id + 1)
+            route_list.append(route)
 
-        return solution
+        # 経路に含まれない枝は閉路になっている．
+        cycle_list = []
+        for node_id in range(0, node_num) :
+            if mark[node_id] or nbr[node_id * 2] == -1 :
+                continue
+            cycle = [node_id]
+            mark[node_id] = 1
+            prev = -1
+            node = node_id
+            while True :
+                next = nbr[node * 2]
+                if next == prev :
+                    next = nbr[node * 2 + 1]
+                if next == -1 or mark[next] :
+                    break
+                cycle.append(next)
+                mark[next] = 1
+                prev = node
+                node = next
+            cycle_list.append(cycle)
+
+        return route_list, cycle_list
+
+
+    ## @brief SATモデルで選ばれた枝の隣接節点の表を作る．
+    # @param[in] model SatSolver.solve() の返した SatModel
+    # @return 隣接節点の表を返す．
+    #
+    # 表の node_id * 2 番目と node_id * 2 + 1 番目に node_id と
+    # 選ばれた枝でつながっている節点の ID番号を入れる．
+    # ない場合は -1 とする．
+    def _selected_neighbors(self, model) :
+        # SatBool3 どうしの比較は遅いので整数の配列を直接参照する．
+        model = SatModel.from_model(model)
+        graph = self._graph
+        node_num = graph.node_num
+        if numpy is not None :
+            if self._edge_var_array is None :
+                self._edge_var_array = numpy.array(self._edge_var_list, dtype = numpy.int64)
+                self._edge_node_array = numpy.array([graph.edge_node1_array, graph.edge_node2_array],
+                                                    dtype = numpy.int64)
+            vals = model.as_numpy()
+            selected = vals[self._edge_var_array] == 1
+            node1, node2 = self._edge_node_array[:, selected]
+            # 端点でソートして同じ端点の中での順番(0 か 1)を求める．
+            ends = numpy.concatenate((node1, node2))
+            others = numpy.concatenate((node2, node1))
+            order = numpy.argsort(ends, kind = 'stable')
+            ends = ends[order]
+            others = others[order]
+            slot = numpy.arange(len(ends)) - numpy.searchsorted(ends, ends)
+            nbr = numpy.full(node_num * 2, -1, dtype = numpy.int64)
+            nbr[ends * 2 + slot] = others
+            return nbr.tolist()
+
+        val = model.raw
+        edge_node1 = graph.edge_node1_array
+        edge_node2 = graph.edge_node2_array
+        nbr = [-1] * (node_num * 2)
+        for edge_id in [edge_id for edge_id, evar in enumerate(self._edge_var_list) if val[evar] == 1] :
+            node1 = edge_node1[edge_id]
+            node2 = edge_node2[edge_id]
+            pos = node1 * 2 if nbr[node1 * 2] == -1 else node1 * 2 + 1
+            nbr[pos] = node2
+            pos = node2 * 2 if nbr[node2 * 2] == -1 else node2 * 2 + 1
+            nbr[pos] = node1
+        return nbr
+
+
+    ## @brief 長さ k の回り道だけを禁止する制約を作る．
+    # @param[in] k 回り道の横方向の枝の数
+    #
+    # 制約の内容は make_detour_constraint() を参照のこと．
+    # 節は SatSolver.add_clauses() でまとめて追加する．
+    def _make_detour_constraint(self, k) :
+        for clauses in self._detour_clauses(k) :
+            self._folder.add_clauses(clauses)
+        self._folder.flush()
+
+
+    ## @brief 長さ k の回り道を禁止する節を作る．
+    # @param[in] k 回り道の横方向の枝の数
+    # @return 節の集まりのリストを返す．
+    #
+    # 節の集まりは numpy がある時は2次元配列，ない時は節のリストとなる．
+    # 一度作った節は _detour_cache に保持する．
+    def _detour_clauses(self, k) :
+        if k not in self._detour_cache :
+            if numpy is not None :
+                self._detour_cache[k] = self._detour_clauses_numpy(k)
+            else :
+                self._detour_cache[k] = [self._detour_clauses_python(k)]
+        return self._detour_cache[k]
+
+
+    ## @brief _make_detour_constraint() の節を numpy の配列として作る．
+    # @param[in] k 回り道の横方向の枝の数
+    # @return 節を1行とする2次元配列のリストを返す．
+    #
+    # 節点と枝を (x, y, z) の3次元配列に並べ，窓の中の相対位置(i, j)ごとに
+    # 配列を (i, j) だけずらした部分をとって全ての窓をまとめて処理する．
+    def _detour_clauses_numpy(self, k) :
+        graph = self._graph
+        shape = (graph.width, graph.height, graph.depth)
+        adj_edge = numpy.frombuffer(graph.adj_edge_array, dtype = numpy.intc).reshape(shape + (4,))
+        block = numpy.frombuffer(bytes(graph.block_array), dtype = numpy.uint8).reshape(shape) != 0
+        # 枝の変数の否定のリテラル
+        # 存在しない枝(-1)の位置にはでたらめな値が入るが，その位置は使わない．
+        evar_array = numpy.array(self._edge_var_list, dtype = numpy.int32)
+        right_lit = -evar_array[adj_edge[:, :, :, DIR_RIGHT]]
+        lower_lit = -evar_array[adj_edge[:, :, :, DIR_LOWER]]
+
+        clauses_list = []
+        for d in range(0, 2) :
+            # h_lit[a, b] は図の横方向，v_lit[a, b] は図の縦方向の枝
+            if d == 0 :
+                h_lit = right_lit
+                v_lit = lower_lit
+                blk = block
+            else :
+                h_lit = lower_lit.transpose(1, 0, 2)
+                v_lit = right_lit.transpose(1, 0, 2)
+                blk = block.transpose(1, 0, 2)
+            na = blk.shape[0] - k
+            nb = blk.shape[1] - 1
+            if na <= 0 or nb <= 0 :
+                continue
+
+            # 内側の節点がすべてブロックでない窓
+            inner_ok = numpy.ones((na, nb, graph.depth), dtype = bool)
+            for i in range(1, k) :
+                inner_ok &= ~blk[i:i + na, 0:nb]
+                inner_ok &= ~blk[i:i + na, 1:1 + nb]
+
+            v1 = v_lit[0:na, 0:nb]
+            v2 = v_lit[k:k + na, 0:nb]
+            for b in range(0, 2) :
+                mask = inner_ok & ~blk[0:na, b:b + nb] & ~blk[k:k + na, b:b + nb]
+                lit_list = [v1[mask]]
+                for i in range(0, k) :
+                    lit_list.append(h_lit[i:i + na, b:b + nb][mask])
+                lit_list.append(v2[mask])
+                clauses_list.append(numpy.stack(lit_list, axis = 1))
+        return clauses_list
+
+
+    ## @brief _make_detour_constraint() の節をリテラルのタプルとして作る．
+    # @param[in] k 回り道の横方向の枝の数
+    # @return 節のリストを返す．
+    #
+    # numpy が使えない時に用いる．
+    def _detour_clauses_python(self, k) :
+        graph = self._graph
+        adj_node = graph.adj_node_array
+        adj_edge = graph.adj_edge_array
+        block = graph.block_array
+        edge_var_list = self._edge_var_list
+        clause_list = []
+        # d は方向(0: ヨコ, 1: タテ)
+        # dir_h は図の横方向，dir_v は図の縦方向
+        for dir_h, dir_v in ((DIR_RIGHT, DIR_LOWER), (DIR_LOWER, DIR_RIGHT)) :
+            # 節点ごとの dir_h 方向の隣の節点と枝の否定のリテラル(枝がなければ 0)
+            next_h = adj_node[dir_h::4]
+            lit_h = [-edge_var_list[edge] if edge >= 0 else 0 for edge in adj_edge[dir_h::4]]
+            next_v = adj_node[dir_v::4]
+            lit_v = [-edge_var_list[edge] if edge >= 0 else 0 for edge in adj_edge[dir_v::4]]
+            for node_00 in range(0, graph.node_num) :
+                lit_v1 = lit_v[node_00]
+                if lit_v1 == 0 :
+                    continue
+                node_01 = next_v[node_00]
+
+                # 上下の横方向の経路をたどる．
+                lit_list0 = [lit_v1]
+                lit_list1 = [lit_v1]
+                node0 = node_00
+                node1 = node_01
+                for i in range(0, k) :
+                    if i > 0 and (block[node0] or block[node1]) :
+                        break
+                    lit0 = lit_h[node0]
+                    if lit0 == 0 :
+                        break
+                    lit_list0.append(lit0)
+                    lit_list1.append(lit_h[node1])
+                    node0 = next_h[node0]
+                    node1 = next_h[node1]
+                else :
+                    lit_v2 = lit_v[node0]
+                    if not (block[node_00] or block[node0]) :
+                        lit_list0.append(lit_v2)
+                        clause_list.append(lit_list0)
+                    if not (block[node_01] or block[node1]) :
+                        lit_list1.append(lit_v2)
+                        clause_list.append(lit_list1)
+        return clause_list
 
 
     ## @brief ノードに接続する枝に関する制約を作る．
+    # @param[in] node_id 対象の節点の ID番号
     # @param[in] no_slack すべてのマス目を使う制約を入れるときに True にするフラグ
     #
     # 具体的には
@@ -305,27 +660,31 @@ class NlCnfEncoder :
     #   nv_map の変数によって終端になる場合と孤立する場合がある．
     # - それ以外
     #   全て選ばれないか2つの枝が選ばれる．
-    def _make_edge_constraint(self, node, no_slack) :
+    def _make_edge_constraint(self, node_id, no_slack) :
+        graph = self._graph
         # node に接続している枝の変数のリスト
-        evar_list = [self._edge_var_list[edge.id] for edge in node.edge_list]
+        edge_var_list = self._edge_var_list
+        evar_list = [edge_var_list[edge_id] for edge_id in graph.node_edge_ids(node_id)]
 
-        if node.is_terminal :
+        terminal_id = graph.terminal_id_array[node_id]
+        via_id = graph.via_id_array[node_id]
+        if terminal_id >= 0 :
             # node が終端の場合
 
             # ただ一つの枝が選ばれる．
             self._make_one_hot(evar_list)
 
             # 同時にラベルの変数を固定する．
-            self._make_label_constraint(node, node.terminal_id)
+            self._make_label_constraint(node_id, terminal_id)
 
-        elif node.is_via :
+        elif via_id >= 0 :
             # node がビアの場合
             # この層に終端を持つ線分と結びついている時はただ一つの枝が選ばれる．
-            via_id = node.via_id
-            for net_id in self._graph.via_net_list(via_id) :
+            z = graph.node_coord(node_id)[2]
+            for net_id in graph.via_net_list(via_id) :
                 cvar = self._nv_map[net_id][via_id]
-                node1, node2 = self._graph.terminal_node_pair(net_id)
-                if node1.z != node.z and node2.z != node.z :
+                id1, id2 = graph.terminal_id_pair(net_id)
+                if graph.node_coord(id1)[2] != z and graph.node_coord(id2)[2] != z :
                     # このビアは net_id の線分には使えない．
                     # このノードに接続する枝は選ばれない．
                     self._make_conditional_zero_hot(cvar, evar_list)
@@ -334,7 +693,7 @@ class NlCnfEncoder :
                     self._make_conditional_one_hot(cvar, evar_list)
 
                     # ラベルの制約を追加する．
-                    self._make_conditional_label_constraint(cvar, node, net_id)
+                    self._make_conditional_label_constraint(cvar, node_id, net_id)
         else :
             if no_slack :
                 # 常に２個の枝が選ばれる．
@@ -362,14 +721,206 @@ class NlCnfEncoder :
         self._make_one_hot(vars_list)
 
 
+    ## @brief 枝が使われる可能性があるか調べる．
+    # @param[in] edge_id 対象の枝の ID番号
+    #
+    # 両端の節点を通りうる線分に共通なものがあれば True を返す．
+    def _is_usable_edge(self, edge_id) :
+        graph = self._graph
+        net_list1 = self._domain_list[graph.edge_node1_array[edge_id]]
+        net_list2 = self._domain_list[graph.edge_node2_array[edge_id]]
+        if net_list1 is net_list2 :
+            # 同じ領域の空きマス
+            return len(net_list1) > 0
+        return not set(net_list1).isdisjoint(net_list2)
+
+
+    ## @brief 節点のラベルを表す変数のリストを作る．
+    # @param[in] node_id 対象の節点の ID番号
+    #
+    # 内容は __init__() の _node_vars_list の説明を参照のこと．
+    def _new_label_vars(self, node_id) :
+        solver = self._solver
+        false_var = self._false_var
+        nn = self._graph.net_num
+        encoding = self._label_encoding
+        if self._domain_list is not None :
+            domain = self._domain_list[node_id]
+            if len(domain) <= 1 :
+                # 通りうる線分がない場合は 0 とする．
+                val = domain[0] + 1 if domain else 0
+                return [-false_var if lit else false_var for lit in self._label_pattern(val)]
+        else :
+            domain = None
+
+        if encoding == 'binary' :
+            nbits = math.ceil(math.log2(nn + 1))
+            return [solver.new_variable() for i in range(0, nbits)]
+
+        if domain is None :
+            return [solver.new_variable() for i in range(0, nn)]
+
+        if encoding == 'order' :
+            # ラベルの値は min_id + 1 以上 max_id + 1 以下になる．
+            min_id = min(domain)
+            max_id = max(domain)
+            return [-false_var if i <= min_id else \
+                    false_var if i > max_id else solver.new_variable() \
+                    for i in range(0, nn)]
+
+        lvar_list = [false_var] * nn
+        for net_id in sorted(domain) :
+            lvar_list[net_id] = solver.new_variable()
+        return lvar_list
+
+
+    ## @brief ラベルの値を表す変数の値のパタンを返す．
+    # @param[in] val ラベルの値(線分番号 + 1, 0 は線分なし)
+    # @return _node_vars_list の要素に対応する bool のリストを返す．
+    def _label_pattern(self, val) :
+        nn = self._graph.net_num
+        encoding = self._label_encoding
+        if encoding == 'binary' :
+            nbits = math.ceil(math.log2(nn + 1))
+            return [((1 << i) & val) != 0 for i in range(0, nbits)]
+        elif encoding == 'order' :
+            return [i < val for i in range(0, nn)]
+        else :
+            return [i == val - 1 for i in range(0, nn)]
+
+
+    ## @brief ラベルの値が val であることを表すリテラルのリストを返す．
+    # @param[in] node_id 対象の節点の ID番号
+    # @param[in] val ラベルの値(線分番号 + 1)
+    #
+    # リテラルがすべて真の時にラベルの値が val となる．
+    # onehot, order の場合は _make_label_domain_constraint() の制約を前提として
+    # 必要なリテラルのみを返す．
+    def _label_lits(self, node_id, val) :
+        lvar_list = self._node_vars_list[node_id]
+        encoding = self._label_encoding
+        if encoding == 'binary' :
+            return [lvar if (1 << i) & val else -lvar for i, lvar in enumerate(lvar_list)]
+        elif encoding == 'order' :
+            if val < len(lvar_list) :
+                return [lvar_list[val - 1], -lvar_list[val]]
+            return [lvar_list[val - 1]]
+        else :
+            return [lvar_list[val - 1]]
+
+
+    ## @brief ラベルの変数がとってよい値の組み合わせに関する制約を作る．
+    # @param[in] node_id 対象の節点の ID番号
+    #
+    # - binary: prune_domain が True の場合は通りうる線分以外の値をとらない制約を作る．
+    #   禁止する値の範囲は _label_domain_cubes() で求める．
+    # - onehot, net_edge: 変数が1つだけ真となる制約を作る．
+    # - order: i + 1 番目の変数が真なら i 番目の変数も真となる制約と
+    #   通りうる線分の間の値をとらない制約を作る．
+    # 値の決まったラベルについては何もしない．
+    def _make_label_domain_constraint(self, node_id) :
+        domain = self._domain_list[node_id] if self._domain_list is not None else None
+        if domain is not None and len(domain) <= 1 :
+            return
+
+        lvar_list = self._node_vars_list[node_id]
+        encoding = self._label_encoding
+        if encoding == 'onehot' or encoding == 'net_edge' :
+            var_list = [lvar for lvar in lvar_list if lvar != self._false_var]
+            cardinality.add_exactly_one(self._folder, var_list, self._card_encoding)
+            return
+
+        if encoding == 'order' :
+            n = len(lvar_list)
+            clause_list = [[-lvar_list[i + 1], lvar_list[i]] for i in range(0, n - 1)]
+            if domain is not None :
+                # 通りうる線分の間の値 a + 1 〜 b - 1 をとらない．
+                # (ラベルが a + 1 以上なら b 以上)
+                val_list = sorted(net_id + 1 for net_id in domain)
+                for a, b in zip(val_list, val_list[1:]) :
+                    if b - a > 1 :
+                        clause_list.append([-lvar_list[a], lvar_list[b - 1]])
+            self._folder.add_clauses(clause_list)
+            return
+
+        if domain is None :
+            return
+        nbits = len(lvar_list)
+        cube_list = self._label_domain_cubes(tuple(self._domain_list[node_id]), nbits)
+        if cube_list is None :
+            return
+        self._folder.add_clauses([[-lvar_list[i] if (1 << i) & lo else lvar_list[i] \
+                                   for i in range(nrest, nbits)] \
+                                  for lo, nrest in cube_list])
+
+
+    ## @brief ラベルのとってはいけない値の範囲を求める．
+    # @param[in] domain 通りうる線分番号のタプル
+    # @param[in] nbits ラベルのビット数
+    # @return (lo, nrest) のリストを返す．
+    #
+    # ラベルの値の2進表現を上位ビットから場合分けしていき，
+    # 許される値を1つも含まない範囲を求める．
+    # (lo, nrest) は lo から下位 nrest ビットを変えた値の範囲を表す．
+    # 範囲の数がラベルのビット数の _DOMAIN_CLAUSE_FACTOR 倍を超える時は
+    # None を返す(通りうる線分が多い時は節を増やす割に効果が小さい)．
+    # 同じ領域の節点は同じ結果となるので _domain_cube_cache に保持する．
+    def _label_domain_cubes(self, domain, nbits) :
+        if domain in self._domain_cube_cache :
+            return self._domain_cube_cache[domain]
+
+        val_list = sorted(net_id + 1 for net_id in domain)
+        cube_list = []
+        # (上位ビットの値, 残りのビット数) のリスト
+        stack = [(0, nbits)]
+        while stack :
+            prefix, nrest = stack.pop()
+            lo = prefix << nrest
+            hi = (prefix + 1) << nrest
+            num = bisect.bisect_left(val_list, hi) - bisect.bisect_left(val_list, lo)
+            if num == hi - lo :
+                continue
+            if num == 0 :
+                cube_list.append((lo, nrest))
+                if len(cube_list) > nbits * _DOMAIN_CLAUSE_FACTOR :
+                    cube_list = None
+                    break
+                continue
+            stack.append((prefix * 2, nrest - 1))
+            stack.append((prefix * 2 + 1, nrest - 1))
+        self._domain_cube_cache[domain] = cube_list
+        return cube_list
+
+
     ## @brief 枝の両端のノードのラベルに関する制約を作る．
-    # @param[in] edge 対象の枝
+    # @param[in] edge_id 対象の枝の ID番号
     #
     # 具体的にはその枝が選ばれているとき両端のノードのラベルは等しい
-    def _make_adj_nodes_constraint(self, edge) :
-        evar = self._edge_var_list[edge.id]
-        nvar_list1 = self._node_vars_list[edge.node1.id]
-        nvar_list2 = self._node_vars_list[edge.node2.id]
+    # net_edge の場合は枝を通る線分を表す変数を作り，
+    # 枝が選ばれているときにどれか1つが真となり，
+    # それが真の時には両端のノードのラベルがその線分になるという制約を作る．
+    def _make_adj_nodes_constraint(self, edge_id) :
+        graph = self._graph
+        evar = self._edge_var_list[edge_id]
+        nvar_list1 = self._node_vars_list[graph.edge_node1_array[edge_id]]
+        nvar_list2 = self._node_vars_list[graph.edge_node2_array[edge_id]]
+        if self._label_encoding == 'net_edge' :
+            if evar == self._false_var :
+                return
+            false_var = self._false_var
+            folder = self._folder
+            lit_list = [-evar]
+            for nvar1, nvar2 in zip(nvar_list1, nvar_list2) :
+                if nvar1 == false_var or nvar2 == false_var :
+                    # この線分は枝を通らない．
+                    continue
+                xvar = folder.new_variable()
+                folder.add_clause(-xvar, nvar1)
+                folder.add_clause(-xvar, nvar2)
+                lit_list.append(xvar)
+            folder.add_clause(lit_list)
+            return
+
         n = len(nvar_list1)
         for i in range(0, n) :
             nvar1 = nvar_list1[i]
@@ -378,41 +929,27 @@ class NlCnfEncoder :
 
 
     ## @brief ラベル値を固定する制約を作る．
-    # @param[in] node 対象のノード
+    # @param[in] node_id 対象の節点の ID番号
     # @param[in] net_id 固定する線分番号
-    def _make_label_constraint(self, node, net_id) :
-        lvar_list = self._node_vars_list[node.id]
-        for i, lvar in enumerate(lvar_list) :
-            if (1 << i) & (net_id + 1) :
-                self._solver.add_clause(lvar)
-            else :
-                self._solver.add_clause(-lvar)
+    def _make_label_constraint(self, node_id, net_id) :
+        for lit in self._label_lits(node_id, net_id + 1) :
+            self._folder.add_clause(lit)
 
 
     ## @brief 条件付きでラベル値を固定する制約を作る．
     # @param[in] cvar 条件を表す変数
-    # @param[in] node 対象のノード
+    # @param[in] node_id 対象の節点の ID番号
     # @param[in] net_id 固定する線分番号
-    def _make_conditional_label_constraint(self, cvar, node, net_id) :
-        lvar_list = self._node_vars_list[node.id]
-        for i, lvar in enumerate(lvar_list) :
-            if (1 << i) & (net_id + 1) :
-                self._solver.add_clause(-cvar, lvar)
-            else :
-                self._solver.add_clause(-cvar, -lvar)
-
-
-    ## @brief 枝に対する変数番号を返す．
-    # @param[in] edge 対象の枝
-    def _edge_var(self, edge) :
-        return self._edge_var_list[edge.id]
+    def _make_conditional_label_constraint(self, cvar, node_id, net_id) :
+        for lit in self._label_lits(node_id, net_id + 1) :
+            self._folder.add_clause(-cvar, lit)
 
 
     ## @brief 条件付きでリストの中の変数がすべて False となる制約を作る．
     # @param[in] cvar 条件を表す変数
     # @param[in] var_list 対象の変数のリスト
     def _make_conditional_zero_hot(self, cvar, var_list) :
-        solver = self._solver
+        solver = self._folder
         for var in var_list :
             solver.add_clause(-cvar, -var)
 
@@ -421,7 +958,7 @@ class NlCnfEncoder :
     # @param[in] var_list 対象の変数のリスト
     def _make_one_hot(self, var_list) :
         n = len(var_list)
-        solver = self._solver
+        solver = self._folder
         # 要素数で場合分け
         if n == 2 :
             var0 = var_list[0]
@@ -450,19 +987,15 @@ class NlCnfEncoder :
             solver.add_clause( var0,  var1,  var2,  var3)
         else :
             # 一般形
-            for i in range(0, n - 1) :
-                var0 = var_list[i]
-                for j in range(i + 1, n) :
-                    var1 = var_list[j]
-                    solver.add_clause(-var0, -var1)
-            solver.add_clause(var_list)
+            # pairwise だと節数が O(n^2) になるので要素数に応じて符号化方法を選ぶ．
+            cardinality.add_exactly_one(solver, var_list, self._card_encoding)
 
 
     ## @brief 条件付きでリストの中の変数が1つだけ True となる制約を作る．
     # @param[in] cvar 条件を表す変数
     # @param[in] var_list 対象の変数のリスト
     def _make_conditional_one_hot(self, cvar, var_list) :
-        solver = self._solver
+        solver = self._folder
         n = len(var_list)
         # 要素数で場合分け
         if n == 2 :
@@ -497,7 +1030,7 @@ class NlCnfEncoder :
     ## @brief リストの中の変数が2個 True になるという制約
     # @param[in] var_list 対象の変数のリスト
     def _make_two_hot(self, var_list) :
-        solver = self._solver
+        solver = self._folder
         n = len(var_list)
         # 要素数で場合分け
         if n == 2 :
@@ -534,7 +1067,7 @@ class NlCnfEncoder :
     ## @brief リストの中の変数が0個か2個 True になるという制約
     # @param[in] var_list 対象の変数のリスト
     def _make_zero_or_two_hot(self, var_list) :
-        solver = self._solver
+        solver = self._folder
         n = len(var_list)
         # 要素数で場合分け
         if n == 2 :
@@ -571,7 +1104,7 @@ class NlCnfEncoder :
     # @param[in] cvar 条件を表す変数
     # @param[in] var1, var2 対象の変数
     def _make_conditional_equal(self, cvar, var1, var2) :
-        solver = self._solver
+        solver = self._folder
         solver.add_clause(-cvar, -var1,  var2)
         solver.add_clause(-cvar,  var1, -var2)
 
@@ -0,0 +1,158 @@
+#! /usr/bin/env python3
+
+## @file nlcorpusreader.py
+# @brief NlCorpusReader の定義ファイル
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+
+import io
+import os
+import tarfile
+import zipfile
+from nl3d.adc2016_reader import ADC2016_Reader
+from nl3d.nlbinaryio import NlBinaryIO, MAGIC
+
+
+## @brief 多数の問題や解をまとめて読み込むクラス
+#
+# 以下のいずれかから (名前, 問題) もしくは (名前, 解) を1つずつ取り出す．
+# - ディレクトリ(下のディレクトリも含めてファイル名の順にたどる)
+# - tar ファイル(圧縮されていてもよい)
+# - zip ファイル
+# - 複数の問題(もしくは解)を連結したファイルやファイルオブジェクト
+#
+# 各ファイルは ADC2016 フォーマットか NlBinaryIO のバイナリ形式とする．
+# ADC2016 フォーマットのファイルは 'SIZE' 行ごとに別の問題(解)とみなす．
+# 名前はファイルのパスで，1つのファイルに複数含まれる場合は
+# 2つめ以降を '<パス>#2', '<パス>#3', ... とする．
+# tar, zip の中のファイルは '<アーカイブのパス>/<メンバの名前>' とする．
+#
+# 読み込みに失敗したものは問題(解)を None とする．
+# 一度に読み込むのは1つのファイル(連結したものは1つの問題)だけなので，
+# 全体の大きさによらずメモリの使用量は一定に保たれる．
+#
+# @code
+# reader = NlCorpusReader()
+# for name, problem in reader.iter_problems('benchmarks.tar.gz') :
+#     graph = NlGraph(problem)
+#     ...
+# @endcode
+class NlCorpusReader :
+
+    ## @brief 初期化
+    def __init__(self) :
+        self._reader = ADC2016_Reader()
+        self._bio = NlBinaryIO()
+
+
+    ## @brief 問題を1つずつ取り出す．
+    # @param[in] source ディレクトリ，アーカイブ，ファイルのパスもしくはファイルオブジェクト
+    # @param[in] name ファイルオブジェクトの場合に用いる名前
+    # @return (名前, NlProblem) を生成するジェネレータを返す．
+    def iter_problems(self, source, name = '<stream>') :
+        return self._iter_source(source, name, True)
+
+
+    ## @brief 解を1つずつ取り出す．
+    # @param[in] source ディレクトリ，アーカイブ，ファイルのパスもしくはファイルオブジェクト
+    # @param[in] name ファイルオブジェクトの場合に用いる名前
+    # @return (名前, NlSolution) を生成するジェネレータを返す．
+    def iter_solutions(self, source, name = '<stream>') :
+        return self._iter_source(source, name, False)
+
+
+    ## @brief source の種類に応じて読み込む．
+    # @param[in] is_problem 問題を読み込む時 True にする．
+    def _iter_source(self, source, name, is_problem) :
+        if isinstance(source, (str, bytes, os.PathLike)) :
+            yield from self._iter_path(os.fsdecode(source), is_problem)
+        else :
+            yield from self._iter_stream(source, name, is_problem)
+
+
+    ## @brief パスの種類に応じて読み込む．
+    def _iter_path(self, path, is_problem) :
+        if os.path.isdir(path) :
+            for dirpath, dirnames, filenames in os.walk(path) :
+                dirnames.sort()
+                for filename in sorted(filenames) :
+                    yield from self._iter_path(os.path.join(dirpath, filename), is_problem)
+        elif tarfile.is_tarfile(path) :
+            # ストリームとして開いて先頭から順に読む．
+            with tarfile.open(path, 'r|*') as tar :
+                for member in tar :
+                    if not member.isfile() :
+                        continue
+                    data = tar.extractfile(member).read()
+                    yield from self._iter_data(data, path + '/' + member.name, is_problem)
+        elif zipfile.is_zipfile(path) :
+            with zipfile.ZipFile(path) as zf :
+                for info in zf.infolist() :
+                    if info.is_dir() :
+                        continue
+                    data = zf.read(info)
+                    yield from self._iter_data(data, path + '/' + info.filename, is_problem)
+        else :
+            with open(path, 'rb') as fin :
+                is_binary = fin.read(len(MAGIC)) == MAGIC
+                if not is_binary :
+                    fin.seek(0)
+                    yield from self._iter_stream(fin, path, is_problem)
+            if is_binary :
+                if is_problem :
+                    yield path, self._bio.read_problem_file(path)
+                else :
+                    yield path, self._bio.read_solution_file(path)
+
+
+    ## @brief 1つのファイルの内容から読み込む．
+    # @param[in] data ファイルの内容(bytes)
+    # @param[in] name 名前
+    def _iter_data(self, data, name, is_problem) :
+        if data[:len(MAGIC)] == MAGIC :
+            # 解を書き換えられるように bytearray にしておく．
+            yield name, self._read_binary(bytearray(data), is_problem)
+        else :
+            yield from self._iter_stream(io.StringIO(data.decode('utf-8')), name, is_problem)
+
+
+    ## @brief 連結されたテキストから1つずつ読み込む．
+    # @param[in] fin ファイルオブジェクト(テキストでもバイナリでもよい)
+    # @param[in] name 名前
+    #
+    # 1行ずつ読んで 'SIZE' 行が現れるたびに区切る．
+    def _iter_stream(self, fin, name, is_problem) :
+        read = self._reader.read_problem if is_problem else self._reader.read_solution
+        line_list = []
+        has_size = False
+        count = 0
+        for line in fin :
+            if isinstance(line, bytes) :
+                line = line.decode('utf-8')
+            if line[:4].upper() == 'SIZE' :
+                if has_size :
+                    count += 1
+                    yield self._doc_name(name, count), read(''.join(line_list))
+                    line_list = []
+                has_size = True
+            line_list.append(line)
+        if has_size or any(line.strip() for line in line_list) :
+            count += 1
+            yield self._doc_name(name, count), read(''.join(line_list))
+
+
+    ## @brief バイナリ形式の内容を読み込む．
+    def _read_binary(self, data, is_problem) :
+        if is_problem :
+            return self._bio.read_problem(data)
+        else :
+            return self._bio.read_solution(data)
+
+
+    ## @brief 1つのファイルの中の count 番目の名前を返す．
+    def _doc_name(self, name, count) :
+        if count == 1 :
+            return name
+        return '{}#{}'.format(name, count)
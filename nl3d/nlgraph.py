@@ -7,72 +7,55 @@
 # Copyright (C) 2017 Yusuke Matsunaga
 # All rights reserved.
 
+from array import array
+
 from nl3d.nlpoint import NlPoint
 from nl3d.nlvia import NlVia
 from nl3d.nlproblem import NlProblem
 
 
+## @brief 方向を表す定数
+#
+# NlGraph.adj_node_array や NlGraph.adj_edge_array の添字に用いる．
+# 上(UPPER)は Y座標の小さい方，下(LOWER)は Y座標の大きい方を表す．
+DIR_RIGHT = 0
+DIR_LEFT  = 1
+DIR_UPPER = 2
+DIR_LOWER = 3
+
+
 ## @brief 節点を表すクラス
 #
-# 以下のメンバを持つ．
+# 実際の情報は NlGraph の配列に入っており，
+# このクラスはそれを参照するためのものである．
+# 以下の情報を返す．
 # - ID番号
-# - 座標(_x, _y, _z)
-# - 接続している枝のリスト(_edge_list)
-# - 各方向の枝(_right_edge, _left_edge, _upper_edge, _lower_edge)
-# - 終端の時に True となるフラグ(_is_terminal)
-# - 終端の時の線分番号(_terminal_id)
-# - ビアの時に True となるフラグ(_is_via)
-# - ビアの時のビア番号(_via_id)
+# - 座標(x, y, z)
+# - 接続している枝のリスト(edge_list)
+# - 各方向の枝(right_edge, left_edge, upper_edge, lower_edge)
+# - 終端の時に True となるフラグ(is_terminal)
+# - 終端の時の線分番号(terminal_id)
+# - ビアの時に True となるフラグ(is_via)
+# - ビアの時のビア番号(via_id)
 #
 # ただし @property 属性のついたメンバ関数をメンバのようにアクセスすること．
+# NlGraph.node() などで得られるオブジェクトは ID番号ごとに一つなので
+# == や is で比較してよい．
 class NlNode :
 
+    # 節点の数だけ作られるので __dict__ を持たないようにする．
+    __slots__ = ('_graph', '_id', '_x', '_y', '_z')
+
     ## @brief 初期化
-    def __init__(self, id, x, y, z) :
+    # @param[in] graph 親のグラフ
+    # @param[in] id ID番号
+    # @param[in] x, y, z 座標
+    def __init__(self, graph, id, x, y, z) :
+        self._graph = graph
         self._id = id
         self._x = x
         self._y = y
         self._z = z
-        self._edge_list = []
-        self._right_edge = None
-        self._left_edge = None
-        self._upper_edge = None
-        self._lower_edge = None
-        self._is_terminal = False
-        self._terminal_id = None
-        self._is_via = False
-        self._via_id = None
-
-    ## @brief 終端の印をつける．
-    def set_terminal(self, net_id) :
-        self._is_terminal = True
-        self._terminal_id = net_id
-
-    ## @brief ビアの印をつける．
-    def set_via(self, via_id) :
-        self._is_via = True
-        self._via_id = via_id
-
-    ## @brief 枝を追加する．
-    # @param[in] edge 対象の枝
-    # @param[in] dir 方向
-    #
-    # dir の意味は以下の通り
-    # - 0: 右
-    # - 1: 左
-    # - 2: 上
-    # - 3: 下
-    def add_edge(self, edge, dir) :
-        self._edge_list.append(edge)
-        if dir == 0 :
-            self._right_edge = edge
-        elif dir == 1 :
-            self._left_edge = edge
-        elif dir == 2 :
-            self._upper_edge = edge
-        elif dir == 3 :
-            self._lower_edge = edge
-
 
     ## @brief ID番号
     @property
@@ -97,67 +80,69 @@ class NlNode :
     ## @brief 接続している枝のリストを返す
     @property
     def edge_list(self) :
-        for edge in self._edge_list :
-            assert edge._node1 == self or edge._node2 == self
-        return self._edge_list
+        graph = self._graph
+        edge_list = graph.edge_list
+        return [edge_list[edge_id] for edge_id in graph.node_edge_ids(self._id)]
 
     ## @brief 右方向の枝を返す．
     #
     # なければ None を返す．
     @property
     def right_edge(self) :
-        return self._right_edge
+        return self._graph._edge_view(self._id, DIR_RIGHT)
 
     ## @brief 左方向の枝を返す．
     #
     # なければ None を返す．
     @property
     def left_edge(self) :
-        return self._left_edge
+        return self._graph._edge_view(self._id, DIR_LEFT)
 
     ## @brief 上方向の枝を返す．
     #
     # なければ None を返す．
     @property
     def upper_edge(self) :
-        return self._upper_edge
+        return self._graph._edge_view(self._id, DIR_UPPER)
 
     ## @brief 下方向の枝を返す．
     #
     # なければ None を返す．
     @property
     def lower_edge(self) :
-        return self._lower_edge
+        return self._graph._edge_view(self._id, DIR_LOWER)
 
     ## @brief 終端フラグ
     @property
     def is_terminal(self) :
-        return self._is_terminal
+        return self._graph._terminal_id_array[self._id] >= 0
 
     ## @brief 終端番号
     #
-    # is_terminal == False の場合の値は不定
+    # is_terminal == False の場合は None
     @property
     def terminal_id(self) :
-        return self._terminal_id
+        net_id = self._graph._terminal_id_array[self._id]
+        return net_id if net_id >= 0 else None
 
     ## @brief ビアフラグ
     @property
     def is_via(self) :
-        return self._is_via
+        return self._graph._via_id_array[self._id] >= 0
 
     ## @brief ビア番号
     #
-    # is_via == False の場合の値は不定
+    # is_via == False の場合は None
     @property
     def via_id(self) :
-        return self._via_id
+        via_id = self._graph._via_id_array[self._id]
+        return via_id if via_id >= 0 else None
 
 
     ## @brief 終端かビアのとき True となるフラグ
     @property
     def is_block(self) :
-        return self._is_terminal or self._is_via
+        return self._graph._block_array[self._id] != 0
 
 
     ## @brief 内容を表す文字列を返す．
@@ -175,12 +160,17 @@ class NlNode :
 
 ## @brief 枝を表すクラス
 #
-# 以下のメンバを持つ．
+# NlNode と同様に NlGraph が作るもので，以下の情報を返す．
 # - ID番号
-# - 両端の節点(_node1, _node2)
+# - 両端の節点(node1, node2)
 class NlEdge :
 
+    # 枝の数だけ作られるので __dict__ を持たないようにする．
+    __slots__ = ('_id', '_node1', '_node2')
+
     ## @brief 初期化
+    # @param[in] id ID番号
+    # @param[in] node1, node2 両端の節点(NlNode)
     def __init__(self, id, node1, node2) :
         self._id = id
         self._node1 = node1
@@ -202,10 +192,12 @@ class NlEdge :
         return self._node2
 
     ## @brief 反対側のノードを返す．
+    #
+    # NlNode は ID番号ごとに一つしか作られないので is で比較する．
     def alt_node(self, node) :
-        if node == self._node1 :
+        if node is self._node1 :
             return self._node2
-        elif node == self._node2 :
+        elif node is self._node2 :
             return self._node1
         else :
             assert False
@@ -219,6 +211,19 @@ class NlEdge :
 
 
 ## @brief ナンバーリンクの問題を表すグラフ
+#
+# 節点と枝の情報は整数の配列で持つ．
+# - 節点の ID番号は (x * height + y) * depth + z
+# - 枝の ID番号は層ごとに水平の枝，垂直の枝の順に振られる．
+# - adj_node_array[node_id * 4 + dir] は dir 方向に隣接する節点の ID番号
+# - adj_edge_array[node_id * 4 + dir] は dir 方向の枝の ID番号
+#   (どちらもない場合は -1)
+# - terminal_id_array[node_id] は終端の線分番号(終端でなければ -1)
+# - via_id_array[node_id] はビア番号(ビアでなければ -1)
+# - block_array[node_id] は終端かビアの時 1
+#
+# NlNode や NlEdge のオブジェクトはこれらを参照するためのもので，
+# 大量の節点や枝を扱う処理では配列を直接用いたほうが速い．
 class NlGraph :
 
     ## @brief 初期化
@@ -230,77 +235,146 @@ class NlGraph :
     ## @brief 問題を設定する．
     # @param[in] problem 問題を表すオブジェクト(NlProblem)
     def set_problem(self, problem) :
-        self._width = problem.width
-        self._height = problem.height
-        self._depth = problem.depth
+        width = problem.width
+        height = problem.height
+        depth = problem.depth
+        self._width = width
+        self._height = height
+        self._depth = depth
 
         self._net_num = problem.net_num
         self._via_num = problem.via_num
 
-        # 節点を作る．
-        # node_array[x][y][z] に (x, y, z) の節点が入る．
-        # Python 特有の内包表記で one-liner で書けるけど1行が長すぎ．
-        self._node_list = []
-        self._node_array = [[[self._new_node(x, y, z)
-                              for z in range(0, self._depth)] \
-                             for y in range(0, self._height)] \
-                            for x in range(0, self._width)]
-
-        # 枝を作る．
-        self._edge_list = []
-        for z in range(0, self._depth) :
+        node_num = width * height * depth
+        self._node_num = node_num
+        self._node_list = None
+        self._edge_list = None
+
+        # 節点と枝の隣接関係を作る．
+        adj_node = array('i', [-1]) * (node_num * 4)
+        adj_edge = array('i', [-1]) * (node_num * 4)
+        edge_node1 = array('i')
+        edge_node2 = array('i')
+        dx = height * depth
+        dy = depth
+        for z in range(0, depth) :
             # 水平の枝を作る．
-            for x in range(0, self._width - 1) :
-                for y in range(0, self._height) :
+            for x in range(0, width - 1) :
+                for y in range(0, height) :
                     # (x, y) - (x + 1, y) を結ぶ枝
-                    node1 = self._node_array[x][y][z]
-                    node2 = self._node_array[x + 1][y][z]
-                    self._new_edge(node1, node2, True)
+                    id1 = x * dx + y * dy + z
+                    id2 = id1 + dx
+                    edge_id = len(edge_node1)
+                    edge_node1.append(id1)
+                    edge_node2.append(id2)
+                    adj_node[id1 * 4 + DIR_RIGHT] = id2
+                    adj_edge[id1 * 4 + DIR_RIGHT] = edge_id
+                    adj_node[id2 * 4 + DIR_LEFT] = id1
+                    adj_edge[id2 * 4 + DIR_LEFT] = edge_id
 
             # 垂直の枝を作る．
-            for x in range(0, self._width) :
-                for y in range(0, self._height - 1) :
+            for x in range(0, width) :
+                for y in range(0, height - 1) :
                     # (x, y) - (x, y + 1) を結ぶ枝
-                    node1 = self._node_array[x][y][z]
-                    node2 = self._node_array[x][y + 1][z]
-                    self._new_edge(node1, node2, False)
+                    id1 = x * dx + y * dy + z
+                    id2 = id1 + dy
+                    edge_id = len(edge_node1)
+                    edge_node1.append(id1)
+                    edge_node2.append(id2)
+                    adj_node[id1 * 4 + DIR_LOWER] = id2
+                    adj_edge[id1 * 4 + DIR_LOWER] = edge_id
+                    adj_node[id2 * 4 + DIR_UPPER] = id1
+                    adj_edge[id2 * 4 + DIR_UPPER] = edge_id
+        self._adj_node_array = adj_node
+        self._adj_edge_array = adj_edge
+        self._edge_node1_array = edge_node1
+        self._edge_node2_array = edge_node2
 
         # 端子の印をつける．
-        self._terminal_node_pair_list = []
+        terminal_id_array = array('i', [-1]) * node_num
+        block_array = bytearray(node_num)
+        self._terminal_pair_list = []
         for net_id, (label, s, e) in enumerate(problem.net_list()) :
-            node1 = self._node_array[s.x][s.y][s.z]
-            node2 = self._node_array[e.x][e.y][e.z]
-            node1.set_terminal(net_id)
-            node2.set_terminal(net_id)
-            self._terminal_node_pair_list.append((node1, node2))
+            id1 = self.node_id(s.x, s.y, s.z)
+            id2 = self.node_id(e.x, e.y, e.z)
+            terminal_id_array[id1] = net_id
+            terminal_id_array[id2] = net_id
+            block_array[id1] = 1
+            block_array[id2] = 1
+            self._terminal_pair_list.append((id1, id2))
 
         # ビアの印をつける．
-        self._via_nodes_list = [[] for via_id in range(0, self._via_num)]
+        via_id_array = array('i', [-1]) * node_num
+        self._via_ids_list = []
         for via_id, via in enumerate(problem.via_list()) :
-            via_nodes = []
-            for z in range(via.z1, via.z2 - via.z1 + 1) :
-                node = self._node_array[via.x][via.y][z]
-                node.set_via(via_id)
-                via_nodes.append(node)
-            self._via_nodes_list[via_id] = via_nodes
+            via_ids = []
+            for z in range(via.z1, via.z2 + 1) :
+                node_id = self.node_id(via.x, via.y, z)
+                via_id_array[node_id] = via_id
+                block_array[node_id] = 1
+                via_ids.append(node_id)
+            self._via_ids_list.append(via_ids)
+        self._terminal_id_array = terminal_id_array
+        self._via_id_array = via_id_array
+        self._block_array = block_array
+
+        # 各層の空きマスを連結成分(領域)に分ける．
+        self._make_regions()
 
         # ビアを使うことのできるネットを求める．
         # 条件はネットの２つの終端の層番号をそのビアが含んでいること．
         # ただし2つの終端の層番号が等しいネットは除外する．
+        # さらに終端の層でビアの節点と終端の節点が空きマスを通って
+        # つながっていなければならない．
         # _via_net_list[via_id] に via_id と関係のある線分番号のリストが入る．
         # _net_via_list[net_id] に net_id と関係のあるビア番号のリストが入る．
+        # _nv_dist_list[net_id][via_id] にビアと2つの終端の X-Y 平面上の
+        # マンハッタン距離の対が入る．
+        #
+        # 全てのビアと線分の組み合わせを調べると O(V*N) かかるので，
+        # 線分を終端の層番号の対(小さい方，大きい方)ごとのバケットに分けておき，
+        # ビアの範囲に含まれる層番号の対のバケットだけを調べる．
+        bucket_dict = {}
+        net_coord_list = []
+        for net_id, (label, s, e) in enumerate(problem.net_list()) :
+            sx, sy, sz = s.x, s.y, s.z
+            ex, ey, ez = e.x, e.y, e.z
+            net_coord_list.append((sx, sy, sz, ex, ey, ez))
+            if sz == ez :
+                continue
+            key = (sz, ez) if sz < ez else (ez, sz)
+            if key in bucket_dict :
+                bucket_dict[key].append(net_id)
+            else :
+                bucket_dict[key] = [net_id]
+
         self._via_net_list = [[] for via_id in range(0, self._via_num)]
         self._net_via_list = [[] for net_id in range(0, self._net_num)]
+        self._nv_dist_list = [{} for net_id in range(0, self._net_num)]
         for via_id, via in enumerate(problem.via_list()) :
-            z1 = via.z1
-            z2 = via.z2
+            vx, vy, z1, z2 = via.x, via.y, via.z1, via.z2
             net_list = []
-            for net_id, (label, s, e) in enumerate(problem.net_list()) :
-                if s.z != e.z and z1 <= s.z <= z2 and z1 <= e.z <= z2 :
-                    net_list.append(net_id)
-                    self._net_via_list[net_id].append(via_id)
+            for za in range(z1, z2) :
+                for zb in range(za + 1, z2 + 1) :
+                    for net_id in bucket_dict.get((za, zb), ()) :
+                        sx, sy, sz, ex, ey, ez = net_coord_list[net_id]
+                        id1, id2 = self._terminal_pair_list[net_id]
+                        if not self._is_reachable(id1, self.node_id(vx, vy, sz)) :
+                            continue
+                        if not self._is_reachable(id2, self.node_id(vx, vy, ez)) :
+                            continue
+                        net_list.append(net_id)
+                        self._nv_dist_list[net_id][via_id] = (abs(sx - vx) + abs(sy - vy),
+                                                              abs(ex - vx) + abs(ey - vy))
+            # 線分番号順に並べておく．
+            net_list.sort()
+            for net_id in net_list :
+                self._net_via_list[net_id].append(via_id)
             self._via_net_list[via_id] = net_list
 
+        # 各領域を通りうる線分を求める．
+        self._make_region_nets()
+
 
     ## @brief 問題の幅
     @property
@@ -332,22 +406,59 @@ class NlGraph :
         return self._via_num
 
 
+    ## @brief 節点数
+    @property
+    def node_num(self) :
+        return self._node_num
+
+
+    ## @brief 枝数
+    @property
+    def edge_num(self) :
+        return len(self._edge_node1_array)
+
+
     ## @brief ノードのリスト
+    #
+    # 最初に呼ばれた時に作る．
     @property
     def node_list(self) :
+        if self._node_list is None :
+            width = self._width
+            height = self._height
+            depth = self._depth
+            self._node_list = [NlNode(self, (x * height + y) * depth + z, x, y, z) \
+                               for x in range(0, width) \
+                               for y in range(0, height) \
+                               for z in range(0, depth)]
         return self._node_list
 
 
     ## @brief 枝のリスト
+    #
+    # 最初に呼ばれた時に作る．
     @property
     def edge_list(self) :
+        if self._edge_list is None :
+            node_list = self.node_list
+            self._edge_list = [NlEdge(edge_id, node_list[id1], node_list[id2]) \
+                               for edge_id, (id1, id2) in enumerate(zip(self._edge_node1_array,
+                                                                        self._edge_node2_array))]
         return self._edge_list
 
 
     ## @brief 端点のノード対を返す．
     # @param[in] net_id 線分番号
     def terminal_node_pair(self, net_id) :
-        return self._terminal_node_pair_list[net_id]
+        id1, id2 = self._terminal_pair_list[net_id]
+        node_list = self.node_list
+        return node_list[id1], node_list[id2]
+
+
+    ## @brief 端点の節点の ID番号の対を返す．
+    # @param[in] net_id 線分番号
+    def terminal_id_pair(self, net_id) :
+        return self._terminal_pair_list[net_id]
 
 
     ## @brief ネットに関係するビア番号のリストを返す．
@@ -356,10 +467,22 @@ class NlGraph :
         return self._net_via_list[net_id]
 
 
+    ## @brief ビアと線分の終端の X-Y 平面上の距離を返す．
+    # @param[in] net_id 線分番号
+    # @param[in] via_id ビア番号
+    # @return 2つの終端からビアまでのマンハッタン距離の対を返す．
+    #
+    # via_id は net_via_list(net_id) に含まれていなければならない．
+    # 2つの距離の和はこのビアを使った経路の長さの下限になる．
+    def via_net_distance(self, net_id, via_id) :
+        return self._nv_dist_list[net_id][via_id]
+
+
     ## @brief ビアのノードリストを返す．
     # @param[in] via_id ビア番号
     def via_node_list(self, via_id) :
-        return self._via_nodes_list[via_id]
+        node_list = self.node_list
+        return [node_list[node_id] for node_id in self._via_ids_list[via_id]]
 
 
     ## @brief ビアに関係する線分番号のリストを返す．
@@ -371,45 +494,216 @@ class NlGraph :
     ## @brief 座標を指定して対応するノードを返す．
     # @param[in] x, y, z 座標
     def node(self, x, y, z) :
-        return self._node_array[x][y][z]
-
-
-    ## @brief 枝を作る．
-    # @param[in] node1, node2 両端の節点
-    # @param[in] horizontal 水平方向の枝のとき True にする．
-    def _new_edge(self, node1, node2, horizontal) :
-        id = len(self._edge_list)
-        edge = NlEdge(id, node1, node2)
-        self._edge_list.append(edge)
-        if horizontal :
-            dir1 = 0
-            dir2 = 1
-        else :
-            dir1 = 3
-            dir2 = 4
-        node1.add_edge(edge, dir1)
-        node2.add_edge(edge, dir2)
+        return self.node_list[self.node_id(x, y, z)]
 
 
-    ## @brief ノードを作る．
+    ## @brief 座標から節点の ID番号を求める．
     # @param[in] x, y, z 座標
+    def node_id(self, x, y, z) :
+        return (x * self._height + y) * self._depth + z
+
+
+    ## @brief 節点の ID番号から座標を求める．
+    # @param[in] node_id 節点の ID番号
+    # @return (x, y, z) のタプルを返す．
+    def node_coord(self, node_id) :
+        xy, z = divmod(node_id, self._depth)
+        x, y = divmod(xy, self._height)
+        return x, y, z
+
+
+    ## @brief 節点に接続している枝の ID番号のリストを返す．
+    # @param[in] node_id 節点の ID番号
     #
-    # 結果を self._node_list に入れる．
-    def _new_node(self, x, y, z) :
-        id = len(self._node_list)
-        node = NlNode(id, x, y, z)
-        self._node_list.append(node)
+    # 順番は左，右，上，下
+    def node_edge_ids(self, node_id) :
+        base = node_id * 4
+        adj_edge = self._adj_edge_array
+        return [edge_id for edge_id in (adj_edge[base + DIR_LEFT], adj_edge[base + DIR_RIGHT],
+                                        adj_edge[base + DIR_UPPER], adj_edge[base + DIR_LOWER]) \
+                if edge_id >= 0]
+
+
+    ## @brief 隣接する節点の ID番号の配列(節点ごとに4要素)
+    @property
+    def adj_node_array(self) :
+        return self._adj_node_array
+
+
+    ## @brief 隣接する枝の ID番号の配列(節点ごとに4要素)
+    @property
+    def adj_edge_array(self) :
+        return self._adj_edge_array
+
+
+    ## @brief 枝の一方の節点の ID番号の配列
+    @property
+    def edge_node1_array(self) :
+        return self._edge_node1_array
+
+
+    ## @brief 枝のもう一方の節点の ID番号の配列
+    @property
+    def edge_node2_array(self) :
+        return self._edge_node2_array
+
 
-        return node
+    ## @brief 節点ごとの終端の線分番号の配列(終端でなければ -1)
+    @property
+    def terminal_id_array(self) :
+        return self._terminal_id_array
+
+
+    ## @brief 節点ごとのビア番号の配列(ビアでなければ -1)
+    @property
+    def via_id_array(self) :
+        return self._via_id_array
+
+
+    ## @brief 節点ごとの終端かビアの時 1 となる配列
+    @property
+    def block_array(self) :
+        return self._block_array
+
+
+    ## @brief ノードの属する領域番号を返す．
+    # @param[in] node 対象のノード
+    #
+    # 領域は同じ層の空きマス(終端でもビアでもないマス)の連結成分で，
+    # 終端とビアのノードの場合は -1 を返す．
+    def region_id(self, node) :
+        return self._region_array[node.id]
+
+
+    ## @brief 節点を通りうる線分番号のリストを返す．
+    # @param[in] node_id 節点の ID番号
+    #
+    # 幾何的な到達可能性だけから求めたもので，
+    # 解において node_id を通る線分は必ずこのリストに含まれる．
+    # - 終端の場合: その終端の線分のみ
+    # - ビアの場合: そのビアを使うことができて，この層に終端を持つ線分
+    # - 空きマスの場合: 属する領域を通りうる線分(_make_region_nets() を参照)
+    # 空きマスの場合，同じ領域の節点は同じリストを共有するので
+    # 内容を変更してはいけない．
+    def node_net_list(self, node_id) :
+        terminal_id = self._terminal_id_array[node_id]
+        if terminal_id >= 0 :
+            return [terminal_id]
+        via_id = self._via_id_array[node_id]
+        if via_id >= 0 :
+            z = node_id % self._depth
+            return [net_id for net_id in self._via_net_list[via_id] \
+                    if z in (self._terminal_pair_list[net_id][0] % self._depth,
+                             self._terminal_pair_list[net_id][1] % self._depth)]
+        return self._region_net_list[self._region_array[node_id]]
+
+
+    ## @brief 節点から dir 方向の枝を返す．
+    #
+    # なければ None を返す．
+    def _edge_view(self, node_id, dir) :
+        edge_id = self._adj_edge_array[node_id * 4 + dir]
+        if edge_id < 0 :
+            return None
+        if self._edge_list is None :
+            self.edge_list
+        return self._edge_list[edge_id]
+
+
+    ## @brief 各層の空きマスを連結成分に分けて領域番号をつける．
+    #
+    # 結果は self._region_array に入れる．
+    def _make_regions(self) :
+        block_array = self._block_array
+        adj_node = self._adj_node_array
+        region_array = array('i', [-1]) * self._node_num
+        region_num = 0
+        for node_id in range(0, self._node_num) :
+            if block_array[node_id] or region_array[node_id] != -1 :
+                continue
+            # node_id から幅優先探索を行う．
+            region_array[node_id] = region_num
+            queue = [node_id]
+            for id1 in queue :
+                for id2 in adj_node[id1 * 4:id1 * 4 + 4] :
+                    if id2 < 0 or block_array[id2] or region_array[id2] != -1 :
+                        continue
+                    region_array[id2] = region_num
+                    queue.append(id2)
+            region_num += 1
+        self._region_array = region_array
+        self._region_num = region_num
+
+
+    ## @brief 各領域を通りうる線分番号のリストを求める．
+    #
+    # 線分の経路は終端とビアの節点で区切ると，同じ層の空きマスだけを通る
+    # 区間に分かれる．区間の両端は終端かビアの節点なので，
+    # 区間の通る領域は両端の節点の両方に隣接していなければならない．
+    # 区間は以下のもの
+    # - 2つの終端が同じ層にある場合: 終端から終端まで
+    # - そうでない場合: net_via_list() の各ビアについて
+    #   それぞれの終端から同じ層のビアの節点まで
+    #
+    # 結果は self._region_net_list に入れる．
+    def _make_region_nets(self) :
+        adj_node = self._adj_node_array
+        region_array = self._region_array
+
+        # 節点に隣接する領域番号の集合を返す．
+        def adj_regions(node_id) :
+            return set(region_array[id1] for id1 in adj_node[node_id * 4:node_id * 4 + 4] \
+                       if id1 >= 0 and region_array[id1] >= 0)
+
+        region_net_list = [[] for region in range(0, self._region_num)]
+        for net_id in range(0, self._net_num) :
+            id1, id2 = self._terminal_pair_list[net_id]
+            z1 = id1 % self._depth
+            z2 = id2 % self._depth
+            if z1 == z2 :
+                segment_list = [(id1, id2)]
+            else :
+                segment_list = []
+                for via_id in self._net_via_list[net_id] :
+                    via_ids = self._via_ids_list[via_id]
+                    base = via_ids[0] - (via_ids[0] % self._depth)
+                    segment_list.append((id1, base + z1))
+                    segment_list.append((base + z2, id2))
+            region_set = set()
+            for id_a, id_b in segment_list :
+                region_set |= adj_regions(id_a) & adj_regions(id_b)
+            for region in region_set :
+                region_net_list[region].append(net_id)
+        self._region_net_list = region_net_list
+
+
+    ## @brief 同じ層の2つの節点が空きマスを通ってつながりうる時 True を返す．
+    # @param[in] id1, id2 対象の節点の ID番号
+    #
+    # 隣接しているか，隣接する空きマスの領域に共通なものがあればよい．
+    def _is_reachable(self, id1, id2) :
+        adj_node = self._adj_node_array
+        region_array = self._region_array
+        neighbors1 = [node_id for node_id in adj_node[id1 * 4:id1 * 4 + 4] if node_id >= 0]
+        if id2 in neighbors1 :
+            return True
+        region_set = set(region_array[node_id] for node_id in neighbors1)
+        for node_id in adj_node[id2 * 4:id2 * 4 + 4] :
+            if node_id < 0 :
+                continue
+            region = region_array[node_id]
+            if region != -1 and region in region_set :
+                return True
+        return False
 
 
     ## @brief 内容を出力する．
     def dump(self) :
         print('Nodes:')
-        for node in self._node_list :
+        for node in self.node_list :
             print(node.str())
 
         print('')
         print('Edges:')
-        for edge in self._edge_list :
+        for edge in self.edge_list :
             print(edge.str())
@@ -21,6 +21,9 @@
 # という風に使う．
 class NlPoint :
 
+    # 大量に作られるので __dict__ を持たないようにする．
+    __slots__ = ('_x', '_y', '_z')
+
     ## @brief 初期化
     # @param x, y, z 座標の値
     def __init__(self, x = 0, y = 0, z = 0) :
@@ -204,6 +204,20 @@ class NlProblem :
         else :
             return None
 
+    ## @brief ADC2016 フォーマットで内容を出力する．
+    # @param[in] fout 出力先のファイルオブジェクト
+    #
+    # 層番号は1から始まる番号に直して出力する．
+    def print(self, fout) :
+        print('SIZE {}X{}X{}'.format(self.width, self.height, self.depth), file=fout)
+        print('LINE_NUM {}'.format(self.net_num), file=fout)
+        for label, start_point, end_point in self.net_list() :
+            print('LINE#{} ({},{},{}) ({},{},{})'.format(label, start_point.x, start_point.y, start_point.z + 1, end_point.x, end_point.y, end_point.z + 1), file=fout)
+        for via in self.via_list() :
+            pos_list = ['({},{},{})'.format(via.x, via.y, z + 1) for z in range(via.z1, via.z2 + 1)]
+            print('VIA#{} {}'.format(via.label, ' '.join(pos_list)), file=fout)
+
+
     ## @brief 内容を書き出す．
     #
     # 主にデバッグ用
@@ -7,10 +7,23 @@
 # Copyright (C) 2017 Yusuke Matsunaga
 # All rights reserved.
 
+from array import array
 from nl3d.nlgraph import NlNode, NlGraph
 
+try :
+    import numpy
+except ImportError :
+    # numpy がなくても動くようにしておく．
+    numpy = None
+
+
 ## @brief 解を表すクラス
 #
+# 各マス目の線分番号を int16 の連続した配列で保持する．
+# numpy がある場合は (width, height, depth) の形の numpy.ndarray，
+# ない場合は array('h') を用いる．
+# どちらの場合もマス目 (x, y, z) の値は平坦化した配列の
+# (x * height + y) * depth + z 番目となり，NlGraph の節点の ID番号と一致する．
 class NlSolution :
 
     ## @brief 初期化
@@ -18,7 +31,7 @@ class NlSolution :
         self._width = 0
         self._height = 0
         self._depth = 0
-        self._grid_array = []
+        self._grid_array = self._new_array()
 
 
     ## @brief グラフと経路リストから内容を設定する．
@@ -30,13 +43,58 @@ class NlSolution :
         self.set_size(graph.width, graph.height, graph.depth)
 
         # 経路上のマス目に線分番号を書き込む．
+        flat = self._flat_array()
         for net_id in range(0, graph.net_num) :
             route = route_list[net_id]
             for node in route :
-                x = node.x
-                y = node.y
-                z = node.z
-                self._grid_array[x][y][z] = net_id + 1
+                flat[node.id] = net_id + 1
+
+
+    ## @brief 節点ごとの値から内容を設定する．
+    # @param[in] graph 問題を表すグラフ
+    # @param[in] val_array 節点の ID番号順に値を並べた配列
+    #
+    # 値はまとめてコピーする．
+    def set_from_node_array(self, graph, val_array) :
+        self.set_size(graph.width, graph.height, graph.depth)
+        n = self._width * self._height * self._depth
+        assert len(val_array) == n
+        if numpy is not None :
+            self._flat_array()[:] = val_array
+        else :
+            self._grid_array = array('h', val_array)
+
+
+    ## @brief 値を格納した配列をそのまま設定する．
+    # @param[in] width 幅
+    # @param[in] height 高さ
+    # @param[in] depth 層数
+    # @param[in] grid_array 値の配列
+    #
+    # grid_array は numpy がある場合は (width, height, depth) の形の
+    # int16 の numpy.ndarray，ない場合は array('h') とする．
+    # grid_array はコピーせずにそのまま保持する．
+    def set_grid_array(self, width, height, depth, grid_array) :
+        if numpy is not None :
+            assert grid_array.shape == (width, height, depth)
+            assert grid_array.dtype == numpy.int16
+        else :
+            assert grid_array.typecode == 'h'
+            assert len(grid_array) == width * height * depth
+        self._width = width
+        self._height = height
+        self._depth = depth
+        self._grid_array = grid_array
+
+
+    ## @brief 節点の ID番号順に値を並べた配列を返す．
+    #
+    # 内容はコピーなので変更しても解には影響しない．
+    def node_array(self) :
+        if numpy is not None :
+            return self._grid_array.reshape(-1).copy()
+        else :
+            return array('h', self._grid_array)
 
 
     ## @brief サイズを設定する．
@@ -48,39 +106,150 @@ class NlSolution :
         self._height = height
         self._depth = depth
 
-        # 各マス目の線分番号を格納する３次元配列を作る．
+        # 各マス目の線分番号を格納する配列を作る．
         # 値は 0 に初期化される．
-        self._grid_array = [[[0 for z in range(0, self._depth)]\
-                             for y in range(0, self._height)]\
-                            for x in range(0, self._width)]
+        self._grid_array = self._new_array()
+
+
+    ## @brief 幅を返す．
+    @property
+    def width(self) :
+        return self._width
+
+
+    ## @brief 高さを返す．
+    @property
+    def height(self) :
+        return self._height
+
+
+    ## @brief 層数を返す．
+    @property
+    def depth(self) :
+        return self._depth
 
 
     ## @brief マス目の値を設定する．
     # @param[in] x, y, z 座標
     # @param[in] val 値
     def set_val(self, x, y, z, val) :
-        assert 0 <= x < self._width
-        assert 0 <= y < self._height
-        assert 0 <= z < self._depth
-        self._grid_array[x][y][z] = val
+        assert 0 <= x < self._width and 0 <= y < self._height and 0 <= z < self._depth
+        if numpy is not None :
+            self._grid_array[x, y, z] = val
+        else :
+            self._grid_array[(x * self._height + y) * self._depth + z] = val
 
 
     ## @brief 値を得る．
     def val(self, x, y, z) :
-        return self._grid_array[x][y][z]
+        if numpy is not None :
+            return int(self._grid_array[x, y, z])
+        else :
+            return self._grid_array[(x * self._height + y) * self._depth + z]
+
+
+    ## @brief 1行分の値をまとめて設定する．
+    # @param[in] y, z 行の座標
+    # @param[in] val_list x 座標の順に並べた値のリスト
+    def set_row(self, y, z, val_list) :
+        assert 0 <= y < self._height and 0 <= z < self._depth
+        assert len(val_list) == self._width
+        if numpy is not None :
+            self._grid_array[:, y, z] = val_list
+        else :
+            hd = self._height * self._depth
+            self._grid_array[y * self._depth + z::hd] = array('h', val_list)
+
+
+    ## @brief 1層分の値をまとめて設定する．
+    # @param[in] z 層番号
+    # @param[in] val_array y 座標，x 座標の順に並べた値の配列
+    #
+    # 要素数は width * height で，ファイルに書かれている順と同じになる．
+    def set_layer(self, z, val_array) :
+        assert 0 <= z < self._depth
+        width = self._width
+        height = self._height
+        assert len(val_array) == width * height
+        if numpy is not None :
+            self._grid_array[:, :, z] = numpy.asarray(val_array).reshape(height, width).T
+        else :
+            depth = self._depth
+            grid = self._grid_array
+            for y in range(0, height) :
+                grid[y * depth + z::height * depth] = array('h', val_array[y * width:(y + 1) * width])
+
+
+    ## @brief 1行分の値を x 座標の順に並べたリストを返す．
+    # @param[in] y, z 行の座標
+    def row(self, y, z) :
+        if numpy is not None :
+            return self._grid_array[:, y, z].tolist()
+        else :
+            hd = self._height * self._depth
+            return self._grid_array[y * self._depth + z::hd].tolist()
+
+
+    ## @brief 内容が等しいか調べる．
+    # @param[in] other 比較対象の解
+    #
+    # サイズとすべてのマス目の値が等しい時に True となる．
+    # == 演算子は定義しない(従来通りオブジェクトの同一性で比較し，
+    # 集合や辞書のキーとしても用いることができる)．
+    def equals(self, other) :
+        if not isinstance(other, NlSolution) :
+            return False
+        if (self._width, self._height, self._depth) != (other._width, other._height, other._depth) :
+            return False
+        if numpy is not None :
+            return bool(numpy.array_equal(self._grid_array, other._grid_array))
+        else :
+            return self._grid_array == other._grid_array
 
 
     ## @brief 内容を出力する．
     # @param[in] fout 出力先のファイルオブジェクト
+    #
+    # 値を文字列に変換する表を作っておき，1行ずつまとめて変換する．
+    # 表にない値(負の値など)はそのまま文字列に変換する．
     def print(self, fout) :
-        print('SIZE {}X{}X{}'.format(self._width, self._height, self._depth), file=fout)
-        for z in range(0, self._depth) :
-            print('LAYER {}'.format(z + 1), file=fout)
-            for y in range(0, self._height) :
-                line = ''
-                comma = ''
-                for x in range(0, self._width) :
-                    line += comma
-                    comma = ','
-                    line += '{:02d}'.format(self._grid_array[x][y][z])
-                print(line, file=fout)
+        width = self._width
+        height = self._height
+        depth = self._depth
+        if numpy is not None :
+            max_val = int(self._grid_array.max()) if self._grid_array.size > 0 else 0
+        else :
+            max_val = max(self._grid_array, default = 0)
+        str_table = ['{:02d}'.format(val) for val in range(0, max_val + 1)]
+        table_size = len(str_table)
+        line_list = ['SIZE {}X{}X{}\n'.format(width, height, depth)]
+        for z in range(0, depth) :
+            line_list.append('LAYER {}\n'.format(z + 1))
+            if numpy is not None :
+                # (height, width) の形の値のリスト
+                row_list = self._grid_array[:, :, z].T.tolist()
+            else :
+                hd = height * depth
+                row_list = [self._grid_array[y * depth + z::hd].tolist() for y in range(0, height)]
+            for row in row_list :
+                line_list.append(','.join([str_table[val] if 0 <= val < table_size else str(val) for val in row]))
+                line_list.append('\n')
+        fout.write(''.join(line_list))
+
+
+    ## @brief 現在のサイズの 0 に初期化された配列を作る．
+    def _new_array(self) :
+        if numpy is not None :
+            return numpy.zeros((self._width, self._height, self._depth), dtype = numpy.int16)
+        else :
+            return array('h', bytes(2 * self._width * self._height * self._depth))
+
+
+    ## @brief 平坦化した配列を返す．
+    #
+    # numpy の場合は内容を共有したビューを返す．
+    def _flat_array(self) :
+        if numpy is not None :
+            return self._grid_array.reshape(-1)
+        else :
+            return self._grid_array
@@ -7,26 +7,84 @@
 # Copyright (C) 2017 Yusuke Matsunaga
 # All rights reserved.
 
+import time
 from nl3d.nlgraph import NlNode, NlEdge, NlGraph
 from nl3d.nlcnfencoder import NlCnfEncoder
 from nl3d.nlsolution import NlSolution
 from nl3d.sat.satsolver import SatSolver
 from nl3d.sat.satbool3 import SatBool3
+from nl3d.sat.satlimit import SatLimit
 
 ## @brief 問題を表すCNF式を生成する．
 # @param[in] graph 問題を表すグラフ(NlGraph)
+# @param[in] satprog SATソルバのプログラム名
+# @param[in] backend SATソルバのバックエンド
+# @param[in] time_limit 制限時間(秒)
+# @param[in] mem_limit SATソルバのメモリの上限(MB)
+# @param[in] cancel 中断要求を表す threading.Event
+# @param[in] detour_len 禁止する回り道の長さの最大値
+# @param[in] lazy 閉路と回り道の制約を必要な分だけ追加しながら解く時 True にする．
+# @param[in] stats 統計情報を格納する辞書
+# @param[in] label_encoding 節点のラベルの符号化方法
+# @param[in] prune_domain 到達できない枝やラベルの値を除いておく時 True にする．
 # @return status, solution のタプルを返す．
 #
 # status は "OK", "NG", "Abort" のいずれか
 # solution は "OK" の時は NlSolution のオブジェクト
 # それ以外は None
-def solve_nlink(graph) :
-
-    status, solution = plan_A(graph)
+#
+# backend については nl3d.sat.satsolver.new_backend() を参照のこと．
+# time_limit は plan_A と plan_B を合わせた時間で，
+# これを超えるか中断要求があった場合は "Abort" となる．
+# detour_len については NlCnfEncoder.make_detour_constraint() を参照のこと．
+# label_encoding については nl3d.nlcnfencoder.LABEL_ENCODING_LIST を参照のこと．
+# prune_domain については NlCnfEncoder を参照のこと．
+# False にすると枝やラベルの値を除かない従来の CNF 式となる．
+#
+# CNF 式は一度だけ作り，全マス使用制約を選択用の変数で切り替える．
+# plan_A ではこの変数を真に，plan_B では偽に仮定して同じ SATソルバで解く．
+# インクリメンタルなバックエンドでは plan_A の探索結果が plan_B で再利用される．
+#
+# lazy が False の場合は回り道の制約を最初にすべて作ってから解く．
+# lazy が True の場合は基本的な制約だけで解き，得られた解の中の
+# 孤立した閉路と回り道を禁止する節だけを追加して解き直すことを
+# 違反がなくなるまで繰り返す．
+# plan_A で追加した節は plan_B でもそのまま用いる．
+#
+# stats に辞書を与えると stats['plan_A'], stats['plan_B'] に
+# それぞれの統計情報(内容は plan_A() を参照)を格納する．
+# plan_B を実行しなかった場合 stats['plan_B'] は空となる．
+# CNF 式の生成時間は stats['plan_A'] の encode_time に含まれ，
+# stats['plan_B'] の encode_time は 0 となる．
+def solve_nlink(graph, satprog = 'minisat_static', backend = 'dimacs',
+                time_limit = None, mem_limit = None, cancel = None, detour_len = 3,
+                lazy = False, stats = None, label_encoding = 'binary', prune_domain = True) :
+
+    limit = SatLimit(time_limit, None, cancel)
+    stats_A = None
+    stats_B = None
+    if stats is not None :
+        stats_A = stats['plan_A'] = {}
+        stats_B = stats['plan_B'] = {}
+
+    start = time.perf_counter()
+    enc, solver, slack_var = _encode(graph, satprog, backend, detour_len, lazy,
+                                     label_encoding, prune_domain)
+    encode_time = time.perf_counter() - start
+
+    status, solution = _solve_plan(enc, solver, slack_var, detour_len, lazy,
+                                   limit.remaining_time(), mem_limit, cancel, stats_A)
+    if stats_A is not None :
+        stats_A['encode_time'] = encode_time
     if status == "OK" :
         return status, solution
+    if status == "Abort" and limit.expired() :
+        return status, None
 
-    status, solution = plan_B(graph)
+    status, solution = _solve_plan(enc, solver, -slack_var, detour_len, lazy,
+                                   limit.remaining_time(), mem_limit, cancel, stats_B)
+    if stats_B is not None :
+        stats_B['encode_time'] = 0.0
     if status == "OK" :
         return status, solution
 
@@ -34,52 +92,94 @@ def solve_nlink(graph) :
 
 
 ## @brief 最も簡単な戦略
-def plan_A(graph) :
-
-    solver = SatSolver('minisat_static')
-
-    # 問題を表す CNF式を生成する．
-    enc = NlCnfEncoder(graph, solver)
+#
+# 全マス使用制約を入れて解く．
+# 引数は solve_nlink() と同じ．
+# stats に辞書を与えると以下の統計情報を格納する．
+# - iterations: SAT問題を解いた回数
+# - initial_clauses: 最初に解いた時の節の数
+# - final_clauses: 最後に解いた時の節の数
+# - cycle_clauses: 追加した閉路を禁止する節の数
+# - detour_clauses: 追加した回り道を禁止する節の数
+# - clause_growth: 各回に追加した節の数のリスト
+# - result: 最後に解いた時の結果(SatBool3)
+# - encode_time: 最初の CNF 式の生成時間(秒)
+# - solve_time: 解き直しを含めた残りの時間(秒)
+def plan_A(graph, satprog = 'minisat_static', backend = 'dimacs',
+           time_limit = None, mem_limit = None, cancel = None, detour_len = 3,
+           lazy = False, stats = None, label_encoding = 'binary', prune_domain = True) :
+    return _plan(graph, True, satprog, backend, time_limit, mem_limit, cancel,
+                 detour_len, lazy, stats, label_encoding, prune_domain)
 
-    enc.make_base_constraint(True)
-    enc.make_ushape_constraint()
-    enc.make_wshape_constraint()
-    enc.make_w2shape_constraint()
 
-    # SAT問題を解く．
-    result, model = solver.solve()
+## @brief 最も簡単な戦略
+#
+# 全マス使用制約を入れずに解く．
+# 引数は solve_nlink() と同じ．
+def plan_B(graph, satprog = 'minisat_static', backend = 'dimacs',
+           time_limit = None, mem_limit = None, cancel = None, detour_len = 3,
+           lazy = False, stats = None, label_encoding = 'binary', prune_domain = True) :
+    return _plan(graph, False, satprog, backend, time_limit, mem_limit, cancel,
+                 detour_len, lazy, stats, label_encoding, prune_domain)
 
-    if result == SatBool3.B3True :
-        # 解けた．
 
-        # SATモデルから解を作る．
-        solution = enc.model_to_solution(model)
-        return "OK", solution
-
-    elif result == SatBool3.B3False :
-        # 解けなかった．
-        return "NG", None
-
-    elif result == SatBool3.B3X :
-        # アボートした．
-        return "Abort", None
+## @brief plan_A(), plan_B() の本体
+# @param[in] no_slack 全マス使用制約を入れる時 True にする．
+#
+# 残りの引数は solve_nlink() と同じ．
+def _plan(graph, no_slack, satprog, backend, time_limit, mem_limit, cancel,
+          detour_len, lazy, stats, label_encoding, prune_domain) :
+    start = time.perf_counter()
+    enc, solver, slack_var = _encode(graph, satprog, backend, detour_len, lazy,
+                                     label_encoding, prune_domain)
+    encode_time = time.perf_counter() - start
+
+    status, solution = _solve_plan(enc, solver, slack_var if no_slack else -slack_var,
+                                   detour_len, lazy, time_limit, mem_limit, cancel, stats)
+    if stats is not None :
+        stats['encode_time'] = encode_time
+    return status, solution
+
+
+## @brief 問題を表す CNF 式を作る．
+# @return enc, solver, slack_var のタプルを返す．
+#
+# enc は NlCnfEncoder，solver は SatSolver で，
+# slack_var は真の時に全マス使用制約が有効になる変数
+# 引数は solve_nlink() と同じ．
+def _encode(graph, satprog, backend, detour_len, lazy, label_encoding, prune_domain) :
+    solver = SatSolver(satprog, backend)
 
+    # 問題を表す CNF式を生成する．
+    # prune_domain が True の場合は到達可能性から使われないことのわかる
+    # 枝やラベルの値は除いておく．
+    enc = NlCnfEncoder(graph, solver, prune_domain = prune_domain, label_encoding = label_encoding)
 
-## @brief 最も簡単な戦略
-def plan_B(graph) :
+    enc.make_base_constraint(False)
+    slack_var = solver.new_variable()
+    enc.make_no_slack_constraint(slack_var)
+    if not lazy :
+        enc.make_detour_constraint(detour_len)
 
-    solver = SatSolver('minisat_static')
+    return enc, solver, slack_var
 
-    # 問題を表す CNF式を生成する．
-    enc = NlCnfEncoder(graph, solver)
 
-    enc.make_base_constraint(False)
-    enc.make_ushape_constraint()
-    enc.make_wshape_constraint()
-    enc.make_w2shape_constraint()
+## @brief _encode() で作った CNF 式を解いて結果を返す．
+# @param[in] enc CNF 式を作った NlCnfEncoder
+# @param[in] solver SATソルバ
+# @param[in] slack_lit 全マス使用制約を切り替える変数に対する仮定
+# @return status, solution のタプルを返す．
+#
+# 残りの引数と返り値は solve_nlink() と同じ．
+# stats には encode_time 以外の統計情報を格納する．
+def _solve_plan(enc, solver, slack_lit, detour_len, lazy, time_limit, mem_limit, cancel, stats) :
+    start = time.perf_counter()
 
     # SAT問題を解く．
-    result, model = solver.solve()
+    result, model = _solve_cnf(enc, solver, [slack_lit], detour_len, lazy,
+                               time_limit, mem_limit, cancel, stats)
+    if stats is not None :
+        stats['solve_time'] = time.perf_counter() - start
 
     if result == SatBool3.B3True :
         # 解けた．
@@ -95,3 +195,51 @@ def plan_B(graph) :
     elif result == SatBool3.B3X :
         # アボートした．
         return "Abort", None
+
+
+## @brief _encode() で作った CNF 式を解く．
+# @param[in] enc CNF 式を作った NlCnfEncoder
+# @param[in] solver SATソルバ
+# @param[in] assumption_list 仮定する割り当てリスト
+# @param[in] detour_len 禁止する回り道の長さの最大値
+# @param[in] lazy 違反した制約を追加しながら解き直す時 True にする．
+# @param[in] stats 統計情報を格納する辞書(None の場合は何もしない)
+# @return result, model のタプルを返す．
+#
+# 残りの引数は solve_nlink() と同じ．
+def _solve_cnf(enc, solver, assumption_list, detour_len, lazy, time_limit, mem_limit, cancel, stats) :
+    limit = SatLimit(time_limit, None, cancel)
+    initial_clauses = solver.clause_num
+    iterations = 0
+    cycle_clauses = 0
+    detour_clauses = 0
+    clause_growth = []
+    while True :
+        iterations += 1
+        result, model = solver.solve(assumption_list, limit.remaining_time(), mem_limit, cancel)
+        if not lazy or result != SatBool3.B3True :
+            break
+
+        # 違反している制約を調べる．
+        cycle_list = enc.cycle_clauses(model)
+        detour_list = enc.violated_detour_clauses(model, detour_len)
+        if not cycle_list and not detour_list :
+            break
+
+        clause_num = solver.clause_num
+        solver.add_clauses(cycle_list)
+        for clauses in detour_list :
+            solver.add_clauses(clauses)
+        cycle_clauses += len(cycle_list)
+        detour_clauses += solver.clause_num - clause_num - len(cycle_list)
+        clause_growth.append(solver.clause_num - clause_num)
+
+    if stats is not None :
+        stats['iterations'] = iterations
+        stats['initial_clauses'] = initial_clauses
+        stats['final_clauses'] = solver.clause_num
+        stats['cycle_clauses'] = cycle_clauses
+        stats['detour_clauses'] = detour_clauses
+        stats['clause_growth'] = clause_growth
+        stats['result'] = result
+    return result, model
@@ -24,6 +24,9 @@
 # という風に使う．
 class NlVia :
 
+    # 大量に作られるので __dict__ を持たないようにする．
+    __slots__ = ('_label', '_x', '_y', '_z1', '_z2')
+
     ## @brief 初期化
     # @param[in] label ラベル
     # @param[in] x X座標
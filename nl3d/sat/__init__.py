@@ -9,3 +9,14 @@
 
 from nl3d.sat.satsolver import SatSolver
 from nl3d.sat.satbool3 import SatBool3
+from nl3d.sat.satmodel import SatModel
+from nl3d.sat.clausestore import ClauseStore
+from nl3d.sat.clausefolder import ClauseFolder
+from nl3d.sat.satlimit import SatLimit
+from nl3d.sat.satpreprocessor import SatPreprocessor
+from nl3d.sat.satbackend import SatBackend
+from nl3d.sat.dimacsbackend import DimacsBackend
+from nl3d.sat.cdclbackend import CdclBackend
+from nl3d.sat.ipasirbackend import IpasirBackend
+from nl3d.sat.portfoliobackend import PortfolioBackend
+from nl3d.sat.cdclsolver import CdclSolver
@@ -0,0 +1,246 @@
+#! /usr/bin/env python3
+
+## @file cardinality.py
+# @brief 個数制約(cardinality constraint)を CNF 式で表す関数群
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+#
+# solver には new_variable() と add_clause() を持つオブジェクト
+# (通常は SatSolver)を与える．
+# encoding には以下のものを指定できる．
+# - 'pairwise':   補助変数を使わない素朴な方法．節数は O(n^2)
+# - 'sequential': Sinz の sequential counter．補助変数 O(n)，節数 O(n)
+# - 'commander':  Klieber と Kwon の commander encoding．補助変数 O(n)，節数 O(n)
+# - 'product':    Chen の product encoding．補助変数 O(sqrt(n))，節数 O(n)
+# - 'auto':       要素数に応じて上記から選ぶ．
+#
+# at-most-k の制約は 'pairwise' と 'sequential' のみをサポートする．
+
+
+import math
+
+
+## @brief 'auto' で pairwise を用いる最大の要素数
+PAIRWISE_LIMIT = 6
+
+## @brief 'auto' で product を用いる最小の要素数
+PRODUCT_LIMIT = 64
+
+## @brief commander encoding のグループの大きさ
+_COMMANDER_GROUP = 3
+
+
+## @brief 要素数から at-most-one の符号化方法を選ぶ．
+# @param[in] n 要素数
+def select_encoding(n) :
+    if n <= PAIRWISE_LIMIT :
+        return 'pairwise'
+    elif n < PRODUCT_LIMIT :
+        return 'sequential'
+    else :
+        return 'product'
+
+
+## @brief リストの中のリテラルが高々1つ True となる制約を作る．
+# @param[in] solver SATソルバ
+# @param[in] lit_list 対象のリテラルのリスト
+# @param[in] encoding 符号化方法
+def add_at_most_one(solver, lit_list, encoding = 'auto') :
+    n = len(lit_list)
+    if n <= 1 :
+        return
+    if encoding == 'auto' :
+        encoding = select_encoding(n)
+
+    if encoding == 'pairwise' or n == 2 :
+        _amo_pairwise(solver, lit_list)
+    elif encoding == 'sequential' :
+        _amo_sequential(solver, lit_list)
+    elif encoding == 'commander' :
+        _amo_commander(solver, lit_list)
+    elif encoding == 'product' :
+        _amo_product(solver, lit_list)
+    else :
+        raise ValueError('{}: unknown encoding'.format(encoding))
+
+
+## @brief リストの中のリテラルが少なくとも1つ True となる制約を作る．
+# @param[in] solver SATソルバ
+# @param[in] lit_list 対象のリテラルのリスト
+def add_at_least_one(solver, lit_list) :
+    solver.add_clause(list(lit_list))
+
+
+## @brief リストの中のリテラルが1つだけ True となる制約を作る．
+# @param[in] solver SATソルバ
+# @param[in] lit_list 対象のリテラルのリスト
+# @param[in] encoding at-most-one の符号化方法
+def add_exactly_one(solver, lit_list, encoding = 'auto') :
+    add_at_most_one(solver, lit_list, encoding)
+    add_at_least_one(solver, lit_list)
+
+
+## @brief リストの中のリテラルが高々 k 個 True となる制約を作る．
+# @param[in] solver SATソルバ
+# @param[in] lit_list 対象のリテラルのリスト
+# @param[in] k 上限
+# @param[in] encoding 符号化方法('pairwise', 'sequential', 'auto')
+#
+# 'pairwise' は k + 1 個の組み合わせごとに節を作るので
+# 要素数が小さい時しか使えない．
+def add_at_most_k(solver, lit_list, k, encoding = 'auto') :
+    n = len(lit_list)
+    if k >= n :
+        return
+    if k < 0 :
+        # 満たせない．
+        solver.add_clause([])
+        return
+    if k == 0 :
+        for lit in lit_list :
+            solver.add_clause(-lit)
+        return
+    if k == 1 and encoding != 'pairwise' :
+        add_at_most_one(solver, lit_list, encoding)
+        return
+    if encoding == 'auto' :
+        encoding = 'pairwise' if math.comb(n, k + 1) <= 4 * n * k else 'sequential'
+
+    if encoding == 'pairwise' :
+        _amk_pairwise(solver, lit_list, k)
+    elif encoding == 'sequential' :
+        _amk_sequential(solver, lit_list, k)
+    else :
+        raise ValueError('{}: unknown encoding for at-most-k'.format(encoding))
+
+
+## @brief リストの中のリテラルが少なくとも k 個 True となる制約を作る．
+# @param[in] solver SATソルバ
+# @param[in] lit_list 対象のリテラルのリスト
+# @param[in] k 下限
+# @param[in] encoding 符号化方法('pairwise', 'sequential', 'auto')
+#
+# 否定したリテラルが高々 n - k 個 True という制約として作る．
+def add_at_least_k(solver, lit_list, k, encoding = 'auto') :
+    if k <= 0 :
+        return
+    if k == 1 :
+        add_at_least_one(solver, lit_list)
+        return
+    add_at_most_k(solver, [-lit for lit in lit_list], len(lit_list) - k, encoding)
+
+
+## @brief リストの中のリテラルがちょうど k 個 True となる制約を作る．
+# @param[in] solver SATソルバ
+# @param[in] lit_list 対象のリテラルのリスト
+# @param[in] k 個数
+# @param[in] encoding 符号化方法('pairwise', 'sequential', 'auto')
+def add_exactly_k(solver, lit_list, k, encoding = 'auto') :
+    add_at_most_k(solver, lit_list, k, encoding)
+    add_at_least_k(solver, lit_list, k, encoding)
+
+
+## @brief pairwise の at-most-one
+def _amo_pairwise(solver, lit_list) :
+    n = len(lit_list)
+    for i in range(0, n - 1) :
+        lit0 = lit_list[i]
+        for j in range(i + 1, n) :
+            solver.add_clause(-lit0, -lit_list[j])
+
+
+## @brief sequential counter の at-most-one
+#
+# s_i は lit_0 から lit_i までのどれかが True の時 True となる．
+def _amo_sequential(solver, lit_list) :
+    n = len(lit_list)
+    prev = solver.new_variable()
+    solver.add_clause(-lit_list[0], prev)
+    for i in range(1, n - 1) :
+        lit = lit_list[i]
+        s = solver.new_variable()
+        solver.add_clause(-lit, s)
+        solver.add_clause(-prev, s)
+        solver.add_clause(-lit, -prev)
+        prev = s
+    solver.add_clause(-lit_list[n - 1], -prev)
+
+
+## @brief commander encoding の at-most-one
+#
+# _COMMANDER_GROUP 個ずつのグループに分け，グループ内は pairwise で，
+# グループ間はグループの代表(commander)の変数に対する at-most-one で表す．
+def _amo_commander(solver, lit_list) :
+    while len(lit_list) > _COMMANDER_GROUP :
+        cmd_list = []
+        for pos in range(0, len(lit_list), _COMMANDER_GROUP) :
+            group = lit_list[pos:pos + _COMMANDER_GROUP]
+            if len(group) == 1 :
+                cmd_list.append(group[0])
+                continue
+            _amo_pairwise(solver, group)
+            c = solver.new_variable()
+            for lit in group :
+                solver.add_clause(-lit, c)
+            cmd_list.append(c)
+        lit_list = cmd_list
+    _amo_pairwise(solver, lit_list)
+
+
+## @brief product encoding の at-most-one
+#
+# 要素を p x q の格子に並べ，行と列の変数に対する at-most-one で表す．
+def _amo_product(solver, lit_list) :
+    n = len(lit_list)
+    p = math.ceil(math.sqrt(n))
+    q = math.ceil(n / p)
+    row_list = [solver.new_variable() for i in range(p)]
+    col_list = [solver.new_variable() for j in range(q)]
+    for pos, lit in enumerate(lit_list) :
+        solver.add_clause(-lit, row_list[pos // q])
+        solver.add_clause(-lit, col_list[pos % q])
+    add_at_most_one(solver, row_list)
+    add_at_most_one(solver, col_list)
+
+
+## @brief pairwise の at-most-k
+#
+# k + 1 個の組み合わせごとに少なくとも1つは False という節を作る．
+def _amk_pairwise(solver, lit_list, k) :
+    n = len(lit_list)
+    index_list = list(range(k + 1))
+    while True :
+        solver.add_clause([-lit_list[i] for i in index_list])
+        # 次の組み合わせを求める．
+        i = k
+        while i >= 0 and index_list[i] == n - k - 1 + i :
+            i -= 1
+        if i < 0 :
+            break
+        index_list[i] += 1
+        for j in range(i + 1, k + 1) :
+            index_list[j] = index_list[j - 1] + 1
+
+
+## @brief sequential counter の at-most-k
+#
+# s[i][j] は lit_0 から lit_i までのうち j + 1 個以上が True の時 True となる．
+def _amk_sequential(solver, lit_list, k) :
+    n = len(lit_list)
+    prev = [solver.new_variable() for j in range(k)]
+    solver.add_clause(-lit_list[0], prev[0])
+    for j in range(1, k) :
+        solver.add_clause(-prev[j])
+    for i in range(1, n - 1) :
+        lit = lit_list[i]
+        s = [solver.new_variable() for j in range(k)]
+        solver.add_clause(-lit, s[0])
+        solver.add_clause(-prev[0], s[0])
+        for j in range(1, k) :
+            solver.add_clause(-lit, -prev[j - 1], s[j])
+            solver.add_clause(-prev[j], s[j])
+        solver.add_clause(-lit, -prev[k - 1])
+        prev = s
+    solver.add_clause(-lit_list[n - 1], -prev[k - 1])
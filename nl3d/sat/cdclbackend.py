@@ -0,0 +1,77 @@
+#! /usr/bin/env python3
+
+## @file cdclbackend.py
+# @brief CdclBackend の定義ファイル
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+
+
+from nl3d.sat.satbool3 import SatBool3
+from nl3d.sat.satmodel import SatModel
+from nl3d.sat.satbackend import SatBackend
+from nl3d.sat.cdclsolver import CdclSolver
+
+
+## @brief Python 版の CDCL ソルバ(CdclSolver)を内部で呼び出すバックエンド
+#
+# 節はファイルに書き出されることなくメモリ上で直接ソルバに渡される．
+# ソルバは solve() の呼び出し間で保持されるので，
+# 節の追加と仮定付きの solve() を繰り返しても学習節は失われない．
+class CdclBackend(SatBackend) :
+
+    ## @brief 初期化
+    # @param[in] seed 乱数の種
+    def __init__(self, seed = None) :
+        super().__init__()
+        self._seed = seed
+        self._solver = None
+
+
+    ## @brief インクリメンタルに動作する時 True を返す．
+    @property
+    def is_incremental(self) :
+        return True
+
+
+    ## @brief 内部状態をクリアする．
+    def reset(self) :
+        super().reset()
+        self._solver = None
+
+
+    ## @brief 統計情報を返す．
+    #
+    # CdclSolver.stats() を参照のこと．
+    def stats(self) :
+        if self._solver is None :
+            return dict()
+        return self._solver.stats()
+
+
+    ## @brief SAT問題を解く．
+    # @param[in] var_num 変数の数
+    # @param[in] clause_store 節の集合(ClauseStore)
+    # @param[in] assumption_list 仮定する割り当てリスト
+    # @param[in] limit 打ち切り条件(SatLimit)
+    # @return (result, model) を返す．
+    def solve(self, var_num, clause_store, assumption_list, limit) :
+        # 前回から追加された節だけをソルバに加える．
+        pos = self._sync_clauses(clause_store)
+        if self._solver is None :
+            self._solver = CdclSolver(self._seed)
+        solver = self._solver
+        solver.reserve_var(var_num)
+        for lit_list in clause_store.clauses(pos) :
+            if not solver.add_clause(lit_list) :
+                return SatBool3.B3False, []
+
+        ans = solver.solve(assumption_list, limit)
+        if ans is True :
+            model = SatModel.from_values(solver.model())
+            return SatBool3.B3True, model
+        elif ans is False :
+            return SatBool3.B3False, []
+        else :
+            return SatBool3.B3X, []
@@ -0,0 +1,648 @@
+#! /usr/bin/env python3
+
+## @file cdclsolver.py
+# @brief CdclSolver の定義ファイル
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+
+
+import heapq
+import random
+import sys
+
+
+## @brief Python のみで書かれた CDCL 型の SAT ソルバ
+#
+# MiniSat の構成をそのまま Python に移したもので，
+# - 2リテラル監視による単位伝搬
+# - 1UIP による学習節の生成と簡単な最小化
+# - VSIDS による変数選択と極性の記憶
+# - Luby 列にしたがったリスタート
+# - LBD による学習節の削減
+# を行う．
+# 外部プログラムを用意できない環境でのフォールバック用なので
+# 速度は MiniSat の数十分の一程度である．
+#
+# 内部ではリテラルを 2 * varid + (負のとき 1) という整数で表す．
+# インターフェイス上のリテラルは SatSolver と同じく符号付きの整数である．
+#
+# @code
+# solver = CdclSolver()
+# solver.add_clause([1, -2])
+# solver.add_clause([-1])
+# ans = solver.solve()     # True, False, None のいずれか
+# model = solver.model()   # model[varid] は 1, -1, 0 のいずれか
+# @endcode
+class CdclSolver :
+
+    ## @brief 初期化
+    # @param[in] seed 乱数の種
+    #
+    # seed を指定した場合はごく低い確率でランダムな変数選択を行う．
+    def __init__(self, seed = None) :
+        # 変数の数
+        self._var_num = 0
+        # _val[lit] にリテラルの値(1: 真, -1: 偽, 0: 未定)を入れる．
+        self._val = [0, 0]
+        # _level[varid] に変数の決定レベルを入れる．
+        self._level = [0]
+        # _reason[varid] に変数の値を決めた節を入れる．
+        self._reason = [None]
+        # 変数の活性度
+        self._activity = [0.0]
+        # 変数の最後の極性(True なら負)
+        self._polarity = [True]
+        # 作業用のフラグ
+        self._seen = [0]
+        # _watches[lit] に lit を監視している節のリストを入れる．
+        self._watches = [[], []]
+        # 割り当ての履歴
+        self._trail = []
+        # 各決定レベルの開始位置
+        self._trail_lim = []
+        # 伝搬の開始位置
+        self._qhead = 0
+        # 変数選択用のヒープ
+        self._heap = []
+        self._var_inc = 1.0
+        self._var_decay = 0.95
+        # 問題の節のリストと学習節のリスト
+        self._clauses = []
+        self._learnts = []
+        # _lbd[id(clause)] に学習節の LBD を入れる．
+        self._lbd = dict()
+        self._max_learnts = 0
+        # 矛盾が検出されたら False になる．
+        self._ok = True
+        # 最後に solve() を呼んだ時のモデル
+        self._model = []
+        # 打ち切り条件
+        self._limit = None
+
+        # 乱数関係
+        if seed is None :
+            self._random = None
+        else :
+            self._random = random.Random(seed)
+        self._random_freq = 0.02
+
+        # 統計情報
+        self._conflicts = 0
+        self._decisions = 0
+        self._propagations = 0
+
+
+    ## @brief 変数の数
+    @property
+    def var_num(self) :
+        return self._var_num
+
+
+    ## @brief 変数の数を num まで増やす．
+    # @param[in] num 変数の数
+    def reserve_var(self, num) :
+        while self._var_num < num :
+            self._var_num += 1
+            self._val.append(0)
+            self._val.append(0)
+            self._level.append(0)
+            self._reason.append(None)
+            self._activity.append(0.0)
+            self._polarity.append(True)
+            self._seen.append(0)
+            self._watches.append([])
+            self._watches.append([])
+            self._heap_push(self._var_num)
+
+
+    ## @brief 節を追加する．
+    # @param[in] lit_list 節のリテラルのリスト
+    # @return 矛盾が生じたら False を返す．
+    #
+    # リテラルは 0 以外の符号付き整数
+    def add_clause(self, lit_list) :
+        if not self._ok :
+            return False
+
+        assert len(self._trail_lim) == 0
+
+        # 内部表現に直しつつ，重複と恒真を除く．
+        # レベル0で値の決まっているリテラルもここで処理する．
+        val = self._val
+        max_var = 0
+        clause = []
+        for lit in lit_list :
+            if lit > 0 :
+                varid = lit
+                ilit = lit + lit
+            else :
+                varid = -lit
+                ilit = varid + varid + 1
+            if varid > max_var :
+                max_var = varid
+            clause.append(ilit)
+        if max_var > self._var_num :
+            self.reserve_var(max_var)
+
+        clause.sort()
+        tmp = []
+        prev = -1
+        for ilit in clause :
+            if ilit == prev :
+                continue
+            if ilit == prev ^ 1 or val[ilit] == 1 :
+                # 恒真節
+                return True
+            if val[ilit] == -1 :
+                # 偽のリテラルは取り除く．
+                continue
+            tmp.append(ilit)
+            prev = ilit
+        clause = tmp
+
+        if len(clause) == 0 :
+            self._ok = False
+            return False
+
+        if len(clause) == 1 :
+            self._assign(clause[0], None)
+            if self._propagate() is not None :
+                self._ok = False
+                return False
+            return True
+
+        self._clauses.append(clause)
+        self._watches[clause[0]].append(clause)
+        self._watches[clause[1]].append(clause)
+        return True
+
+
+    ## @brief SAT問題を解く．
+    # @param[in] assumption_list 仮定する割り当てリスト
+    # @param[in] limit 打ち切り条件(SatLimit)
+    # @retval True 充足可能だった．
+    # @retval False 充足不能だった．
+    # @retval None 中断した．
+    #
+    # limit の条件は矛盾が起こるたびに調べる．
+    def solve(self, assumption_list = [], limit = None) :
+        self._model = []
+        if not self._ok :
+            return False
+
+        assumps = []
+        for lit in assumption_list :
+            varid = abs(lit)
+            if varid > self._var_num :
+                self.reserve_var(varid)
+            assumps.append(varid + varid + (1 if lit < 0 else 0))
+
+        if self._propagate() is not None :
+            self._ok = False
+            return False
+
+        self._max_learnts = max(len(self._clauses) // 3, 2000)
+
+        self._limit = limit
+        if not self._within_budget() :
+            self._limit = None
+            return None
+
+        ans = None
+        restart = 0
+        while ans is None :
+            conflict_limit = _luby(2.0, restart) * 100
+            ans = self._search(conflict_limit, assumps)
+            if ans is None and not self._within_budget() :
+                break
+            restart += 1
+
+        if ans is True :
+            # モデルを記録する．
+            val = self._val
+            self._model = [0] + [val[varid + varid] for varid in range(1, self._var_num + 1)]
+        self._cancel_until(0)
+        self._limit = None
+        return ans
+
+
+    ## @brief 直前の solve() で得られたモデルを返す．
+    #
+    # model[varid] は 1(真), -1(偽), 0(未定) のいずれか
+    def model(self) :
+        return self._model
+
+
+    ## @brief 統計情報を辞書の形で返す．
+    def stats(self) :
+        return {'conflicts': self._conflicts,
+                'decisions': self._decisions,
+                'propagations': self._propagations,
+                'learnts': len(self._learnts)}
+
+
+    ## @brief 探索を続けてよいか調べる．
+    def _within_budget(self) :
+        return self._limit is None or not self._limit.expired(True)
+
+
+    ## @brief 探索を行う．
+    # @param[in] conflict_limit この回数の矛盾が起きたら一旦抜ける．
+    # @param[in] assumps 仮定する割り当て(内部表現)のリスト
+    # @retval True 充足可能だった．
+    # @retval False 充足不能だった．
+    # @retval None リスタートする．
+    def _search(self, conflict_limit, assumps) :
+        val = self._val
+        trail = self._trail
+        trail_lim = self._trail_lim
+        conflict_count = 0
+        while True :
+            confl = self._propagate()
+            if confl is not None :
+                # 矛盾が起きた．
+                self._conflicts += 1
+                conflict_count += 1
+                if len(trail_lim) == 0 :
+                    self._ok = False
+                    return False
+
+                learnt, bt_level = self._analyze(confl)
+                self._cancel_until(bt_level)
+                if len(learnt) == 1 :
+                    self._assign(learnt[0], None)
+                else :
+                    self._learnts.append(learnt)
+                    self._lbd[id(learnt)] = self._compute_lbd(learnt)
+                    self._watches[learnt[0]].append(learnt)
+                    self._watches[learnt[1]].append(learnt)
+                    self._assign(learnt[0], learnt)
+                self._var_decay_activity()
+                if not self._within_budget() :
+                    self._cancel_until(0)
+                    return None
+                continue
+
+            if conflict_count >= conflict_limit :
+                # リスタートする．
+                self._cancel_until(0)
+                return None
+
+            if len(self._learnts) - len(trail) >= self._max_learnts :
+                self._reduce_db()
+
+            # 次の割り当てを選ぶ．
+            next_lit = -1
+            while len(trail_lim) < len(assumps) :
+                p = assumps[len(trail_lim)]
+                if val[p] == 1 :
+                    # すでに満たされている．ダミーのレベルを作る．
+                    trail_lim.append(len(trail))
+                elif val[p] == -1 :
+                    # 仮定と矛盾した．
+                    self._cancel_until(0)
+                    return False
+                else :
+                    next_lit = p
+                    break
+
+            if next_lit == -1 :
+                next_lit = self._pick_branch_lit()
+                if next_lit == -1 :
+                    # すべての変数に値が割り当てられた．
+                    return True
+                self._decisions += 1
+
+            trail_lim.append(len(trail))
+            self._assign(next_lit, None)
+
+
+    ## @brief 単位伝搬を行う．
+    # @return 矛盾が起きたらその節を返す．そうでなければ None を返す．
+    def _propagate(self) :
+        val = self._val
+        watches = self._watches
+        trail = self._trail
+        level = self._level
+        reason = self._reason
+        cur_level = len(self._trail_lim)
+        qhead = self._qhead
+        confl = None
+        while qhead < len(trail) :
+            p = trail[qhead]
+            qhead += 1
+            false_lit = p ^ 1
+            ws = watches[false_lit]
+            n = len(ws)
+            i = 0
+            j = 0
+            while i < n :
+                c = ws[i]
+                i += 1
+                # c[1] が false_lit となるようにする．
+                if c[0] == false_lit :
+                    c[0] = c[1]
+                    c[1] = false_lit
+                first = c[0]
+                if val[first] == 1 :
+                    # すでに充足している．
+                    ws[j] = c
+                    j += 1
+                    continue
+                # 新しい監視リテラルを探す．
+                for k in range(2, len(c)) :
+                    lk = c[k]
+                    if val[lk] != -1 :
+                        c[1] = lk
+                        c[k] = false_lit
+                        watches[lk].append(c)
+                        break
+                else :
+                    ws[j] = c
+                    j += 1
+                    if val[first] == -1 :
+                        # 矛盾
+                        confl = c
+                        while i < n :
+                            ws[j] = ws[i]
+                            j += 1
+                            i += 1
+                        break
+                    # 単位節になった．
+                    val[first] = 1
+                    val[first ^ 1] = -1
+                    varid = first >> 1
+                    level[varid] = cur_level
+                    reason[varid] = c
+                    trail.append(first)
+            del ws[j:]
+            if confl is not None :
+                break
+        self._propagations += qhead - self._qhead
+        self._qhead = qhead
+        return confl
+
+
+    ## @brief 矛盾の解析を行う．
+    # @param[in] confl 矛盾を起こした節
+    # @return (learnt, bt_level) を返す．
+    #
+    # learnt[0] が単位伝搬されるリテラルとなる．
+    def _analyze(self, confl) :
+        seen = self._seen
+        level = self._level
+        reason = self._reason
+        trail = self._trail
+        cur_level = len(self._trail_lim)
+
+        learnt = [-1]
+        path_c = 0
+        p = -1
+        idx = len(trail) - 1
+        while True :
+            start = 0 if p == -1 else 1
+            for k in range(start, len(confl)) :
+                q = confl[k]
+                varid = q >> 1
+                if not seen[varid] and level[varid] > 0 :
+                    self._bump_var(varid)
+                    seen[varid] = 1
+                    if level[varid] >= cur_level :
+                        path_c += 1
+                    else :
+                        learnt.append(q)
+            # 次に調べるリテラルを探す．
+            while not seen[trail[idx] >> 1] :
+                idx -= 1
+            p = trail[idx]
+            idx -= 1
+            confl = reason[p >> 1]
+            seen[p >> 1] = 0
+            path_c -= 1
+            if path_c == 0 :
+                break
+        learnt[0] = p ^ 1
+
+        # 理由節がすべて学習節に含まれているリテラルを取り除く．
+        out = [learnt[0]]
+        for k in range(1, len(learnt)) :
+            q = learnt[k]
+            r = reason[q >> 1]
+            if r is None :
+                out.append(q)
+                continue
+            for l in r[1:] :
+                varid = l >> 1
+                if not seen[varid] and level[varid] > 0 :
+                    out.append(q)
+                    break
+        for k in range(1, len(learnt)) :
+            seen[learnt[k] >> 1] = 0
+
+        # バックトラックするレベルを求める．
+        # 最大のレベルのリテラルを out[1] に置く．
+        if len(out) == 1 :
+            bt_level = 0
+        else :
+            max_k = 1
+            for k in range(2, len(out)) :
+                if level[out[k] >> 1] > level[out[max_k] >> 1] :
+                    max_k = k
+            out[1], out[max_k] = out[max_k], out[1]
+            bt_level = level[out[1] >> 1]
+        return out, bt_level
+
+
+    ## @brief 節の LBD(含まれる決定レベルの数)を求める．
+    def _compute_lbd(self, clause) :
+        level = self._level
+        return len(set(level[l >> 1] for l in clause))
+
+
+    ## @brief 学習節を削減する．
+    #
+    # LBD の大きな学習節を半分程度捨てる．
+    # ただし単位伝搬の理由になっている節と LBD が2以下の節は残す．
+    def _reduce_db(self) :
+        reason = self._reason
+        lbd = self._lbd
+        self._learnts.sort(key = lambda c: lbd[id(c)])
+        half = len(self._learnts) // 2
+        keep = []
+        removed = set()
+        for k, c in enumerate(self._learnts) :
+            cid = id(c)
+            if k < half or lbd[cid] <= 2 or reason[c[0] >> 1] is c :
+                keep.append(c)
+            else :
+                removed.add(cid)
+                del lbd[cid]
+        self._learnts = keep
+        if removed :
+            for ws in self._watches :
+                ws[:] = [c for c in ws if id(c) not in removed]
+        self._max_learnts = int(self._max_learnts * 1.1)
+
+
+    ## @brief 次の決定リテラルを選ぶ．
+    # @return リテラルを返す．すべて割り当て済みなら -1 を返す．
+    def _pick_branch_lit(self) :
+        val = self._val
+        heap = self._heap
+        if self._random is not None and self._var_num > 0 and self._random.random() < self._random_freq :
+            varid = self._random.randint(1, self._var_num)
+            if val[varid + varid] == 0 :
+                return varid + varid + (1 if self._polarity[varid] else 0)
+        while heap :
+            act, varid = heapq.heappop(heap)
+            if val[varid + varid] == 0 :
+                return varid + varid + (1 if self._polarity[varid] else 0)
+        return -1
+
+
+    ## @brief リテラルに値を割り当てる．
+    def _assign(self, lit, reason) :
+        self._val[lit] = 1
+        self._val[lit ^ 1] = -1
+        varid = lit >> 1
+        self._level[varid] = len(self._trail_lim)
+        self._reason[varid] = reason
+        self._trail.append(lit)
+
+
+    ## @brief level までバックトラックする．
+    def _cancel_until(self, level) :
+        trail_lim = self._trail_lim
+        if len(trail_lim) <= level :
+            return
+        val = self._val
+        reason = self._reason
+        polarity = self._polarity
+        activity = self._activity
+        heap = self._heap
+        trail = self._trail
+        pos = trail_lim[level]
+        for k in range(len(trail) - 1, pos - 1, -1) :
+            lit = trail[k]
+            varid = lit >> 1
+            val[lit] = 0
+            val[lit ^ 1] = 0
+            reason[varid] = None
+            polarity[varid] = lit & 1
+            heapq.heappush(heap, (-activity[varid], varid))
+        del trail[pos:]
+        del trail_lim[level:]
+        self._qhead = pos
+
+
+    ## @brief 変数の活性度を上げる．
+    def _bump_var(self, varid) :
+        activity = self._activity
+        activity[varid] += self._var_inc
+        if activity[varid] > 1e100 :
+            # 桁あふれを防ぐために正規化する．
+            for i in range(1, self._var_num + 1) :
+                activity[i] *= 1e-100
+            self._var_inc *= 1e-100
+            self._rebuild_heap()
+        elif self._val[varid + varid] == 0 :
+            heapq.heappush(self._heap, (-activity[varid], varid))
+
+
+    ## @brief 活性度を減衰させる．
+    def _var_decay_activity(self) :
+        self._var_inc /= self._var_decay
+        if len(self._heap) > 10 * self._var_num + 10000 :
+            self._rebuild_heap()
+
+
+    ## @brief ヒープを作り直す．
+    def _rebuild_heap(self) :
+        val = self._val
+        activity = self._activity
+        self._heap = [(-activity[varid], varid) \
+                      for varid in range(1, self._var_num + 1) \
+                      if val[varid + varid] == 0]
+        heapq.heapify(self._heap)
+
+
+    ## @brief 変数をヒープに入れる．
+    def _heap_push(self, varid) :
+        heapq.heappush(self._heap, (-self._activity[varid], varid))
+
+
+## @brief Luby 列の値を求める．
+# @param[in] y 底
+# @param[in] x 何番目の値か
+def _luby(y, x) :
+    size = 1
+    seq = 0
+    while size < x + 1 :
+        seq += 1
+        size = 2 * size + 1
+    while size - 1 != x :
+        size = (size - 1) >> 1
+        seq -= 1
+        x = x % size
+    return y ** seq
+
+
+## @brief MiniSat と同一のインターフェイスで起動するためのメイン関数
+#
+# @code
+# python3 -m nl3d.sat.cdclsolver [-rnd-seed=<seed>] [-cpu-lim=<sec>] <input-file> [<output-file>]
+# @endcode
+#
+# 結果の書式および終了コードも MiniSat と同じである．
+def main(argv) :
+    from nl3d.sat.dimacs import read_dimacs
+    from nl3d.sat.satlimit import SatLimit
+
+    seed = None
+    time_limit = None
+    args = []
+    for arg in argv[1:] :
+        if arg.startswith('-rnd-seed=') :
+            seed = int(arg[len('-rnd-seed='):])
+        elif arg.startswith('-cpu-lim=') :
+            time_limit = int(arg[len('-cpu-lim='):])
+        elif arg.startswith('-') :
+            # それ以外の MiniSat のオプションは無視する．
+            pass
+        else :
+            args.append(arg)
+    if len(args) < 1 or len(args) > 2 :
+        print('USAGE: cdclsolver [-rnd-seed=<seed>] [-cpu-lim=<sec>] <input-file> [<output-file>]')
+        return 1
+
+    with open(args[0], 'r') as fin :
+        var_num, clause_list = read_dimacs(fin)
+
+    solver = CdclSolver(seed)
+    solver.reserve_var(var_num)
+    for lit_list in clause_list :
+        solver.add_clause(lit_list)
+    ans = solver.solve([], SatLimit(time_limit))
+
+    if ans is True :
+        model = solver.model()
+        lits = [str(varid if model[varid] == 1 else -varid) for varid in range(1, var_num + 1)]
+        output = 'SAT\n{} 0\n'.format(' '.join(lits))
+        code = 10
+    elif ans is False :
+        output = 'UNSAT\n'
+        code = 20
+    else :
+        output = 'INDET\n'
+        code = 0
+    print(output.split('\n')[0])
+    if len(args) == 2 :
+        with open(args[1], 'w') as fout :
+            fout.write(output)
+    return code
+
+
+if __name__ == '__main__' :
+    sys.exit(main(sys.argv))
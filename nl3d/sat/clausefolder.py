@@ -0,0 +1,163 @@
+#! /usr/bin/env python3
+
+## @file clausefolder.py
+# @brief ClauseFolder の定義ファイル
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+
+
+try :
+    import numpy
+except ImportError :
+    # numpy がなくても動くようにしておく．
+    numpy = None
+
+
+## @brief 値の決まったリテラルを用いて節を簡単化しながら SATソルバに渡すクラス
+#
+# SatSolver と同じ new_variable(), add_clause(), add_clauses() を持ち，
+# 節を追加する時点で以下の処理を行う．
+# - 値が真に決まったリテラルを含む節は追加しない．
+# - 値が偽に決まったリテラルは節から取り除く．
+# - 単一リテラルとなった節のリテラルは値が決まったものとして覚える．
+#
+# 節はいったん内部にためておき flush() でまとめて SATソルバに追加する．
+# SATソルバを直接使う前には必ず flush() を呼ぶこと．
+#
+# @code
+# folder = ClauseFolder(solver)
+# folder.add_clause(-x)         # x は偽に決まる．
+# folder.add_clause(x, y)       # y のみの節として追加され，y は真に決まる．
+# folder.add_clause(-x, z, w)   # 真のリテラル -x を含むので追加されない．
+# folder.add_clause(-y, z, w)   # (z, w) として追加される．
+# folder.flush()
+# @endcode
+class ClauseFolder :
+
+    ## @brief 初期化
+    # @param[in] solver 節を追加する SATソルバ
+    def __init__(self, solver) :
+        self._solver = solver
+        # _value_map[lit] はリテラル lit の値(True/False)
+        # 値の決まっていないリテラルは含まない．
+        self._value_map = {}
+        self._clause_list = []
+        # 統計情報
+        self._clauses_out = 0
+        self._satisfied = 0
+        self._removed_lits = 0
+
+
+    ## @brief 変数を作る．
+    # @return 変数番号を返す．
+    def new_variable(self) :
+        return self._solver.new_variable()
+
+
+    ## @brief リテラルの値を返す．
+    # @param[in] lit リテラル
+    # @return True, False もしくは None(値が決まっていない)を返す．
+    def value(self, lit) :
+        return self._value_map.get(lit)
+
+
+    ## @brief 節を追加する．
+    # @param[in] args 節のリテラルのリスト
+    #
+    # 引数の形は SatSolver.add_clause() と同じ．
+    # 渡したリストは flush() まで保持するので変更してはいけない．
+    def add_clause(self, *args) :
+        if len(args) == 1 and not isinstance(args[0], int) :
+            # リストの場合
+            lit_list = args[0]
+        else :
+            lit_list = args
+        if len(lit_list) > 1 and self._value_map.keys().isdisjoint(lit_list) :
+            # 値の決まったリテラルを含まない節はそのまま追加する．
+            self._clause_list.append(lit_list)
+        else :
+            self._add(lit_list)
+        if len(self._clause_list) >= _FLUSH_SIZE :
+            self.flush()
+
+
+    ## @brief 複数の節をまとめて追加する．
+    # @param[in] clauses 節のリテラルのリストのシーケンス
+    #
+    # 引数の形は SatSolver.add_clauses() と同じ．
+    # numpy の2次元配列の場合は値の決まったリテラルを含まない行は
+    # 配列のまま SATソルバに渡す．
+    def add_clauses(self, clauses) :
+        if numpy is not None and isinstance(clauses, numpy.ndarray) :
+            if len(clauses) == 0 :
+                return
+            # リテラル + var_num を添字とする値の表(1: 真, -1: 偽, 0: 未定)を作って
+            # 各リテラルの値を求める．
+            var_num = self._solver.var_num
+            table = numpy.zeros(var_num * 2 + 1, dtype = numpy.int8)
+            if self._value_map :
+                lits = numpy.fromiter(self._value_map.keys(), dtype = numpy.int64)
+                vals = numpy.fromiter(self._value_map.values(), dtype = bool)
+                table[lits + var_num] = numpy.where(vals, 1, -1)
+            free = (table[clauses + var_num] == 0).all(axis = 1)
+            self.flush()
+            free_clauses = clauses[free]
+            self._clauses_out += len(free_clauses)
+            self._solver.add_clauses(free_clauses)
+            for lit_list in clauses[~free].tolist() :
+                self._add(lit_list)
+            return
+
+        for lit_list in clauses :
+            self.add_clause(lit_list)
+
+
+    ## @brief たまっている節を SATソルバに追加する．
+    def flush(self) :
+        if self._clause_list :
+            self._clauses_out += len(self._clause_list)
+            self._solver.add_clauses(self._clause_list)
+            self._clause_list = []
+
+
+    ## @brief 統計情報を辞書の形で返す．
+    #
+    # 項目は以下の通り
+    # - clauses_in: 追加しようとした節の数
+    # - clauses_out: SATソルバに追加した(もしくは追加する予定の)節の数
+    # - satisfied: 真のリテラルを含むため追加しなかった節の数
+    # - removed_lits: 取り除いた偽のリテラルの数
+    # - fixed_vars: 値の決まった変数の数
+    def stats(self) :
+        clauses_out = self._clauses_out + len(self._clause_list)
+        return {'clauses_in': clauses_out + self._satisfied,
+                'clauses_out': clauses_out,
+                'satisfied': self._satisfied,
+                'removed_lits': self._removed_lits,
+                'fixed_vars': len(self._value_map) // 2}
+
+
+    ## @brief 節を簡単化して内部のリストに加える．
+    def _add(self, lit_list) :
+        value_map = self._value_map
+        new_list = []
+        for lit in lit_list :
+            val = value_map.get(lit)
+            if val is None :
+                new_list.append(lit)
+            elif val :
+                self._satisfied += 1
+                return
+        self._removed_lits += len(lit_list) - len(new_list)
+        if len(new_list) == 1 :
+            # 値が決まった．
+            lit = new_list[0]
+            value_map[lit] = True
+            value_map[-lit] = False
+        self._clause_list.append(new_list)
+
+
+## @brief 内部にためておく節の数の上限
+_FLUSH_SIZE = 100000
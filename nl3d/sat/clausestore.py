@@ -0,0 +1,117 @@
+#! /usr/bin/env python3
+
+## @file clausestore.py
+# @brief ClauseStore の定義ファイル
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+
+
+from array import array
+
+try :
+    import numpy
+except ImportError :
+    # numpy がなくても動くようにしておく．
+    numpy = None
+
+
+## @brief 節の集合を1次元の整数配列で保持するクラス
+#
+# 節ごとに Python のリストを作ると1節あたり数百バイトを消費するので，
+# すべての節のリテラルを1つの array('i') に連続して格納する．
+# 節の終わりは DIMACS 形式と同様に 0 で表す．
+#
+# @code
+# store = ClauseStore()
+# store.add([1, -2])
+# store.add([3])
+# store.lit_array    # array('i', [1, -2, 0, 3, 0])
+# for lit_list in store :
+#     ...            # lit_list は array('i') の部分配列
+# @endcode
+class ClauseStore :
+
+    ## @brief 初期化
+    def __init__(self) :
+        self.clear()
+
+
+    ## @brief クリアする．
+    def clear(self) :
+        self._lit_array = array('i')
+        self._clause_num = 0
+
+
+    ## @brief 節を追加する．
+    # @param[in] lit_list 節のリテラルのリスト
+    def add(self, lit_list) :
+        self._lit_array.extend(lit_list)
+        self._lit_array.append(0)
+        self._clause_num += 1
+
+
+    ## @brief 複数の節をまとめて追加する．
+    # @param[in] clauses 節のリテラルのリストのシーケンス
+    #
+    # clauses には numpy の2次元配列(1行が1つの節)も指定できる．
+    # その場合は終端の 0 を加えた配列を作ってバイト列のまま追加する．
+    def add_clauses(self, clauses) :
+        if numpy is not None and isinstance(clauses, numpy.ndarray) :
+            clause_num, width = clauses.shape
+            if clause_num == 0 :
+                return
+            buf = numpy.zeros((clause_num, width + 1), dtype = numpy.int32)
+            buf[:, :width] = clauses
+            self._lit_array.frombytes(buf.tobytes())
+            self._clause_num += clause_num
+            return
+
+        lit_array = self._lit_array
+        n = 0
+        for lit_list in clauses :
+            lit_array.extend(lit_list)
+            lit_array.append(0)
+            n += 1
+        self._clause_num += n
+
+
+    ## @brief 節の数を返す．
+    def __len__(self) :
+        return self._clause_num
+
+
+    ## @brief リテラル数(終端の 0 を除く)を返す．
+    @property
+    def lit_num(self) :
+        return len(self._lit_array) - self._clause_num
+
+
+    ## @brief 内部のリテラル配列を返す．
+    #
+    # 節の区切りは 0 になっている．
+    # 内容を変更してはいけない．
+    @property
+    def lit_array(self) :
+        return self._lit_array
+
+
+    ## @brief 節を一つずつ取り出す反復子
+    #
+    # 一つの節は array('i') の部分配列となる．
+    def __iter__(self) :
+        return self.clauses()
+
+
+    ## @brief pos 番目の要素から始まる節を一つずつ取り出す．
+    # @param[in] pos lit_array 中の開始位置
+    #
+    # pos は節の先頭でなければならない．
+    def clauses(self, pos = 0) :
+        lit_array = self._lit_array
+        end = len(lit_array)
+        while pos < end :
+            next_pos = lit_array.index(0, pos)
+            yield lit_array[pos:next_pos]
+            pos = next_pos + 1
@@ -0,0 +1,133 @@
+#! /usr/bin/env python3
+
+## @file dimacs.py
+# @brief DIMACS 形式の CNF ファイルの入出力を行う関数群
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+
+
+import io
+
+from nl3d.sat.satbool3 import SatBool3
+from nl3d.sat.clausestore import ClauseStore
+from nl3d.sat.satmodel import SatModel
+
+
+## @brief 一度に文字列に変換するリテラル数の目安
+_CHUNK_SIZE = 1 << 20
+
+
+## @brief DIMACS 形式で CNF 式を書き出す．
+# @param[in] fout 出力先のファイルオブジェクト
+# @param[in] var_num 変数の数
+# @param[in] clause_store 節の集合(ClauseStore もしくは節のリスト)
+# @param[in] assumption_list 仮定する割り当てリスト
+#
+# assumption_list の要素は単一リテラル節の形で書き出す．
+# fout はテキストモードでもバイナリモードでもよい．
+# パイプ(subprocess.Popen の stdin など)に直接書き出すこともできる．
+#
+# 1リテラルずつ書き出すと遅いので，ClauseStore のリテラル配列を
+# _CHUNK_SIZE 個程度ずつまとめて1つの文字列に変換して書き出す．
+def write_dimacs(fout, var_num, clause_store, assumption_list = []) :
+    binary = not isinstance(fout, io.TextIOBase)
+
+    def write(text) :
+        if binary :
+            fout.write(text.encode('ascii'))
+        else :
+            fout.write(text)
+
+    # ヘッダを書き出す．
+    clause_num = len(clause_store) + len(assumption_list)
+    write('p cnf {} {}\n'.format(var_num, clause_num))
+
+    # 節の内容を書き出す．
+    if isinstance(clause_store, ClauseStore) :
+        for text in _chunk_texts(clause_store.lit_array) :
+            write(text)
+    else :
+        for lit_list in clause_store :
+            write(' '.join(map(str, lit_list)) + ' 0\n')
+
+    # assumption を単一リテラル節の形で書き出す．
+    if len(assumption_list) > 0 :
+        write(''.join('{} 0\n'.format(lit) for lit in assumption_list))
+
+
+## @brief 0 区切りのリテラル配列を DIMACS 形式の文字列に変換する．
+# @param[in] lit_array リテラル配列
+#
+# 節の途中で切れないように区切った文字列を順に返す．
+def _chunk_texts(lit_array) :
+    end = len(lit_array)
+    pos = 0
+    while pos < end :
+        next_pos = min(pos + _CHUNK_SIZE, end) - 1
+        # 節の終わり(0)まで延ばす．
+        next_pos = lit_array.index(0, next_pos) + 1
+        # '%d ' を並べた書式で一度に文字列にするのがもっとも速い．
+        chunk = lit_array[pos:next_pos]
+        text = ('%d ' * len(chunk)) % tuple(chunk)
+        # ' 0 ' は節の区切りにしか現れない．
+        yield text.replace(' 0 ', ' 0\n')
+        pos = next_pos
+
+
+## @brief DIMACS 形式の CNF ファイルを読み込む．
+# @param[in] fin 入力元のファイルオブジェクト
+# @return (var_num, clause_list) のタプルを返す．
+#
+# 'c' で始まるコメント行は読み飛ばす．
+# 'p' 行の変数の数よりも大きな番号の変数が現れた場合には
+# var_num をその番号に合わせる．
+def read_dimacs(fin) :
+    var_num = 0
+    clause_list = []
+    lit_list = []
+    for line in fin :
+        if line[0:1] in ('c', '%') :
+            continue
+        if line[0:1] == 'p' :
+            # p cnf <var_num> <clause_num>
+            var_num = int(line.split()[2])
+            continue
+        for lit in map(int, line.split()) :
+            if lit == 0 :
+                clause_list.append(lit_list)
+                lit_list = []
+            else :
+                lit_list.append(lit)
+                if abs(lit) > var_num :
+                    var_num = abs(lit)
+    if lit_list :
+        # 最後の節に 0 がなかった．
+        clause_list.append(lit_list)
+    return var_num, clause_list
+
+
+## @brief MiniSat の形式の結果ファイルを読み込む．
+# @param[in] fin 入力元のファイルオブジェクト
+# @param[in] var_num 変数の数
+# @return (result, model) を返す．
+#
+# 1行目が 'SAT' なら2行目に割り当て結果がある．
+# 'UNSAT' なら充足不能，それ以外(空のファイルなど)は B3X とする．
+# model は SAT の時は SatModel，それ以外は空のリストとなる．
+def read_result(fin, var_num) :
+    result = SatBool3.B3X
+    model = []
+    lines = fin.readlines()
+
+    # 1行目が結果
+    if len(lines) > 0 and lines[0] == 'SAT\n' :
+        assert len(lines) == 2
+        result = SatBool3.B3True
+        # 割り当て結果は一括して解析する．
+        model = SatModel.from_dimacs(lines[1], var_num)
+    elif len(lines) > 0 and lines[0] == 'UNSAT\n' :
+        result = SatBool3.B3False
+
+    return result, model
@@ -0,0 +1,105 @@
+#! /usr/bin/env python3
+
+## @file dimacsbackend.py
+# @brief DimacsBackend の定義ファイル
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+
+
+import tempfile
+import os
+import subprocess
+
+from nl3d.sat.satbool3 import SatBool3
+from nl3d.sat.satbackend import SatBackend
+from nl3d.sat.satlimit import wait_process
+from nl3d.sat.dimacs import write_dimacs, read_result
+
+
+## @brief 外部の SAT ソルバプログラムを呼び出すバックエンド
+#
+# DIMACS 形式の一時ファイルを作り，MiniSat と同一の
+# コマンドラインインターフェイスを持つプログラムを起動する．
+# 結果も一時ファイルを介して受け取る．
+class DimacsBackend(SatBackend) :
+
+    ## @brief 初期化
+    # @param[in] satprog SATソルバのプログラム名
+    #
+    # @param[in] use_pipe DIMACS ファイルを作らずにパイプで渡すとき True にする．
+    #
+    # satprog にはオプション付きのコマンドライン(文字列のリスト)を
+    # 与えてもよい．
+    # use_pipe が True の場合は入力ファイル名として /dev/stdin を渡して
+    # 標準入力に直接 CNF 式を流し込む．
+    def __init__(self, satprog, use_pipe = False) :
+        super().__init__()
+        if isinstance(satprog, str) :
+            self._command = [satprog]
+        else :
+            self._command = list(satprog)
+        self._use_pipe = use_pipe
+
+
+    ## @brief SAT問題を解く．
+    # @param[in] var_num 変数の数
+    # @param[in] clause_store 節の集合(ClauseStore)
+    # @param[in] assumption_list 仮定する割り当てリスト
+    # @param[in] limit 打ち切り条件(SatLimit)
+    # @return (result, model) を返す．
+    def solve(self, var_num, clause_store, assumption_list, limit) :
+        if limit.expired() :
+            return SatBool3.B3X, []
+
+        dimacs_file = None
+        output_file = None
+        try :
+            if self._use_pipe :
+                input_file = '/dev/stdin'
+            else :
+                # dimacs 形式のファイルを作る．
+                (fh, dimacs_file) = tempfile.mkstemp()
+                with os.fdopen(fh, 'wb') as fout :
+                    write_dimacs(fout, var_num, clause_store, assumption_list)
+                input_file = dimacs_file
+
+            # SATソルバを起動する．
+            (fh, output_file) = tempfile.mkstemp()
+            os.close(fh)
+            command_line = self._command + [input_file, output_file]
+            if self._debug :
+                print('SAT program: {}'.format(' '.join(self._command)))
+                print('INPUT:       {}'.format(input_file))
+                print('OUTPUT:      {}'.format(output_file))
+                dout = None
+                derr = None
+            else :
+                dout = subprocess.DEVNULL
+                derr = subprocess.DEVNULL
+            stdin = subprocess.PIPE if self._use_pipe else None
+            with subprocess.Popen(command_line, stdin = stdin,
+                                  stdout = dout, stderr = derr,
+                                  preexec_fn = limit.preexec_fn()) as proc :
+                if self._use_pipe :
+                    try :
+                        write_dimacs(proc.stdin, var_num, clause_store, assumption_list)
+                        proc.stdin.close()
+                    except BrokenPipeError :
+                        # ソルバが途中で終了した．
+                        pass
+                if not wait_process(proc, limit) :
+                    # 打ち切られた．
+                    return SatBool3.B3X, []
+
+            # 結果のファイルを読み込む．
+            with open(output_file, 'r') as fin :
+                return read_result(fin, var_num)
+
+        finally :
+            # 一時ファイルを消す．
+            if not self._debug :
+                for filename in (dimacs_file, output_file) :
+                    if filename is not None :
+                        os.remove(filename)
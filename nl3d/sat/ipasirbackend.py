@@ -0,0 +1,174 @@
+#! /usr/bin/env python3
+
+## @file ipasirbackend.py
+# @brief IpasirBackend の定義ファイル
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+
+
+import ctypes
+import ctypes.util
+import os
+
+from nl3d.sat.satbool3 import SatBool3
+from nl3d.sat.satmodel import SatModel
+from nl3d.sat.satbackend import SatBackend
+
+
+## @brief IPASIR インターフェイスを持つ共有ライブラリの候補
+#
+# 環境変数 NL3D_IPASIR_LIBRARY が設定されていればそれを優先する．
+_LIBRARY_CANDIDATES = ['ipasir', 'cadical', 'ipasircadical', 'ipasirglucose4']
+
+
+## @brief ipasir_set_terminate() に渡すコールバック関数の型
+_TERMINATE_FUNC = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p)
+
+
+## @brief IPASIR インターフェイスを持つ共有ライブラリを探す．
+# @return ライブラリのパスを返す．見つからなければ None を返す．
+def find_ipasir_library() :
+    path = os.environ.get('NL3D_IPASIR_LIBRARY')
+    if path :
+        return path
+    for name in _LIBRARY_CANDIDATES :
+        path = ctypes.util.find_library(name)
+        if path is None :
+            continue
+        try :
+            lib = ctypes.CDLL(path)
+        except OSError :
+            continue
+        if hasattr(lib, 'ipasir_init') :
+            return path
+    return None
+
+
+## @brief IPASIR 準拠の共有ライブラリを ctypes で呼び出すバックエンド
+#
+# CaDiCaL などの IPASIR 準拠のライブラリをプロセス内で直接呼び出す．
+# 節はファイルを介さずにライブラリに渡される．
+# ソルバのインスタンスは solve() の呼び出し間で保持される．
+class IpasirBackend(SatBackend) :
+
+    ## @brief 初期化
+    # @param[in] libpath 共有ライブラリのパス
+    #
+    # libpath が None の場合は find_ipasir_library() で探す．
+    # 見つからない場合には OSError を送出する．
+    def __init__(self, libpath = None) :
+        super().__init__()
+        if libpath is None :
+            libpath = find_ipasir_library()
+            if libpath is None :
+                raise OSError('IPASIR library not found')
+        lib = ctypes.CDLL(libpath)
+        lib.ipasir_signature.restype = ctypes.c_char_p
+        lib.ipasir_signature.argtypes = []
+        lib.ipasir_init.restype = ctypes.c_void_p
+        lib.ipasir_init.argtypes = []
+        lib.ipasir_release.restype = None
+        lib.ipasir_release.argtypes = [ctypes.c_void_p]
+        lib.ipasir_add.restype = None
+        lib.ipasir_add.argtypes = [ctypes.c_void_p, ctypes.c_int32]
+        lib.ipasir_assume.restype = None
+        lib.ipasir_assume.argtypes = [ctypes.c_void_p, ctypes.c_int32]
+        lib.ipasir_solve.restype = ctypes.c_int
+        lib.ipasir_solve.argtypes = [ctypes.c_void_p]
+        lib.ipasir_val.restype = ctypes.c_int32
+        lib.ipasir_val.argtypes = [ctypes.c_void_p, ctypes.c_int32]
+        lib.ipasir_set_terminate.restype = None
+        lib.ipasir_set_terminate.argtypes = [ctypes.c_void_p, ctypes.c_void_p, _TERMINATE_FUNC]
+        self._lib = lib
+        self._handle = None
+        # 打ち切り条件を調べるコールバック関数
+        # ライブラリから呼ばれるので参照を保持しておく必要がある．
+        self._limit = None
+        self._terminate = _TERMINATE_FUNC(self._check_terminate)
+
+
+    ## @brief 終了処理
+    def __del__(self) :
+        self._release()
+
+
+    ## @brief インクリメンタルに動作する時 True を返す．
+    @property
+    def is_incremental(self) :
+        return True
+
+
+    ## @brief 内部状態をクリアする．
+    def reset(self) :
+        super().reset()
+        self._release()
+
+
+    ## @brief 打ち切り条件を調べる．
+    #
+    # ipasir_solve() の中から呼ばれる．0 以外を返すと探索が中断される．
+    def _check_terminate(self, state) :
+        if self._limit is not None and self._limit.expired(True) :
+            return 1
+        return 0
+
+
+    ## @brief ソルバのインスタンスを解放する．
+    def _release(self) :
+        if getattr(self, '_handle', None) is not None :
+            self._lib.ipasir_release(self._handle)
+            self._handle = None
+
+
+    ## @brief ライブラリのシグネチャ(名前とバージョン)を返す．
+    @property
+    def signature(self) :
+        return self._lib.ipasir_signature().decode()
+
+
+    ## @brief SAT問題を解く．
+    # @param[in] var_num 変数の数
+    # @param[in] clause_store 節の集合(ClauseStore)
+    # @param[in] assumption_list 仮定する割り当てリスト
+    # @param[in] limit 打ち切り条件(SatLimit)
+    # @return (result, model) を返す．
+    def solve(self, var_num, clause_store, assumption_list, limit) :
+        lib = self._lib
+
+        # 前回から追加された節だけをソルバに加える．
+        # lit_array は 0 で区切られているのでそのまま渡せばよい．
+        pos = self._sync_clauses(clause_store)
+        if self._handle is None :
+            self._handle = lib.ipasir_init()
+            lib.ipasir_set_terminate(self._handle, None, self._terminate)
+        handle = self._handle
+        add = lib.ipasir_add
+        lit_array = clause_store.lit_array
+        for i in range(pos, len(lit_array)) :
+            add(handle, lit_array[i])
+
+        # 仮定は次の ipasir_solve() まで残るので，
+        # 打ち切る場合は仮定を加える前に返す．
+        if limit.expired(True) :
+            return SatBool3.B3X, []
+        for lit in assumption_list :
+            lib.ipasir_assume(handle, lit)
+        self._limit = limit
+        try :
+            ans = lib.ipasir_solve(handle)
+        finally :
+            self._limit = None
+        if ans == 10 :
+            val = lib.ipasir_val
+            # ipasir_val() は lit, -lit, 0 のいずれかを返すので符号だけ見る．
+            val_list = [0] * (var_num + 1)
+            for varid in range(1, var_num + 1) :
+                v = val(handle, varid)
+                val_list[varid] = (v > 0) - (v < 0)
+            return SatBool3.B3True, SatModel.from_values(val_list)
+        elif ans == 20 :
+            return SatBool3.B3False, []
+        else :
+            return SatBool3.B3X, []
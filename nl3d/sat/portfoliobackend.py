@@ -0,0 +1,153 @@
+#! /usr/bin/env python3
+
+## @file portfoliobackend.py
+# @brief PortfolioBackend の定義ファイル
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+
+
+import os
+import queue
+import subprocess
+import tempfile
+import threading
+
+from nl3d.sat.satbool3 import SatBool3
+from nl3d.sat.satbackend import SatBackend
+from nl3d.sat.dimacs import write_dimacs, read_result
+
+
+## @brief 複数の SAT ソルバを並列に走らせるバックエンド
+#
+# MiniSat と同一のインターフェイスを持つプログラム(もしくは同じプログラムで
+# 乱数の種やオプションを変えたもの)を同時に起動し，
+# 最初に SAT か UNSAT の答を出したものの結果を採用する．
+# 残りのプロセスはその時点で終了させる．
+#
+# CNF 式は1つの DIMACS ファイルに一度だけ書き出して
+# すべてのプロセスで共有する．
+#
+# @code
+# backend = PortfolioBackend([['minisat_static'],
+#                             ['minisat_static', '-rnd-seed=1', '-rnd-freq=0.02'],
+#                             ['glucose_static']])
+# solver = SatSolver(backend = backend)
+# @endcode
+class PortfolioBackend(SatBackend) :
+
+    ## @brief 初期化
+    # @param[in] command_list コマンドライン(文字列か文字列のリスト)のリスト
+    #
+    # 各コマンドラインの後ろに入力ファイル名と出力ファイル名が付け加えられる．
+    def __init__(self, command_list) :
+        super().__init__()
+        self._command_list = []
+        for command in command_list :
+            if isinstance(command, str) :
+                self._command_list.append([command])
+            else :
+                self._command_list.append(list(command))
+        # 最後に答を出したコマンドの番号
+        self._winner = None
+
+
+    ## @brief 直前の solve() で答を出したコマンドの番号を返す．
+    #
+    # どのコマンドも答を出さなかった場合は None を返す．
+    @property
+    def winner(self) :
+        return self._winner
+
+
+    ## @brief SAT問題を解く．
+    # @param[in] var_num 変数の数
+    # @param[in] clause_store 節の集合(ClauseStore)
+    # @param[in] assumption_list 仮定する割り当てリスト
+    # @param[in] limit 打ち切り条件(SatLimit)
+    # @return (result, model) を返す．
+    def solve(self, var_num, clause_store, assumption_list, limit) :
+        self._winner = None
+        if limit.expired() :
+            return SatBool3.B3X, []
+
+        dimacs_file = None
+        output_file_list = []
+        proc_list = []
+        try :
+            # dimacs 形式のファイルを一つだけ作る．
+            # 書き込みに失敗した場合も finally で消す．
+            (fh, dimacs_file) = tempfile.mkstemp()
+            with os.fdopen(fh, 'wb') as fout :
+                write_dimacs(fout, var_num, clause_store, assumption_list)
+
+            # 各コマンドに対応するプロセスを起動する．
+            # 終了を待つスレッドが終わったプロセスの番号を done_queue に入れる．
+            done_queue = queue.Queue()
+            for i, command in enumerate(self._command_list) :
+                (fh, output_file) = tempfile.mkstemp()
+                os.close(fh)
+                output_file_list.append(output_file)
+                if self._debug :
+                    print('SAT program[{}]: {}'.format(i, ' '.join(command)))
+                    dout = None
+                    derr = None
+                else :
+                    dout = subprocess.DEVNULL
+                    derr = subprocess.DEVNULL
+                proc = subprocess.Popen(command + [dimacs_file, output_file],
+                                        stdout = dout, stderr = derr,
+                                        preexec_fn = limit.preexec_fn())
+                proc_list.append(proc)
+                thread = threading.Thread(target = _wait_proc, args = (proc, i, done_queue))
+                thread.daemon = True
+                thread.start()
+
+            # 最初に確定した答を出したプロセスの結果を用いる．
+            # 打ち切り条件が成り立ったらその時点で B3X を返す．
+            result = SatBool3.B3X
+            model = []
+            count = 0
+            while count < len(proc_list) :
+                try :
+                    i = done_queue.get(timeout = _POLL_INTERVAL)
+                except queue.Empty :
+                    if limit.expired() :
+                        break
+                    continue
+                count += 1
+                with open(output_file_list[i], 'r') as fin :
+                    result, model = read_result(fin, var_num)
+                if result != SatBool3.B3X :
+                    self._winner = i
+                    if self._debug :
+                        print('winner: [{}]'.format(i))
+                    break
+        finally :
+            # 残りのプロセスを終了させて一時ファイルを消す．
+            for proc in proc_list :
+                if proc.poll() is None :
+                    proc.kill()
+                proc.wait()
+            if dimacs_file is not None :
+                os.remove(dimacs_file)
+            for output_file in output_file_list :
+                os.remove(output_file)
+
+        return result, model
+
+
+## @brief 打ち切り条件を調べる間隔(秒)
+_POLL_INTERVAL = 0.05
+
+
+## @brief プロセスの終了を待つ．
+# @param[in] proc 対象のプロセス
+# @param[in] index プロセスの番号
+# @param[in] done_queue 終了したプロセスの番号を入れるキュー
+#
+# 別スレッドで実行される．
+def _wait_proc(proc, index, done_queue) :
+    proc.wait()
+    done_queue.put(index)
@@ -0,0 +1,91 @@
+#! /usr/bin/env python3
+
+## @file satbackend.py
+# @brief SatBackend の定義ファイル
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+
+
+## @brief SAT ソルバの実装部分(バックエンド)のインターフェイス
+#
+# SatSolver は変数と節の管理のみを行い，実際に SAT 問題を解く処理は
+# このクラスを継承したバックエンドに任せる．
+# satsolver_tmpl.py のスケルトンの solve() に相当する部分だけを
+# 切り出したものになっている．
+#
+# 現在用意されているバックエンドは以下の通り
+# - DimacsBackend: DIMACS 形式のファイルを介して外部プログラムを呼び出す．
+# - CdclBackend:   Python で書かれた CDCL ソルバを内部で呼び出す．
+# - IpasirBackend: IPASIR インターフェイスを持つ共有ライブラリを ctypes で呼び出す．
+# - PortfolioBackend: 複数の外部プログラムを並列に走らせる．
+#
+# CdclBackend と IpasirBackend はインクリメンタルに動作する．
+# つまりソルバの内部状態(学習節など)を solve() の呼び出し間で保持し，
+# 2回目以降は前回から追加された節だけを受け取る．
+# 仮定(assumption_list)はその回の solve() の間だけ有効となる．
+class SatBackend :
+
+    ## @brief 初期化
+    def __init__(self) :
+        # デバッグフラグ
+        self._debug = False
+        # インクリメンタルなバックエンドが受け取った節の情報
+        self._lit_array = None
+        self._lit_pos = 0
+
+
+    ## @brief インクリメンタルに動作する時 True を返す．
+    @property
+    def is_incremental(self) :
+        return False
+
+
+    ## @brief 内部状態をクリアする．
+    #
+    # 次の solve() ではすべての節を最初から読み込む．
+    def reset(self) :
+        self._lit_array = None
+        self._lit_pos = 0
+
+
+    ## @brief デバッグフラグを設定する．
+    def set_debug(self, debug) :
+        self._debug = debug
+
+
+    ## @brief SAT問題を解く．
+    # @param[in] var_num 変数の数
+    # @param[in] clause_store 節の集合(ClauseStore)
+    # @param[in] assumption_list 仮定する割り当てリスト
+    # @param[in] limit 打ち切り条件(SatLimit)
+    # @return (result, model) を返す．
+    #
+    # - result は SatBool3
+    # - model は結果の各変数に対する値を格納した SatModel
+    #   変数番号が 1番の変数の値は model[1] に入っている．
+    #   値は SatBool3
+    #   (まとめて調べる場合は model.raw の 1, -1, 0 を用いる)
+    #
+    # limit の条件が成り立った場合は探索を打ち切って
+    # (SatBool3.B3X, []) を返す．
+    def solve(self, var_num, clause_store, assumption_list, limit) :
+        raise NotImplementedError()
+
+
+    ## @brief まだ受け取っていない節の開始位置を求める．
+    # @param[in] clause_store 節の集合(ClauseStore)
+    # @return clause_store.lit_array 中の開始位置を返す．
+    #
+    # インクリメンタルなバックエンド用の関数
+    # 前回と異なる節の集合が与えられた場合には reset() してから
+    # 0 を返す．
+    def _sync_clauses(self, clause_store) :
+        lit_array = clause_store.lit_array
+        if lit_array is not self._lit_array or len(lit_array) < self._lit_pos :
+            self.reset()
+            self._lit_array = lit_array
+        pos = self._lit_pos
+        self._lit_pos = len(lit_array)
+        return pos
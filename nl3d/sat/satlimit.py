@@ -0,0 +1,153 @@
+#! /usr/bin/env python3
+
+## @file satlimit.py
+# @brief SatLimit の定義ファイル
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+
+
+import os
+import subprocess
+import time
+
+try :
+    import resource
+except ImportError :
+    # Windows などでは resource がない．
+    resource = None
+
+
+## @brief SAT ソルバの実行を打ち切る条件を表すクラス
+#
+# 以下の3つの条件を持つ．
+# - 制限時間(秒)
+# - メモリの上限(MB)
+# - 外部からの中断要求(threading.Event)
+#
+# いずれかの条件が成り立ったらバックエンドは探索を打ち切り，
+# 結果として SatBool3.B3X を返す．
+#
+# @code
+# cancel = threading.Event()
+# limit = SatLimit(time_limit = 60, mem_limit = 4096, cancel = cancel)
+# ...
+# # 別のスレッドから
+# cancel.set()
+# @endcode
+class SatLimit :
+
+    ## @brief 初期化
+    # @param[in] time_limit 制限時間(秒)
+    # @param[in] mem_limit メモリの上限(MB)
+    # @param[in] cancel 中断要求を表す threading.Event
+    #
+    # None の条件は無視される．
+    # 制限時間はこのオブジェクトを作った時点から数える．
+    def __init__(self, time_limit = None, mem_limit = None, cancel = None) :
+        if time_limit is None :
+            self._deadline = None
+        else :
+            self._deadline = time.monotonic() + time_limit
+        self._mem_limit = mem_limit
+        self._cancel = cancel
+        # メモリのチェックは時間がかかるので間引く．
+        self._count = 0
+        if mem_limit is None :
+            self._base_rss = 0
+        else :
+            self._base_rss = _current_rss_mb()
+
+
+    ## @brief メモリの上限(MB)を返す．
+    @property
+    def mem_limit(self) :
+        return self._mem_limit
+
+
+    ## @brief 残り時間(秒)を返す．
+    #
+    # 制限時間がない場合は None を返す．
+    def remaining_time(self) :
+        if self._deadline is None :
+            return None
+        return max(self._deadline - time.monotonic(), 0.0)
+
+
+    ## @brief 中断要求があるか調べる．
+    def is_cancelled(self) :
+        return self._cancel is not None and self._cancel.is_set()
+
+
+    ## @brief 打ち切り条件が成り立っているか調べる．
+    # @param[in] in_process プロセス内で解いているとき True にする．
+    #
+    # 頻繁に呼ばれてもよいように軽い処理にしてある．
+    # メモリの上限は，外部プロセスの場合は preexec_fn() で設定するので
+    # in_process が True の時だけ調べる．
+    # その場合はこのオブジェクトを作った時点からの増分を上限と比較する．
+    def expired(self, in_process = False) :
+        if self._cancel is not None and self._cancel.is_set() :
+            return True
+        if self._deadline is not None and time.monotonic() >= self._deadline :
+            return True
+        if in_process and self._mem_limit is not None :
+            self._count += 1
+            if self._count >= 256 :
+                self._count = 0
+                if _current_rss_mb() - self._base_rss > self._mem_limit :
+                    return True
+        return False
+
+
+    ## @brief 子プロセスにメモリの上限を設定する関数を返す．
+    #
+    # subprocess.Popen() の preexec_fn に渡すためのもの
+    # 上限がない場合や設定できない環境では None を返す．
+    def preexec_fn(self) :
+        if self._mem_limit is None or resource is None :
+            return None
+        nbytes = int(self._mem_limit) * 1024 * 1024
+        def set_limit() :
+            resource.setrlimit(resource.RLIMIT_AS, (nbytes, nbytes))
+        return set_limit
+
+
+## @brief 子プロセスの終了を待つ．
+# @param[in] proc 対象のプロセス(subprocess.Popen)
+# @param[in] limit 打ち切り条件(SatLimit)
+# @retval True プロセスが終了した．
+# @retval False 打ち切り条件が成り立ったのでプロセスを終了させた．
+#
+# 中断要求に応じられるように短い間隔で状態を調べる．
+def wait_process(proc, limit) :
+    while True :
+        try :
+            proc.wait(timeout = _POLL_INTERVAL)
+            return True
+        except subprocess.TimeoutExpired :
+            pass
+        if limit.expired() :
+            proc.kill()
+            proc.wait()
+            return False
+
+
+## @brief 子プロセスの状態を調べる間隔(秒)
+_POLL_INTERVAL = 0.05
+
+
+## @brief 現在のプロセスの使用メモリ量(MB)を返す．
+#
+# /proc/self/statm が読めない環境では最大使用量で代用する．
+def _current_rss_mb() :
+    try :
+        with open('/proc/self/statm', 'r') as fin :
+            rss_pages = int(fin.read().split()[1])
+        return rss_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError) :
+        if resource is None :
+            return 0
+        # Linux では KB 単位
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
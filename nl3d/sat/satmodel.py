@@ -0,0 +1,167 @@
+#! /usr/bin/env python3
+
+## @file satmodel.py
+# @brief SatModel の定義ファイル
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+
+
+import warnings
+from array import array
+
+from nl3d.sat.satbool3 import SatBool3
+
+try :
+    import numpy
+except ImportError :
+    # numpy がなくても動くようにしておく．
+    numpy = None
+
+
+## @brief SAT の解(変数の割り当て)を表すクラス
+#
+# 変数ごとに SatBool3 のオブジェクトを持つリストは大きな問題では
+# 作るのにも調べるのにも時間がかかるので，
+# 値を 1(真), -1(偽), 0(未定) の1バイトの整数として array('b') に格納する．
+# 変数番号がそのままインデックスとなる(0番目は使わない)．
+#
+# model[varid] は従来通り SatBool3 を返す．
+# 多数の変数を調べる場合には raw で得られる配列を直接参照したほうが速い．
+#
+# @code
+# model = SatModel.from_dimacs('1 -2 3 0', 3)
+# model[2]          # SatBool3.B3False
+# model.raw[2]      # -1
+# model.is_true(3)  # True
+# @endcode
+class SatModel :
+
+    ## @brief 初期化
+    # @param[in] vals 値の配列(array('b'))
+    #
+    # vals はコピーせずにそのまま保持する．
+    # 通常は from_dimacs() などのクラスメソッドを用いて作る．
+    def __init__(self, vals = None) :
+        if vals is None :
+            vals = array('b')
+        self._vals = vals
+
+
+    ## @brief 1, -1, 0 からなる整数のシーケンスから作る．
+    # @param[in] val_list 値のシーケンス(0番目は使わない)
+    @classmethod
+    def from_values(cls, val_list) :
+        return cls(array('b', val_list))
+
+
+    ## @brief DIMACS 形式の割り当て(符号付きの変数番号の並び)から作る．
+    # @param[in] text 割り当てを表す文字列('1 -2 3 0' など)
+    # @param[in] var_num 変数の数
+    #
+    # 現れなかった変数の値は 0(未定) となる．
+    # numpy がある場合は文字列の解析と値の設定を一括で行う．
+    # 整数でない要素がある場合や変数番号が var_num を超える場合は
+    # どちらの場合も ValueError を送出する．
+    @classmethod
+    def from_dimacs(cls, text, var_num) :
+        if numpy is not None :
+            with warnings.catch_warnings() :
+                # 変換できない要素がある場合は警告もしくは ValueError となる．
+                # その場合は下の処理で同じエラーを送出させる．
+                warnings.simplefilter('error')
+                try :
+                    lits = numpy.fromstring(text, dtype = numpy.int64, sep = ' ')
+                except (ValueError, DeprecationWarning) :
+                    lits = None
+            if lits is not None :
+                if len(lits) > 0 and numpy.abs(lits).max() > var_num :
+                    raise ValueError('literal {} is out of range'.format(
+                        int(lits[numpy.abs(lits).argmax()])))
+                vals = numpy.zeros(var_num + 1, dtype = numpy.int8)
+                vals[lits[lits > 0]] = 1
+                vals[-lits[lits < 0]] = -1
+                return cls(array('b', vals.tobytes()))
+
+        vals = array('b', bytes(var_num + 1))
+        lit = 0
+        try :
+            for lit in map(int, text.split()) :
+                if lit > 0 :
+                    vals[lit] = 1
+                elif lit < 0 :
+                    vals[-lit] = -1
+        except IndexError :
+            raise ValueError('literal {} is out of range'.format(lit))
+        return cls(vals)
+
+
+    ## @brief SatModel もしくは SatBool3 のリストから SatModel を作る．
+    # @param[in] model 変換元のモデル
+    #
+    # model が SatModel ならそのまま返す．
+    # 独自のバックエンドが SatBool3 のリストを返す場合のためのもの
+    @classmethod
+    def from_model(cls, model) :
+        if isinstance(model, SatModel) :
+            return model
+        return cls(array('b', [val.value for val in model]))
+
+
+    ## @brief 値の配列(array('b'))を返す．
+    #
+    # 要素は 1(真), -1(偽), 0(未定) のいずれか
+    @property
+    def raw(self) :
+        return self._vals
+
+
+    ## @brief 値の配列を numpy の配列として返す．
+    #
+    # コピーは行わないので内容を書き換えると元のモデルも変わる．
+    # numpy がない場合には None を返す．
+    def as_numpy(self) :
+        if numpy is None :
+            return None
+        return numpy.frombuffer(self._vals, dtype = numpy.int8)
+
+
+    ## @brief 変数の値を整数(1, -1, 0)で返す．
+    # @param[in] varid 変数番号
+    def value(self, varid) :
+        return self._vals[varid]
+
+
+    ## @brief 変数の値が真の時 True を返す．
+    # @param[in] varid 変数番号
+    def is_true(self, varid) :
+        return self._vals[varid] == 1
+
+
+    ## @brief 変数の値を SatBool3 で返す．
+    # @param[in] varid 変数番号
+    def __getitem__(self, varid) :
+        return _B3_TABLE[self._vals[varid]]
+
+
+    ## @brief 要素数(変数の数 + 1)を返す．
+    def __len__(self) :
+        return len(self._vals)
+
+
+    ## @brief 各要素を SatBool3 で返す反復子
+    def __iter__(self) :
+        for val in self._vals :
+            yield _B3_TABLE[val]
+
+
+    ## @brief 文字列表現を返す．
+    def __repr__(self) :
+        return 'SatModel({})'.format([_B3_TABLE[val] for val in self._vals])
+
+
+## @brief 整数値から SatBool3 への変換表
+#
+# _B3_TABLE[-1] が最後の要素を指すことを利用している．
+_B3_TABLE = (SatBool3.B3X, SatBool3.B3True, SatBool3.B3False)
@@ -0,0 +1,308 @@
+#! /usr/bin/env python3
+
+## @file satpreprocessor.py
+# @brief SatPreprocessor の定義ファイル
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+
+
+from array import array
+
+from nl3d.sat.clausestore import ClauseStore
+from nl3d.sat.satmodel import SatModel
+
+
+## @brief CNF 式を SATソルバに渡す前に簡単化するクラス
+#
+# 以下の処理を順に行う．
+# - 恒真な節(x と ~x を含む節)と重複したリテラルの削除
+# - 単一リテラル節の伝搬(値の決まったリテラルを含む節や偽のリテラルの削除)
+# - 重複した節の削除
+# - 包含されている節(他の節のリテラルをすべて含む節)の削除
+# - 残った節に現れる変数の番号の付け直し
+#
+# 簡単化した CNF 式を解いて得られたモデルは map_model() で
+# 元の変数番号のモデルに戻す．
+#
+# @code
+# prep = SatPreprocessor()
+# if prep.run(var_num, clause_store, assumption_list) :
+#     result, model = backend.solve(prep.var_num, prep.clause_store,
+#                                   prep.assumption_list, limit)
+#     if result == SatBool3.B3True :
+#         model = prep.map_model(model)
+# else :
+#     # 充足不能
+# @endcode
+class SatPreprocessor :
+
+    ## @brief 初期化
+    # @param[in] subsumption 包含されている節の削除を行う時 True にする．
+    def __init__(self, subsumption = True) :
+        self._subsumption = subsumption
+        self._var_num = 0
+        self._clause_store = ClauseStore()
+        self._assumption_list = []
+        self._orig_var_num = 0
+        self._fixed = array('b')
+        self._old_varid = array('i')
+        self._stats = {}
+
+
+    ## @brief 簡単化を行う．
+    # @param[in] var_num 変数の数
+    # @param[in] clause_store 節の集合(ClauseStore)
+    # @param[in] assumption_list 仮定する割り当てリスト
+    # @retval True 簡単化した結果を var_num, clause_store, assumption_list で得られる．
+    # @retval False 充足不能であることがわかった．
+    #
+    # assumption_list は単一リテラル節としては扱わない．
+    # 値の決まった変数に対する仮定は取り除き，
+    # 矛盾する場合は充足不能とする．
+    # 充足不能の場合，統計情報の vars_after などは元の値のままとなる．
+    def run(self, var_num, clause_store, assumption_list = []) :
+        stats = {'vars_before': var_num,
+                 'clauses_before': len(clause_store),
+                 'tautologies': 0,
+                 'units': 0,
+                 'satisfied': 0,
+                 'duplicates': 0,
+                 'subsumed': 0,
+                 'vars_after': var_num,
+                 'clauses_after': len(clause_store),
+                 'removed_vars': 0,
+                 'removed_clauses': 0}
+        self._stats = stats
+        self._orig_var_num = var_num
+        self._var_num = 0
+        self._clause_store = ClauseStore()
+        self._assumption_list = []
+        self._old_varid = array('i', [0])
+
+        clause_list = self._read_clauses(clause_store, stats)
+        fixed = self._propagate(var_num, clause_list, stats)
+        self._fixed = fixed
+        if fixed is None :
+            return False
+
+        clause_list = self._simplify(fixed, clause_list, stats)
+        if self._subsumption :
+            clause_list = self._remove_subsumed(clause_list, stats)
+
+        # 仮定のうち値の決まっていないものだけを残す．
+        assumptions = []
+        for lit in assumption_list :
+            val = fixed[abs(lit)]
+            if val == 0 :
+                assumptions.append(lit)
+            elif (val > 0) != (lit > 0) :
+                return False
+
+        self._renumber(var_num, clause_list, assumptions)
+
+        stats['vars_after'] = self._var_num
+        stats['clauses_after'] = len(self._clause_store)
+        stats['removed_vars'] = var_num - self._var_num
+        stats['removed_clauses'] = stats['clauses_before'] - stats['clauses_after']
+        return True
+
+
+    ## @brief 簡単化後の変数の数を返す．
+    @property
+    def var_num(self) :
+        return self._var_num
+
+
+    ## @brief 簡単化後の節の集合(ClauseStore)を返す．
+    @property
+    def clause_store(self) :
+        return self._clause_store
+
+
+    ## @brief 簡単化後の仮定する割り当てリストを返す．
+    @property
+    def assumption_list(self) :
+        return self._assumption_list
+
+
+    ## @brief 統計情報を辞書の形で返す．
+    #
+    # 主な項目は以下の通り
+    # - removed_vars: 取り除いた変数の数
+    # - removed_clauses: 取り除いた節の数
+    # - units: 値の決まった変数の数
+    # - tautologies, satisfied, duplicates, subsumed: 理由ごとの削除した節の数
+    def stats(self) :
+        return dict(self._stats)
+
+
+    ## @brief 簡単化後の CNF 式のモデルを元の変数番号のモデルに変換する．
+    # @param[in] model 簡単化後の CNF 式のモデル(SatModel)
+    # @return 元の変数に対するモデル(SatModel)を返す．
+    #
+    # 節に現れなくなった変数は偽とする．
+    def map_model(self, model) :
+        src = SatModel.from_model(model).raw
+        vals = array('b', self._fixed)
+        old_varid = self._old_varid
+        for varid in range(1, self._var_num + 1) :
+            vals[old_varid[varid]] = src[varid]
+        for varid in range(1, self._orig_var_num + 1) :
+            if vals[varid] == 0 :
+                vals[varid] = -1
+        return SatModel(vals)
+
+
+    ## @brief 節を読み込んで恒真な節と重複したリテラルを取り除く．
+    # @return 節(リテラルのタプル)のリストを返す．
+    def _read_clauses(self, clause_store, stats) :
+        clause_list = []
+        for lit_list in clause_store :
+            lit_set = set(lit_list)
+            if any(-lit in lit_set for lit in lit_set) :
+                stats['tautologies'] += 1
+                continue
+            clause_list.append(tuple(sorted(lit_set, key = abs)))
+        return clause_list
+
+
+    ## @brief 単一リテラル節を伝搬させる．
+    # @return 変数の値の配列を返す．矛盾が生じた場合は None を返す．
+    #
+    # 節ごとに値の決まっていないリテラル数を数えておき，
+    # それが1になったら残りのリテラルを新たに値の決まったリテラルとする．
+    def _propagate(self, var_num, clause_list, stats) :
+        fixed = array('b', bytes(var_num + 1))
+        # occ_list[lit] は lit を含む節の番号のリスト(負のリテラルは後ろから数える)
+        occ_list = [[] for i in range(var_num * 2 + 1)]
+        free_num = array('i', [len(clause) for clause in clause_list])
+        unit_list = []
+        for cid, clause in enumerate(clause_list) :
+            for lit in clause :
+                occ_list[lit].append(cid)
+            if len(clause) == 1 :
+                unit_list.append(clause[0])
+            elif len(clause) == 0 :
+                return None
+
+        satisfied = bytearray(len(clause_list))
+        while unit_list :
+            lit = unit_list.pop()
+            varid = abs(lit)
+            val = 1 if lit > 0 else -1
+            if fixed[varid] != 0 :
+                if fixed[varid] != val :
+                    return None
+                continue
+            fixed[varid] = val
+            stats['units'] += 1
+            for cid in occ_list[lit] :
+                satisfied[cid] = 1
+            for cid in occ_list[-lit] :
+                if satisfied[cid] :
+                    continue
+                free_num[cid] -= 1
+                n = free_num[cid]
+                if n == 0 :
+                    return None
+                if n == 1 :
+                    for lit1 in clause_list[cid] :
+                        if fixed[abs(lit1)] == 0 :
+                            unit_list.append(lit1)
+                            break
+        return fixed
+
+
+    ## @brief 値の決まった変数を用いて節を簡単化し，重複した節を取り除く．
+    def _simplify(self, fixed, clause_list, stats) :
+        new_list = []
+        clause_set = set()
+        for clause in clause_list :
+            new_clause = []
+            sat = False
+            for lit in clause :
+                val = fixed[abs(lit)]
+                if val == 0 :
+                    new_clause.append(lit)
+                elif (val > 0) == (lit > 0) :
+                    sat = True
+                    break
+            if sat :
+                stats['satisfied'] += 1
+                continue
+            # 単一リテラル節は伝搬済みなので満たされているはず
+            assert len(new_clause) > 1
+            new_clause = tuple(new_clause)
+            if new_clause in clause_set :
+                stats['duplicates'] += 1
+                continue
+            clause_set.add(new_clause)
+            new_list.append(new_clause)
+        return new_list
+
+
+    ## @brief 他の節に包含されている節を取り除く．
+    #
+    # 短い節から順に，その節のリテラルの中で出現数の最も少ないものを
+    # 含む節だけを調べる．
+    def _remove_subsumed(self, clause_list, stats) :
+        occ_map = {}
+        for cid, clause in enumerate(clause_list) :
+            for lit in clause :
+                if lit in occ_map :
+                    occ_map[lit].append(cid)
+                else :
+                    occ_map[lit] = [cid]
+
+        removed = bytearray(len(clause_list))
+        set_list = [None] * len(clause_list)
+        order = sorted(range(len(clause_list)), key = lambda cid : len(clause_list[cid]))
+        for cid in order :
+            if removed[cid] :
+                continue
+            clause = clause_list[cid]
+            clause_len = len(clause)
+            best = min(clause, key = lambda lit : len(occ_map[lit]))
+            clause_set = None
+            for cid1 in occ_map[best] :
+                if cid1 == cid or removed[cid1] :
+                    continue
+                clause1 = clause_list[cid1]
+                if len(clause1) <= clause_len :
+                    # 同じ長さの節は重複を取り除いてあるので包含されない．
+                    continue
+                set1 = set_list[cid1]
+                if set1 is None :
+                    set1 = set(clause1)
+                    set_list[cid1] = set1
+                if set1.issuperset(clause) :
+                    removed[cid1] = 1
+                    stats['subsumed'] += 1
+        return [clause for cid, clause in enumerate(clause_list) if not removed[cid]]
+
+
+    ## @brief 節と仮定に現れる変数の番号を付け直して結果を作る．
+    def _renumber(self, var_num, clause_list, assumptions) :
+        new_varid = array('i', bytes(4 * (var_num + 1)))
+        old_varid = self._old_varid
+        for clause in clause_list :
+            for lit in clause :
+                varid = abs(lit)
+                if new_varid[varid] == 0 :
+                    new_varid[varid] = 1
+        for lit in assumptions :
+            new_varid[abs(lit)] = 1
+        n = 0
+        for varid in range(1, var_num + 1) :
+            if new_varid[varid] :
+                n += 1
+                new_varid[varid] = n
+                old_varid.append(varid)
+        self._var_num = n
+
+        store = self._clause_store
+        for clause in clause_list :
+            store.add([new_varid[lit] if lit > 0 else -new_varid[-lit] for lit in clause])
+        self._assumption_list = [new_varid[lit] if lit > 0 else -new_varid[-lit] for lit in assumptions]
@@ -8,27 +8,85 @@
 # All rights reserved.
 
 
-from enum import Enum
-import tempfile
-import os
-import subprocess
-
 from nl3d.sat.satbool3 import SatBool3
+from nl3d.sat.clausestore import ClauseStore
+from nl3d.sat.satbackend import SatBackend
+from nl3d.sat.satlimit import SatLimit
+from nl3d.sat.satpreprocessor import SatPreprocessor
+from nl3d.sat.dimacsbackend import DimacsBackend
+from nl3d.sat.cdclbackend import CdclBackend
+from nl3d.sat.ipasirbackend import IpasirBackend, find_ipasir_library
+
+try :
+    import numpy
+except ImportError :
+    # numpy がなくても動くようにしておく．
+    numpy = None
+
+
+## @brief バックエンドを作る．
+# @param[in] backend バックエンドの名前
+# @param[in] satprog SATソルバのプログラム名
+#
+# backend の値と作られるバックエンドの関係は以下の通り
+# - 'dimacs':    DimacsBackend(satprog)
+# - 'cdcl':      CdclBackend()
+# - 'ipasir':    IpasirBackend()
+# - 'inprocess': IPASIR ライブラリが見つかれば IpasirBackend()，
+#                なければ CdclBackend()
+def new_backend(backend, satprog = 'minisat_static') :
+    if backend == 'dimacs' :
+        return DimacsBackend(satprog)
+    elif backend == 'cdcl' :
+        return CdclBackend()
+    elif backend == 'ipasir' :
+        return IpasirBackend()
+    elif backend == 'inprocess' :
+        libpath = find_ipasir_library()
+        if libpath is not None :
+            return IpasirBackend(libpath)
+        else :
+            return CdclBackend()
+    else :
+        raise ValueError('{}: unknown SAT backend'.format(backend))
 
 
 ## @brief SAT ソルバを表すクラス
 #
-# このクラスは内部でSATソルバのプログラムを呼び出している．
-# 同じインターフェイスで内部で SAT を解くクラスを(主にC++で)
-# 実装しても良い．
+# このクラスは変数と節の管理のみを行い，実際に SAT 問題を解く処理は
+# バックエンド(SatBackend の継承クラス)に任せる．
+# デフォルトでは外部の SATソルバのプログラムを呼び出す DimacsBackend
+# を用いる．
+#
+# @code
+# solver1 = SatSolver('minisat_static')            # 外部プログラム
+# solver2 = SatSolver(backend = 'inprocess')       # プロセス内で解く．
+# solver3 = SatSolver(backend = CdclBackend(seed)) # バックエンドを直接指定する．
+# solver4 = SatSolver(preprocess = True)           # 簡単化してから解く．
+# @endcode
 class SatSolver :
 
     ## @brief 初期化
     # @param[in] satprog SATソルバのプログラム名
-    def __init__(self, satprog) :
+    # @param[in] backend バックエンド(名前か SatBackend のオブジェクト)
+    # @param[in] preprocess 解く前に CNF 式の簡単化を行う時 True にする．
+    #
+    # backend の名前については new_backend() を参照のこと．
+    # 簡単化については SatPreprocessor を参照のこと．
+    # 簡単化を行うと毎回簡単化後の CNF 式を解き直すことになるので
+    # インクリメンタルなバックエンドの利点は失われる．
+    def __init__(self, satprog = 'minisat_static', backend = 'dimacs', preprocess = False) :
         self._var_count = 0
-        self._clause_list = []
-        self._satprog = satprog
+        # 節は ClauseStore にまとめて格納する．
+        self._clause_store = ClauseStore()
+        if isinstance(backend, SatBackend) :
+            self._backend = backend
+        else :
+            self._backend = new_backend(backend, satprog)
+        if preprocess :
+            self._preprocessor = SatPreprocessor()
+        else :
+            self._preprocessor = None
         # デバッグフラグ
         self._debug = False
 
@@ -50,24 +108,62 @@ class SatSolver :
     # たとえば 3 なら 3番目の変数の肯定
     # -1 なら 1番目の変数の否定を表す．
     def add_clause(self, *args) :
-        if len(args) == 1 :
-            arg0 = args[0]
-            if isinstance(arg0, int) :
-                # singleton の場合
-                lit = arg0
-                if self._check_lit(lit) :
-                    self._clause_list.append([lit])
-            elif isinstance(arg0, list) :
-                # リストの場合
-                for lit in arg0 :
-                    if not self._check_lit(lit) :
-                        return
-                self._clause_list.append(arg0)
+        if len(args) == 1 and not isinstance(args[0], int) :
+            # リストの場合
+            lit_list = args[0]
         else :
-            for lit in args :
-                if not self._check_lit(lit) :
+            lit_list = args
+        for lit in lit_list :
+            if not self._check_lit(lit) :
+                return
+        self._clause_store.add(lit_list)
+
+
+    ## @brief 複数の節をまとめて追加する．
+    # @param[in] clauses 節のリテラルのリストのシーケンス
+    #
+    # add_clause() を繰り返し呼ぶのと同じ結果になるが，
+    # 呼び出しのオーバーヘッドがない分速い．
+    # clauses には numpy の2次元配列(1行が1つの節)も指定できる．
+    # その場合はリテラルのチェックも配列全体に対して一度に行い，
+    # 不正なリテラルがあれば1つも追加しない．
+    def add_clauses(self, clauses) :
+        if numpy is not None and isinstance(clauses, numpy.ndarray) :
+            if clauses.size > 0 :
+                abs_lits = numpy.abs(clauses)
+                if abs_lits.min() == 0 :
+                    print('Error in add_clauses(), 0 is not allowed as a literal value.')
+                    return
+                if abs_lits.max() > self._var_count :
+                    print('Error in add_clauses(), {} is out of range'.format(abs_lits.max()))
                     return
-            self._clause_list.append(args)
+            self._clause_store.add_clauses(clauses)
+            return
+
+        # 組み込み関数で範囲をまとめて調べ，不正な節のみ _check_lit() で報告する．
+        var_count = self._var_count
+        check_lit = self._check_lit
+        lit_list_list = []
+        for lit_list in clauses :
+            if lit_list and (0 in lit_list or max(lit_list) > var_count or min(lit_list) < -var_count) :
+                for lit in lit_list :
+                    if not check_lit(lit) :
+                        break
+                continue
+            lit_list_list.append(lit_list)
+        self._clause_store.add_clauses(lit_list_list)
+
+
+    ## @brief 節の数を返す．
+    @property
+    def clause_num(self) :
+        return len(self._clause_store)
+
+
+    ## @brief 変数の数を返す．
+    @property
+    def var_num(self) :
+        return self._var_count
 
 
     ## @brief SAT問題を解く．
@@ -75,80 +171,67 @@ class SatSolver :
     # @return (result, model) を返す．
     #
     # - result は SatBool3
-    # - model は結果の各変数に対する値を格納したリスト
+    # - model は結果の各変数に対する値を格納した SatModel
     #   変数番号が 1番の変数の値は model[1] に入っている．
     #   値は SatBool3
-    def solve(self, assumption_list = []) :
-
-        # デフォルトの返り値
-        result = SatBool3.B3X
-        model = []
-
-        # dimacs 形式のファイルを作る．
-        # fh は使わない．
-        (fh, dimacs_file) = tempfile.mkstemp()
-        fout = open(dimacs_file, 'w')
-        if not fout :
-            print('Error: could not create {} for DIMACS input.'.format(dimacs_file))
-            return
-
-        # ヘッダを書き出す．
-        var_num = self._var_count
-        clause_num = len(self._clause_list)
-        fout.write('p cnf {} {}\n'.format(var_num, clause_num))
-
-        # 節の内容を書き出す．
-        for lit_list in self._clause_list :
-            for lit in lit_list :
-                fout.write(' {}'.format(lit))
-            fout.write(' 0\n')
-
-        # assumption を単一リテラル節の形で書き出す．
-        for lit in assumption_list :
-            fout.write(' {} 0\n'.format(lit))
-        fout.close()
-
-        # SATソルバを起動する．
-        (fh, output_file) = tempfile.mkstemp()
-        command_line = [self._satprog, dimacs_file, output_file]
+    #   (まとめて調べる場合は model.raw の 1, -1, 0 を用いる)
+    #
+    # solve() のあとに new_variable() や add_clause() を呼んで
+    # もう一度 solve() を呼ぶことができる．
+    # assumption_list はその回の solve() の間だけ有効で，
+    # B3False は「assumption_list のもとで充足不能」を意味する．
+    #
+    # 打ち切り条件として以下のものを指定できる．
+    # - time_limit: 制限時間(秒)
+    # - mem_limit: メモリの上限(MB)
+    # - cancel: 中断要求を表す threading.Event
+    #   別のスレッドから cancel.set() を呼ぶと探索を中断する．
+    # いずれかの条件が成り立った場合は外部プログラムを終了させ，
+    # 一時ファイルを消してから (B3X, []) を返す．
+    def solve(self, assumption_list = [], time_limit = None, mem_limit = None, cancel = None) :
+        limit = SatLimit(time_limit, mem_limit, cancel)
+        self._backend.set_debug(self._debug)
+        prep = self._preprocessor
+        if prep is None :
+            return self._backend.solve(self._var_count, self._clause_store, assumption_list, limit)
+
+        if not prep.run(self._var_count, self._clause_store, assumption_list) :
+            # 簡単化の途中で充足不能とわかった．
+            return SatBool3.B3False, []
         if self._debug :
-            print('SAT program: {}'.format(self._satprog))
-            print('INPUT:       {}'.format(dimacs_file))
-            print('OUTPUT:      {}'.format(output_file))
-            dout = None
-            derr = None
-        else :
-            dout = subprocess.DEVNULL
-            derr = subprocess.DEVNULL
-        subprocess.run(command_line, stdout = dout, stderr = derr)
-        if not self._debug :
-            os.remove(dimacs_file)
-
-        # 結果のファイルを読み込む．
-        with open(output_file, 'r') as fin :
-            lines = fin.readlines()
-
-            # 1行目が結果
-            if lines[0] == 'SAT\n' :
-                assert len(lines) == 2
-                result = SatBool3.B3True
-                # 割り当て結果を model に反映させる．
-                val_list = lines[1].split()
-                model = [SatBool3.B3X for i in range(var_num + 1)]
-                for val_str in val_list :
-                    val = int(val_str)
-                    if val > 0 :
-                        model[val] = SatBool3.B3True
-                    elif val < 0 :
-                        model[-val] = SatBool3.B3False
-            elif lines[0] == 'UNSAT\n' :
-                result = SatBool3.B3False
-        if not self._debug :
-            os.remove(output_file)
-
+            stats = prep.stats()
+            print('preprocess: {} variables and {} clauses removed'.format(stats['removed_vars'], stats['removed_clauses']))
+        result, model = self._backend.solve(prep.var_num, prep.clause_store, prep.assumption_list, limit)
+        if result == SatBool3.B3True :
+            model = prep.map_model(model)
         return result, model
 
 
+    ## @brief インクリメンタルに解けるとき True を返す．
+    #
+    # True の場合，solve() のあとに節を追加して再び solve() を呼ぶと
+    # 前回までの探索で得られた学習節などが引き継がれる．
+    # False の場合も同じ使い方はできるが毎回最初から解き直すことになる．
+    @property
+    def is_incremental(self) :
+        return self._backend.is_incremental
+
+
+    ## @brief バックエンドを返す．
+    @property
+    def backend(self) :
+        return self._backend
+
+
+    ## @brief 簡単化を行うオブジェクト(SatPreprocessor)を返す．
+    #
+    # 簡単化を行わない場合は None を返す．
+    # 直前の solve() で取り除かれた節や変数の数は stats() で得られる．
+    @property
+    def preprocessor(self) :
+        return self._preprocessor
+
+
     ## @brief リテラルが適正な値かチェックする．
     def _check_lit(self, lit) :
         if lit > 0 :
@@ -11,6 +11,10 @@
 from enum import Enum
 
 ## @brief SAT ソルバのインターフェイスを定義したスケルトン
+#
+# SAT を解く処理だけを別の実装に置き換える場合には
+# このクラス全体を作り直す必要はなく，solve() に相当する部分を
+# SatBackend の継承クラスとして実装して SatSolver に渡せばよい．
 class SatSolver :
 
     # @brief 初期化
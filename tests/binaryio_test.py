@@ -0,0 +1,148 @@
+#! /usr/bin/env python3
+#
+# @file binaryio_test.py
+# @brief NlBinaryIO のテスト
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+#
+# 問題と解をバイナリ形式で書き出して読み込むと元に戻ることと，
+# ADC2016 フォーマットとの変換を確かめる．
+# 最後に同じ解をテキストとバイナリで読み込む時間を表示する．
+
+
+import contextlib
+import io
+import os
+import random
+import struct
+import tempfile
+import time
+import nl3d
+import nl3d.nlbinaryio
+import nl3d.nlsolution
+import nl3d.adc2016_reader
+from gen_problem import gen_problem
+
+
+## @brief print() の結果を文字列で返す．
+def to_text(obj) :
+    fout = io.StringIO()
+    obj.print(fout)
+    return fout.getvalue()
+
+
+## @brief 乱数で値を設定した解を作る．
+def random_solution(rng, width, height, depth) :
+    solution = nl3d.NlSolution()
+    solution.set_size(width, height, depth)
+    for z in range(0, depth) :
+        solution.set_layer(z, [rng.randrange(0, 100) for i in range(0, width * height)])
+    return solution
+
+
+## @brief numpy を使うかどうかを切り替える．
+def set_numpy(numpy) :
+    nl3d.nlbinaryio.numpy = numpy
+    nl3d.nlsolution.numpy = numpy
+    nl3d.adc2016_reader.numpy = numpy
+
+
+if __name__ == '__main__' :
+
+    rng = random.Random(0)
+    problem = gen_problem(12, 9, 3, 10, 3)
+    problem_text = to_text(problem)
+
+    numpy = nl3d.nlbinaryio.numpy
+    with tempfile.TemporaryDirectory() as dirname :
+        def path(name) :
+            return os.path.join(dirname, name)
+
+        for use_numpy in (True, False) :
+            if use_numpy and numpy is None :
+                continue
+            set_numpy(numpy if use_numpy else None)
+            bio = nl3d.NlBinaryIO()
+            solution = random_solution(rng, 12, 9, 3)
+            solution_text = to_text(solution)
+
+            # バイト列を経由する．
+            fout = io.BytesIO()
+            bio.write_problem(problem, fout)
+            assert to_text(bio.read_problem(fout.getvalue())) == problem_text
+            fout = io.BytesIO()
+            bio.write_solution(solution, fout)
+            assert bio.read_solution(fout.getvalue()).equals(solution)
+
+            # ファイルを経由する．
+            with open(path('solution.bin'), 'wb') as fout :
+                bio.write_solution(solution, fout)
+            solution1 = bio.read_solution_file(path('solution.bin'))
+            assert solution1.equals(solution)
+            # 読み込んだ解を書き換えてもファイルは変わらない．
+            solution1.set_val(0, 0, 0, 77)
+            assert solution1.val(0, 0, 0) == 77
+            assert bio.read_solution_file(path('solution.bin')).equals(solution)
+
+            # ADC2016 フォーマットとの変換
+            for name, text in (('problem', problem_text), ('solution', solution_text)) :
+                with open(path(name + '.txt'), 'wt') as fout :
+                    fout.write(text)
+                assert bio.adc2016_to_binary(path(name + '.txt'), path(name + '.bin'))
+                assert bio.binary_to_adc2016(path(name + '.bin'), path(name + '2.txt'))
+                with open(path(name + '2.txt'), 'rt') as fin :
+                    assert fin.read() == text
+
+            # 誤りのある内容は None となる．
+            with contextlib.redirect_stdout(io.StringIO()) as fout :
+                assert bio.read_problem(b'NL3D') is None
+                assert bio.read_solution(b'XXXX' + bytes(12)) is None
+                with open(path('problem.bin'), 'rb') as fin :
+                    data = fin.read()
+                assert bio.read_solution(data) is None
+                assert bio.read_problem(data[:-4]) is None
+                # 範囲外の座標を持つ線分
+                bad = bytearray(data)
+                struct.pack_into('<H', bad, 32 + 4, 12)
+                assert bio.read_problem(bad) is None
+                # z1 > z2 のビア
+                bad = bytearray(data)
+                via_pos = 32 + problem.net_num * 16
+                struct.pack_into('<HH', bad, via_pos + 4, 2, 1)
+                assert bio.read_problem(bad) is None
+                # 層番号が範囲外のビア
+                bad = bytearray(data)
+                struct.pack_into('<H', bad, via_pos + 6, 3)
+                assert bio.read_problem(bad) is None
+                # 1つの層にしかないビア
+                bad = bytearray(data)
+                struct.pack_into('<HH', bad, via_pos + 4, 1, 1)
+                assert bio.read_problem(bad) is None
+                # 範囲外の線分番号と重複した線分番号
+                for label in (0, problem.net_num + 1, 1) :
+                    bad = bytearray(data)
+                    struct.pack_into('<i', bad, 32 + 16, label)
+                    assert bio.read_problem(bad) is None
+            assert fout.getvalue().count('Error') == 11
+        set_numpy(numpy)
+
+        # 読み込み時間の比較
+        solution = random_solution(rng, 72, 72, 8)
+        with open(path('large.txt'), 'wt') as fout :
+            solution.print(fout)
+        bio = nl3d.NlBinaryIO()
+        bio.adc2016_to_binary(path('large.txt'), path('large.bin'))
+        reader = nl3d.ADC2016_Reader()
+        start = time.perf_counter()
+        for i in range(0, 10) :
+            assert reader.read_solution_file(path('large.txt')).equals(solution)
+        t_text = (time.perf_counter() - start) / 10
+        start = time.perf_counter()
+        for i in range(0, 10) :
+            assert bio.read_solution_file(path('large.bin')).equals(solution)
+        t_bin = (time.perf_counter() - start) / 10
+        print('72x72x8 solution: text {:.2f}ms, binary {:.3f}ms'.format(t_text * 1000, t_bin * 1000))
+
+    print('OK')
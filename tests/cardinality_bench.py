@@ -0,0 +1,55 @@
+#! /usr/bin/env python3
+#
+# @file cardinality_bench.py
+# @brief one-hot 制約の符号化方法を比較するベンチマーク
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+#
+# ビアの多い問題を gen_problem で生成し，NlCnfEncoder の card_encoding を
+# 変えて変数の数，節の数，解くのにかかった時間を比較する．
+#
+# USAGE: cardinality_bench.py ?<satprog>? ?<time_limit>?
+#
+# satprog を省略するか '-' とした場合はプロセス内の CDCL ソルバを用いる．
+
+
+import sys
+import time
+import nl3d
+from nl3d.sat import SatBool3, SatSolver
+from gen_problem import gen_problem
+
+
+if __name__ == '__main__' :
+
+    if len(sys.argv) > 1 and sys.argv[1] != '-' :
+        solver_args = {'satprog': sys.argv[1], 'backend': 'dimacs'}
+    else :
+        solver_args = {'backend': 'cdcl'}
+    time_limit = float(sys.argv[2]) if len(sys.argv) > 2 else 60.0
+
+    # (width, height, depth, net_num, via_num)
+    size_list = [(10, 10, 3, 20, 12),
+                 (12, 12, 4, 30, 24),
+                 (16, 16, 6, 40, 40)]
+    encoding_list = ['pairwise', 'sequential', 'commander', 'product', 'auto']
+
+    print('{:>10s} {:>5s} {:>5s} {:>11s} {:>8s} {:>9s} {:>8s} {:>6s}'.format('size', 'vias', 'fanin', 'encoding', 'vars', 'clauses', 'time[s]', 'result'))
+    for width, height, depth, net_num, via_num in size_list :
+        problem = gen_problem(width, height, depth, net_num, via_num)
+        graph = nl3d.NlGraph(problem)
+        # one-hot 制約の最大の要素数
+        fanin = max([len(graph.via_net_list(via_id)) for via_id in range(graph.via_num)] +
+                    [len(graph.net_via_list(net_id)) for net_id in range(graph.net_num)])
+        size = '{}x{}x{}'.format(width, height, depth)
+        for encoding in encoding_list :
+            solver = SatSolver(**solver_args)
+            enc = nl3d.NlCnfEncoder(graph, solver, encoding)
+            enc.make_base_constraint(False)
+            enc.make_ushape_constraint()
+            start = time.perf_counter()
+            result, model = solver.solve(time_limit = time_limit)
+            t = time.perf_counter() - start
+            print('{:>10s} {:5d} {:5d} {:>11s} {:8d} {:9d} {:8.2f} {:>6s}'.format(size, graph.via_num, fanin, encoding, solver.var_num, solver.clause_num, t, repr(result)))
@@ -0,0 +1,74 @@
+#! /usr/bin/env python3
+#
+# @file cardinality_test.py
+# @brief nl3d.sat.cardinality のテスト
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+#
+# 小さな要素数について全ての割り当てを仮定として与えて解き，
+# 充足可能性が個数の条件と一致することを確かめる．
+
+
+import itertools
+import random
+import nl3d
+from nl3d.sat import SatBool3, SatSolver
+from nl3d.sat import cardinality
+
+
+## @brief 全ての割り当てに対して制約を確かめる．
+# @param[in] n 要素数
+# @param[in] make 制約を作る関数
+# @param[in] check 真の個数から制約が満たされるかを返す関数
+def check_all(n, make, check) :
+    solver = SatSolver(backend = 'cdcl')
+    var_list = [solver.new_variable() for i in range(n)]
+    # 負のリテラルが混ざっていても動くことを確かめる．
+    lit_list = [var if i % 2 == 0 else -var for i, var in enumerate(var_list)]
+    make(solver, lit_list)
+    for vals in itertools.product((True, False), repeat = n) :
+        assumption_list = [lit if val else -lit for lit, val in zip(lit_list, vals)]
+        result, model = solver.solve(assumption_list)
+        expected = SatBool3.B3True if check(sum(vals)) else SatBool3.B3False
+        assert result == expected
+
+
+## @brief 要素数が大きい場合は真の個数が 0, 1, 2 個の割り当てを調べる．
+def check_random(rng, n, encoding) :
+    solver = SatSolver(backend = 'cdcl')
+    lit_list = [solver.new_variable() for i in range(n)]
+    cardinality.add_exactly_one(solver, lit_list, encoding)
+    for count in range(30) :
+        true_set = set(rng.sample(lit_list, count % 3))
+        assumption_list = [lit if lit in true_set else -lit for lit in lit_list]
+        result, model = solver.solve(assumption_list)
+        expected = SatBool3.B3True if len(true_set) == 1 else SatBool3.B3False
+        assert result == expected
+
+
+if __name__ == '__main__' :
+
+    for n in range(1, 9) :
+        for encoding in ('pairwise', 'sequential', 'commander', 'product', 'auto') :
+            check_all(n, lambda solver, lits : cardinality.add_at_most_one(solver, lits, encoding),
+                      lambda c : c <= 1)
+            check_all(n, lambda solver, lits : cardinality.add_exactly_one(solver, lits, encoding),
+                      lambda c : c == 1)
+        for k in range(0, n + 1) :
+            for encoding in ('pairwise', 'sequential', 'auto') :
+                check_all(n, lambda solver, lits : cardinality.add_at_most_k(solver, lits, k, encoding),
+                          lambda c : c <= k)
+                check_all(n, lambda solver, lits : cardinality.add_at_least_k(solver, lits, k, encoding),
+                          lambda c : c >= k)
+                check_all(n, lambda solver, lits : cardinality.add_exactly_k(solver, lits, k, encoding),
+                          lambda c : c == k)
+        print('n = {}: OK'.format(n))
+
+    rng = random.Random(0)
+    for n in (20, 70, 200) :
+        for encoding in ('pairwise', 'sequential', 'commander', 'product', 'auto') :
+            check_random(rng, n, encoding)
+        print('n = {}: OK'.format(n))
+    print('OK')
@@ -0,0 +1,63 @@
+#! /usr/bin/env python3
+#
+# @file cdclsolver_test.py
+# @brief CdclSolver のテスト
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+
+
+import itertools
+import random
+import nl3d
+from nl3d.sat import CdclSolver
+
+
+## @brief 総当りで充足可能性を調べる．
+def brute_force(var_num, clause_list, assumption_list) :
+    for vals in itertools.product([1, -1], repeat = var_num) :
+        def is_true(lit) :
+            return vals[abs(lit) - 1] == (1 if lit > 0 else -1)
+        if not all(is_true(lit) for lit in assumption_list) :
+            continue
+        if all(any(is_true(lit) for lit in lit_list) for lit_list in clause_list) :
+            return True
+    return False
+
+
+## @brief ランダムな節のリストを作る．
+def random_clauses(rng, var_num, clause_num, max_len) :
+    return [[rng.choice([-1, 1]) * rng.randint(1, var_num) \
+             for i in range(rng.randint(1, max_len))] \
+            for j in range(clause_num)]
+
+
+if __name__ == '__main__' :
+
+    rng = random.Random(0)
+    for count in range(1000) :
+        var_num = rng.randint(1, 10)
+        clause_list = random_clauses(rng, var_num, rng.randint(0, 50), 4)
+        assumption_list = [rng.choice([-1, 1]) * rng.randint(1, var_num) \
+                           for i in range(rng.randint(0, 3))]
+
+        solver = CdclSolver()
+        solver.reserve_var(var_num)
+        for lit_list in clause_list :
+            solver.add_clause(lit_list)
+        ans = solver.solve(assumption_list)
+
+        assert ans == brute_force(var_num, clause_list, assumption_list)
+        if ans :
+            # モデルがすべての節を充足しているか調べる．
+            model = solver.model()
+            for lit_list in clause_list + [[lit] for lit in assumption_list] :
+                assert any(model[abs(lit)] == (1 if lit > 0 else -1) for lit in lit_list)
+
+    # 変数がない場合は乱数を用いた変数選択を行わない．
+    for seed in range(0, 1000) :
+        solver = CdclSolver(seed = seed)
+        assert solver.solve([])
+
+    print('OK')
@@ -0,0 +1,63 @@
+#! /usr/bin/env python3
+#
+# @file clausefolder_test.py
+# @brief ClauseFolder のテスト
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+#
+# 値の決まったリテラルを含む節が簡単化されることを確かめ，
+# 問題の CNF 式の節の数の変化を表示する．
+
+
+import nl3d
+from nl3d.sat import SatSolver, ClauseFolder
+from gen_problem import gen_problem
+
+try :
+    import numpy
+except ImportError :
+    numpy = None
+
+
+if __name__ == '__main__' :
+
+    solver = SatSolver()
+    folder = ClauseFolder(solver)
+    x = folder.new_variable()
+    y = folder.new_variable()
+    z = folder.new_variable()
+    w = folder.new_variable()
+    folder.add_clause(-x)
+    folder.add_clause(x, y)
+    folder.add_clause(-x, z, w)
+    folder.add_clause([-y, z, w])
+    assert folder.value(x) == False
+    assert folder.value(-x) == True
+    assert folder.value(y) == True
+    assert folder.value(z) is None
+    folder.flush()
+    assert [list(lit_list) for lit_list in solver._clause_store] == [[-x], [y], [z, w]]
+    if numpy is not None :
+        folder.add_clauses(numpy.array([[z, w], [x, z], [-y, w], [y, -z]]))
+        folder.flush()
+        assert [list(lit_list) for lit_list in solver._clause_store][3:] == [[z, w], [z], [w]]
+    stats = folder.stats()
+    assert stats['clauses_in'] == stats['clauses_out'] + stats['satisfied']
+    assert stats['clauses_out'] == solver.clause_num
+
+    print('{:>10s} {:>9s} {:>9s} {:>9s} {:>8s}'.format('size', 'in', 'out', 'satisfied', 'removed'))
+    for width, height, depth, net_num, via_num in [(10, 10, 3, 20, 12), (40, 40, 8, 12, 6)] :
+        graph = nl3d.NlGraph(gen_problem(width, height, depth, net_num, via_num))
+        solver = SatSolver()
+        enc = nl3d.NlCnfEncoder(graph, solver, prune_domain = True)
+        enc.make_base_constraint(False)
+        enc.make_detour_constraint(3)
+        stats = enc.fold_stats()
+        assert stats['clauses_out'] == solver.clause_num
+        print('{:>10s} {:9d} {:9d} {:9d} {:8d}'.format('{}x{}x{}'.format(width, height, depth),
+                                                       stats['clauses_in'], stats['clauses_out'],
+                                                       stats['satisfied'], stats['removed_lits']))
+
+    print('OK')
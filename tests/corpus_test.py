@@ -0,0 +1,88 @@
+#! /usr/bin/env python3
+#
+# @file corpus_test.py
+# @brief NlCorpusReader のテスト
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+#
+# 問題と解をディレクトリ，連結したファイル，tar ファイル，zip ファイルに
+# 書き込んで，名前と内容が正しく取り出せることを確かめる．
+
+
+import contextlib
+import io
+import os
+import random
+import tarfile
+import tempfile
+import zipfile
+import nl3d
+from gen_problem import gen_problem
+
+
+## @brief print() の結果を文字列で返す．
+def to_text(obj) :
+    fout = io.StringIO()
+    obj.print(fout)
+    return fout.getvalue()
+
+
+if __name__ == '__main__' :
+
+    rng = random.Random(0)
+    problem_list = [gen_problem(8, 8, 2, 4, 1), gen_problem(10, 6, 3, 6, 2), gen_problem(5, 5, 1, 3, 0)]
+    text_list = [to_text(problem) for problem in problem_list]
+    solution = nl3d.NlSolution()
+    solution.set_size(6, 4, 2)
+    for z in range(0, 2) :
+        solution.set_layer(z, [rng.randrange(0, 10) for i in range(0, 6 * 4)])
+    bio = nl3d.NlBinaryIO()
+    reader = nl3d.NlCorpusReader()
+
+    with tempfile.TemporaryDirectory() as dirname :
+        def path(*name_list) :
+            return os.path.join(dirname, *name_list)
+
+        # ディレクトリ
+        # a.txt は問題を1つ，b.txt は2つ連結したもの，sub/c.bin はバイナリ形式
+        os.mkdir(path('dir'))
+        os.mkdir(path('dir', 'sub'))
+        with open(path('dir', 'a.txt'), 'wt') as fout :
+            fout.write(text_list[0])
+        with open(path('dir', 'b.txt'), 'wt') as fout :
+            fout.write(text_list[1] + '\n' + text_list[2])
+        with open(path('dir', 'sub', 'c.bin'), 'wb') as fout :
+            bio.write_problem(problem_list[2], fout)
+        result = [(name, to_text(problem)) for name, problem in reader.iter_problems(path('dir'))]
+        expected = [(path('dir', 'a.txt'), text_list[0]),
+                    (path('dir', 'b.txt'), text_list[1]),
+                    (path('dir', 'b.txt') + '#2', text_list[2]),
+                    (path('dir', 'sub', 'c.bin'), text_list[2])]
+        assert result == expected
+
+        # tar ファイルと zip ファイル
+        with tarfile.open(path('corpus.tar.gz'), 'w:gz') as tar :
+            tar.add(path('dir'), arcname = 'dir')
+        with zipfile.ZipFile(path('corpus.zip'), 'w') as zf :
+            for name in ('a.txt', 'b.txt', 'sub/c.bin') :
+                zf.write(path('dir', name), 'dir/' + name)
+        for archive in ('corpus.tar.gz', 'corpus.zip') :
+            result = [(name, to_text(problem)) for name, problem in reader.iter_problems(path(archive))]
+            assert sorted(result) == [(name.replace(path('dir'), path(archive) + '/dir'), text) \
+                                      for name, text in expected]
+
+        # ファイルオブジェクトと解
+        stream = io.StringIO(to_text(solution) * 3)
+        result = list(reader.iter_solutions(stream, 'stream'))
+        assert [name for name, s in result] == ['stream', 'stream#2', 'stream#3']
+        assert all(s.equals(solution) for name, s in result)
+
+        # 読み込みに失敗したものは None となる．
+        stream = io.StringIO(text_list[0] + 'SIZE 3X3X1\nLINE#1 (0,0,1) (2,2,1)\n')
+        with contextlib.redirect_stdout(io.StringIO()) :
+            result = list(reader.iter_problems(stream))
+        assert [problem is None for name, problem in result] == [False, True]
+
+    print('OK')
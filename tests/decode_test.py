@@ -0,0 +1,81 @@
+#! /usr/bin/env python3
+#
+# @file decode_test.py
+# @brief NlCnfEncoder.model_to_routes() のテスト
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+#
+# 枝の変数の値を直接与えた SatModel から経路，閉路，解が正しく求まることを
+# numpy を使う場合と使わない場合で確かめる．
+
+
+from array import array
+import nl3d
+import nl3d.nlcnfencoder
+from nl3d import NlProblem, NlPoint
+from nl3d.sat import SatSolver, SatModel
+
+
+## @brief 選んだ枝の変数だけが真となる SatModel を作る．
+# @param[in] graph 問題を表すグラフ
+# @param[in] enc NlCnfEncoder
+# @param[in] solver SATソルバ
+# @param[in] pair_list 枝の両端の座標の組のリスト
+def make_model(graph, enc, solver, pair_list) :
+    vals = array('b', [-1] * (solver.var_num + 1))
+    vals[0] = 0
+    for (x1, y1, z1), (x2, y2, z2) in pair_list :
+        id1 = graph.node_id(x1, y1, z1)
+        id2 = graph.node_id(x2, y2, z2)
+        for edge_id in range(0, graph.edge_num) :
+            if {graph.edge_node1_array[edge_id], graph.edge_node2_array[edge_id]} == {id1, id2} :
+                vals[enc._edge_var_list[edge_id]] = 1
+    return SatModel(vals)
+
+
+if __name__ == '__main__' :
+
+    # 線分1: (0, 0, 0) - (3, 0, 0) の直線
+    # 線分2: (0, 1, 0) - (3, 1, 1) でビア(2, 1)を通る
+    # (0, 2, 0) - (1, 3, 0) の4マスは閉路
+    problem = NlProblem()
+    problem.set_size(4, 4, 2)
+    problem.add_net(1, NlPoint(0, 0, 0), NlPoint(3, 0, 0))
+    problem.add_net(2, NlPoint(0, 1, 0), NlPoint(3, 1, 1))
+    problem.add_via(1, 2, 1, 0, 1)
+    graph = nl3d.NlGraph(problem)
+
+    pair_list = [((0, 0, 0), (1, 0, 0)), ((1, 0, 0), (2, 0, 0)), ((2, 0, 0), (3, 0, 0)),
+                 ((0, 1, 0), (1, 1, 0)), ((1, 1, 0), (2, 1, 0)), ((2, 1, 1), (3, 1, 1)),
+                 ((0, 2, 0), (1, 2, 0)), ((1, 2, 0), (1, 3, 0)), ((1, 3, 0), (0, 3, 0)),
+                 ((0, 3, 0), (0, 2, 0))]
+    route_list0 = [[(0, 0, 0), (1, 0, 0), (2, 0, 0), (3, 0, 0)],
+                   [(0, 1, 0), (1, 1, 0), (2, 1, 0), (2, 1, 1), (3, 1, 1)]]
+
+    numpy = nl3d.nlcnfencoder.numpy
+    for use_numpy in (True, False) :
+        if use_numpy and numpy is None :
+            continue
+        nl3d.nlcnfencoder.numpy = numpy if use_numpy else None
+        solver = SatSolver()
+        enc = nl3d.NlCnfEncoder(graph, solver)
+        model = make_model(graph, enc, solver, pair_list)
+
+        route_list, cycle_list = enc.model_to_routes(model)
+        assert [[graph.node_coord(node_id) for node_id in route] for route in route_list] == route_list0
+        assert len(cycle_list) == 1
+        assert sorted(graph.node_coord(node_id) for node_id in cycle_list[0]) == \
+            [(0, 2, 0), (0, 3, 0), (1, 2, 0), (1, 3, 0)]
+        assert len(enc.cycle_clauses(model)) == 1
+
+        solution = enc.model_to_solution(model)
+        for net_id, route in enumerate(route_list0) :
+            for x, y, z in route :
+                assert solution.val(x, y, z) == net_id + 1
+        assert sum(1 for x in range(0, 4) for y in range(0, 4) for z in range(0, 2) \
+                   if solution.val(x, y, z) != 0) == 9
+    nl3d.nlcnfencoder.numpy = numpy
+
+    print('OK')
@@ -0,0 +1,64 @@
+#! /usr/bin/env python3
+#
+# @file detour_bench.py
+# @brief 禁止する回り道の長さを変えて比較するベンチマーク
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+#
+# NlCnfEncoder.make_detour_constraint() の max_len を 0 から 4 まで変えて
+# 変数の数，節の数，CNF 式の生成時間，解くのにかかった時間を比較する．
+#
+# USAGE: detour_bench.py ?<satprog>? ?<time_limit>? ?<problem_file> ...?
+#
+# satprog を省略するか '-' とした場合はプロセス内の CDCL ソルバを用いる．
+# 問題ファイルを省略した場合は gen_problem で生成した問題を用いる．
+
+
+import sys
+import time
+import nl3d
+from nl3d.sat import SatBool3, SatSolver
+from gen_problem import gen_problem
+
+
+if __name__ == '__main__' :
+
+    if len(sys.argv) > 1 and sys.argv[1] != '-' :
+        solver_args = {'satprog': sys.argv[1], 'backend': 'dimacs'}
+    else :
+        solver_args = {'backend': 'cdcl'}
+    time_limit = float(sys.argv[2]) if len(sys.argv) > 2 else 60.0
+
+    # (名前, 問題) のリスト
+    problem_list = []
+    if len(sys.argv) > 3 :
+        reader = nl3d.ADC2016_Reader()
+        for filename in sys.argv[3:] :
+            with open(filename, 'rt') as fin :
+                problem_list.append((filename, reader.read_problem(fin)))
+    else :
+        # (width, height, depth, net_num, via_num)
+        size_list = [(8, 8, 2, 8, 2),
+                     (10, 10, 2, 12, 4),
+                     (10, 10, 3, 20, 12)]
+        for width, height, depth, net_num, via_num in size_list :
+            name = '{}x{}x{}'.format(width, height, depth)
+            problem_list.append((name, gen_problem(width, height, depth, net_num, via_num)))
+
+    print('{:>12s} {:>3s} {:>8s} {:>9s} {:>8s} {:>8s} {:>6s}'.format('problem', 'k', 'vars', 'clauses', 'enc[s]', 'sat[s]', 'result'))
+    for name, problem in problem_list :
+        graph = nl3d.NlGraph(problem)
+        for max_len in range(0, 5) :
+            solver = SatSolver(**solver_args)
+            start = time.perf_counter()
+            enc = nl3d.NlCnfEncoder(graph, solver)
+            enc.make_base_constraint(False)
+            enc.make_detour_constraint(max_len)
+            t_enc = time.perf_counter() - start
+
+            start = time.perf_counter()
+            result, model = solver.solve(time_limit = time_limit)
+            t_sat = time.perf_counter() - start
+            print('{:>12s} {:3d} {:8d} {:9d} {:8.3f} {:8.2f} {:>6s}'.format(name[-12:], max_len, solver.var_num, solver.clause_num, t_enc, t_sat, repr(result)))
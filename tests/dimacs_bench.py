@@ -0,0 +1,76 @@
+#! /usr/bin/env python3
+#
+# @file dimacs_bench.py
+# @brief write_dimacs() の速度を測るベンチマーク
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+#
+# gen_problem で生成した問題の CNF 式を
+# - 1リテラルずつ書き出す以前のやり方
+# - write_dimacs()
+# で書き出してそれぞれの時間を比較する．
+
+
+import os
+import sys
+import tempfile
+import time
+import nl3d
+from nl3d.sat import SatSolver
+from nl3d.sat.dimacs import write_dimacs
+from gen_problem import gen_problem
+
+
+## @brief 以前の SatSolver.solve() と同じやり方で書き出す．
+def write_dimacs_old(fout, var_num, clause_store) :
+    fout.write('p cnf {} {}\n'.format(var_num, len(clause_store)))
+    for lit_list in clause_store :
+        for lit in lit_list :
+            fout.write(' {}'.format(lit))
+        fout.write(' 0\n')
+
+
+## @brief 書き出しにかかる時間を測る．
+def measure(func, mode) :
+    (fh, filename) = tempfile.mkstemp()
+    with os.fdopen(fh, mode) as fout :
+        start = time.perf_counter()
+        func(fout)
+    t = time.perf_counter() - start
+    size = os.path.getsize(filename)
+    with open(filename, 'r') as fin :
+        tokens = fin.read().split()
+    os.remove(filename)
+    return t, size, tokens
+
+
+if __name__ == '__main__' :
+
+    # (width, height, depth, net_num, via_num)
+    size_list = [(20, 20, 2, 20, 4),
+                 (36, 36, 4, 40, 8),
+                 (72, 72, 8, 100, 20)]
+    if len(sys.argv) > 1 :
+        size_list = size_list[:int(sys.argv[1])]
+
+    print('{:>12s} {:>10s} {:>10s} {:>10s} {:>10s} {:>8s}'.format('size', 'clauses', 'literals', 'old[s]', 'new[s]', 'ratio'))
+    for width, height, depth, net_num, via_num in size_list :
+        problem = gen_problem(width, height, depth, net_num, via_num)
+        graph = nl3d.NlGraph(problem)
+        solver = SatSolver()
+        enc = nl3d.NlCnfEncoder(graph, solver)
+        enc.make_base_constraint(False)
+        enc.make_ushape_constraint()
+        enc.make_wshape_constraint()
+        enc.make_w2shape_constraint()
+
+        var_num = solver.var_num
+        store = solver._clause_store
+        t_old, size_old, tokens_old = measure(lambda fout : write_dimacs_old(fout, var_num, store), 'w')
+        t_new, size_new, tokens_new = measure(lambda fout : write_dimacs(fout, var_num, store), 'wb')
+        # 空白以外の内容は同じはず
+        assert tokens_old == tokens_new
+
+        print('{:>12s} {:10d} {:10d} {:10.3f} {:10.3f} {:7.1f}x'.format('{}x{}x{}'.format(width, height, depth), len(store), store.lit_num, t_old, t_new, t_old / t_new))
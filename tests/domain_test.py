@@ -0,0 +1,97 @@
+#! /usr/bin/env python3
+#
+# @file domain_test.py
+# @brief NlCnfEncoder の prune_domain のテスト
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+#
+# 小さな問題をランダムに作り，prune_domain が False の場合と True の場合で
+# 充足可能性が変わらないことを確かめる．
+# 充足可能な場合は解の終端のラベルも確かめる．
+# 最後に変数と節の数を表示する．
+
+
+import random
+import nl3d
+from nl3d import NlProblem, NlPoint
+from nl3d.sat import SatBool3, SatSolver
+from gen_problem import gen_problem
+
+
+## @brief 終端とビアをランダムに置いた問題を作る．
+#
+# 解があるとは限らない．
+def random_problem(rng) :
+    width = rng.randint(3, 6)
+    height = rng.randint(3, 6)
+    depth = rng.randint(1, 3)
+    cell_list = [(x, y, z) for x in range(width) for y in range(height) for z in range(depth)]
+    rng.shuffle(cell_list)
+    problem = NlProblem()
+    problem.set_size(width, height, depth)
+    for net_id in range(rng.randint(1, 4)) :
+        s = cell_list.pop()
+        e = cell_list.pop()
+        problem.add_net(net_id + 1, NlPoint(*s), NlPoint(*e))
+    if depth > 1 :
+        for via_id in range(rng.randint(0, 2)) :
+            x = rng.randrange(width)
+            y = rng.randrange(height)
+            if all((x, y, z) in cell_list for z in range(depth)) :
+                for z in range(depth) :
+                    cell_list.remove((x, y, z))
+                problem.add_via(via_id + 1, x, y, 0, depth - 1)
+    return problem
+
+
+## @brief CNF 式を作って解く．
+def solve(graph, no_slack, prune_domain) :
+    solver = SatSolver(backend = 'cdcl')
+    enc = nl3d.NlCnfEncoder(graph, solver, prune_domain = prune_domain)
+    enc.make_base_constraint(no_slack)
+    enc.make_detour_constraint(3)
+    result, model = solver.solve()
+    solution = None
+    if result == SatBool3.B3True :
+        solution = enc.model_to_solution(model)
+    return result, solution
+
+
+if __name__ == '__main__' :
+
+    rng = random.Random(0)
+    problem_list = [gen_problem(8, 8, 2, 8, 2), gen_problem(8, 8, 3, 6, 3)]
+    problem_list += [random_problem(rng) for i in range(20)]
+    for problem in problem_list :
+        graph = nl3d.NlGraph(problem)
+        for no_slack in (True, False) :
+            result_list = []
+            for prune_domain in (False, True) :
+                result, solution = solve(graph, no_slack, prune_domain)
+                result_list.append(result)
+                if solution is not None :
+                    for net_id, (label, s, e) in enumerate(problem.net_list()) :
+                        assert solution.val(s.x, s.y, s.z) == net_id + 1
+                        assert solution.val(e.x, e.y, e.z) == net_id + 1
+            assert result_list[0] == result_list[1]
+
+    # solve_nlink() でも prune_domain を切り替えられる．
+    graph = nl3d.NlGraph(problem_list[0])
+    status_list = [nl3d.solve_nlink(graph, backend = 'cdcl', prune_domain = prune_domain)[0] \
+                   for prune_domain in (False, True)]
+    assert status_list[0] == status_list[1]
+
+    # 終端の少ない問題では使われない層の変数がなくなる．
+    print('{:>10s} {:>6s} {:>8s} {:>9s}'.format('size', 'prune', 'vars', 'clauses'))
+    for width, height, depth, net_num, via_num in [(30, 30, 6, 8, 4), (40, 40, 8, 12, 6)] :
+        graph = nl3d.NlGraph(gen_problem(width, height, depth, net_num, via_num))
+        for prune_domain in (False, True) :
+            solver = SatSolver()
+            enc = nl3d.NlCnfEncoder(graph, solver, prune_domain = prune_domain)
+            enc.make_base_constraint(False)
+            enc.make_detour_constraint(3)
+            print('{:>10s} {:>6s} {:8d} {:9d}'.format('{}x{}x{}'.format(width, height, depth), str(prune_domain), solver.var_num, solver.clause_num))
+
+    print('OK')
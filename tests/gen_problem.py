@@ -0,0 +1,141 @@
+#! /usr/bin/env python3
+#
+# @file gen_problem.py
+# @brief ベンチマーク用の問題を生成するプログラム
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+#
+# 盤面上にランダムに経路を引いてから経路の両端を終端にするので，
+# 生成された問題には必ず解がある．
+# 全マスを使うとは限らない．
+
+
+import random
+import sys
+import nl3d
+
+
+## @brief (x, y) に隣接する座標のリストを返す．
+def _neighbors(width, height, x, y) :
+    ans = []
+    for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)) :
+        x1 = x + dx
+        y1 = y + dy
+        if 0 <= x1 < width and 0 <= y1 < height :
+            ans.append((x1, y1))
+    return ans
+
+
+## @brief (x, y, z) から自己回避のランダムウォークを行う．
+# @return 経路(座標のリスト)を返す．
+#
+# 経路上のマス目は used に記録する．
+# 経路が自分自身と接しないように進む．
+def _random_walk(rng, used, width, height, x, y, z, max_len) :
+    route = [(x, y)]
+    used[x][y][z] = True
+    for i in range(0, max_len) :
+        cand_list = []
+        for x1, y1 in _neighbors(width, height, x, y) :
+            if used[x1][y1][z] :
+                continue
+            n = 0
+            for pos in _neighbors(width, height, x1, y1) :
+                if pos in route :
+                    n += 1
+            if n == 1 :
+                cand_list.append((x1, y1))
+        if len(cand_list) == 0 :
+            break
+        x, y = rng.choice(cand_list)
+        used[x][y][z] = True
+        route.append((x, y))
+    return route
+
+
+## @brief 問題を生成する．
+# @param[in] width, height, depth 盤面のサイズ
+# @param[in] net_num 線分数(の上限)
+# @param[in] via_num ビア数(の上限)
+# @param[in] seed 乱数の種
+# @return NlProblem を返す．
+#
+# 空きがなくなると指定した数より少ない線分やビアしか作られない．
+def gen_problem(width, height, depth, net_num, via_num, seed = 0) :
+    rng = random.Random(seed)
+    max_len = width + height
+    used = [[[False for z in range(0, depth)] \
+             for y in range(0, height)] \
+            for x in range(0, width)]
+
+    net_list = []
+    via_list = []
+
+    # まずビアを使う線分を作る．
+    count = 0
+    while depth > 1 and len(via_list) < via_num and count < 1000 :
+        count += 1
+        z1 = rng.randrange(0, depth - 1)
+        z2 = rng.randrange(z1 + 1, depth)
+        x = rng.randrange(0, width)
+        y = rng.randrange(0, height)
+        if any(used[x][y][z] for z in range(z1, z2 + 1)) :
+            continue
+        for z in range(z1, z2 + 1) :
+            used[x][y][z] = True
+
+        # ビアの上下の層から経路を伸ばす．
+        end_list = []
+        for z in (z1, z2) :
+            cand_list = [(x1, y1) for x1, y1 in _neighbors(width, height, x, y) \
+                         if not used[x1][y1][z]]
+            if len(cand_list) == 0 :
+                break
+            x1, y1 = rng.choice(cand_list)
+            route = _random_walk(rng, used, width, height, x1, y1, z, rng.randint(0, max_len))
+            x2, y2 = route[-1]
+            end_list.append((x2, y2, z))
+        if len(end_list) != 2 :
+            continue
+        via_list.append((x, y, z1, z2))
+        net_list.append(end_list)
+
+    # 残りの線分を作る．
+    count = 0
+    while len(net_list) < net_num and count < 1000 :
+        count += 1
+        x = rng.randrange(0, width)
+        y = rng.randrange(0, height)
+        z = rng.randrange(0, depth)
+        if used[x][y][z] :
+            continue
+        route = _random_walk(rng, used, width, height, x, y, z, rng.randint(1, max_len))
+        if len(route) < 2 :
+            continue
+        (x1, y1) = route[0]
+        (x2, y2) = route[-1]
+        net_list.append([(x1, y1, z), (x2, y2, z)])
+
+    problem = nl3d.NlProblem()
+    problem.set_size(width, height, depth)
+    rng.shuffle(net_list)
+    for net_id, (start, end) in enumerate(net_list) :
+        problem.add_net(net_id + 1, nl3d.NlPoint(*start), nl3d.NlPoint(*end))
+    for via_id, (x, y, z1, z2) in enumerate(via_list) :
+        # ラベルは a, b, ..., z, aa, bb, ... とする．
+        label = 'abcdefghijklmnopqrstuvwxyz'[via_id % 26] * (via_id // 26 + 1)
+        problem.add_via(label, x, y, z1, z2)
+    return problem
+
+
+if __name__ == '__main__' :
+
+    if len(sys.argv) != 6 and len(sys.argv) != 7 :
+        print('USAGE: gen_problem <width> <height> <depth> <net_num> <via_num> ?<seed>?')
+        exit(0)
+
+    args = [int(arg) for arg in sys.argv[1:]]
+    problem = gen_problem(*args)
+    problem.print(sys.stdout)
@@ -0,0 +1,53 @@
+#! /usr/bin/env python3
+#
+# @file graph_bench.py
+# @brief NlGraph の構築と NlCnfEncoder の CNF 式生成の時間を測るベンチマーク
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+#
+# gen_problem で生成した問題について
+# - NlGraph の構築
+# - make_base_constraint()
+# - make_ushape_constraint(), make_wshape_constraint(), make_w2shape_constraint()
+# の時間を表示する．SAT ソルバは呼ばない．
+
+
+import sys
+import time
+import nl3d
+from nl3d.sat import SatSolver
+from gen_problem import gen_problem
+
+
+if __name__ == '__main__' :
+
+    # (width, height, depth, net_num, via_num)
+    size_list = [(36, 36, 4, 120, 40),
+                 (72, 72, 8, 300, 100)]
+    if len(sys.argv) > 1 :
+        size_list = size_list[:int(sys.argv[1])]
+
+    print('{:>10s} {:>8s} {:>8s} {:>8s} {:>8s}'.format('size', 'graph', 'base', 'shape', 'total'))
+    for width, height, depth, net_num, via_num in size_list :
+        problem = gen_problem(width, height, depth, net_num, via_num)
+
+        start = time.perf_counter()
+        graph = nl3d.NlGraph(problem)
+        t_graph = time.perf_counter() - start
+
+        solver = SatSolver()
+        enc = nl3d.NlCnfEncoder(graph, solver)
+        start = time.perf_counter()
+        enc.make_base_constraint(False)
+        t_base = time.perf_counter() - start
+
+        start = time.perf_counter()
+        enc.make_ushape_constraint()
+        enc.make_wshape_constraint()
+        enc.make_w2shape_constraint()
+        t_shape = time.perf_counter() - start
+
+        total = t_graph + t_base + t_shape
+        print('{:>10s} {:8.3f} {:8.3f} {:8.3f} {:8.3f}'.format('{}x{}x{}'.format(width, height, depth), t_graph, t_base, t_shape, total))
@@ -0,0 +1,39 @@
+#! /usr/bin/env python3
+#
+# @file graph_test.py
+# @brief NlGraph のテスト
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+#
+# 0 層目から始まらないビアについて，z1 から z2 までのすべての層の節点が
+# ビアとして登録されていることを確かめる．
+
+
+import nl3d
+from nl3d import NlProblem, NlPoint
+
+
+if __name__ == '__main__' :
+
+    problem = NlProblem()
+    problem.set_size(4, 3, 5)
+    problem.add_net(1, NlPoint(0, 0, 2), NlPoint(3, 2, 4))
+    problem.add_via('a', 1, 1, 2, 4)
+    graph = nl3d.NlGraph(problem)
+
+    assert [graph.node_coord(node.id) for node in graph.via_node_list(0)] == [(1, 1, 2), (1, 1, 3), (1, 1, 4)]
+    for z in range(0, 5) :
+        node_id = graph.node_id(1, 1, z)
+        expected = 0 if 2 <= z <= 4 else -1
+        assert graph.via_id_array[node_id] == expected
+        assert graph.block_array[node_id] == (1 if expected == 0 else 0)
+        assert graph.node(1, 1, z).is_via == (expected == 0)
+
+    # 両端の層に終端を持つ線分はこのビアを使うことができる．
+    assert graph.via_net_list(0) == [0]
+    assert graph.node_net_list(graph.node_id(1, 1, 2)) == [0]
+    assert graph.node_net_list(graph.node_id(1, 1, 3)) == []
+
+    print('OK')
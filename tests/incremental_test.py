@@ -0,0 +1,55 @@
+#! /usr/bin/env python3
+#
+# @file incremental_test.py
+# @brief SatSolver をインクリメンタルに使うテスト
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+
+
+import random
+import sys
+import nl3d
+from nl3d.sat import SatBool3, SatSolver, CdclSolver
+
+
+## @brief 別のソルバで最初から解いて結果を返す．
+def solve_from_scratch(var_num, clause_list, assumption_list) :
+    solver = CdclSolver()
+    solver.reserve_var(var_num)
+    for lit_list in clause_list :
+        solver.add_clause(lit_list)
+    return solver.solve(assumption_list)
+
+
+if __name__ == '__main__' :
+
+    # 引数でバックエンドを指定できる(省略時は 'inprocess')
+    backend = sys.argv[1] if len(sys.argv) > 1 else 'inprocess'
+
+    rng = random.Random(0)
+    for count in range(20) :
+        solver = SatSolver(backend = backend)
+        assert solver.is_incremental
+        clause_list = []
+        var_num = 0
+        # 変数と節を少しずつ追加しながら何度も解く．
+        for step in range(10) :
+            for i in range(10) :
+                solver.new_variable()
+                var_num += 1
+            for i in range(42) :
+                lit_list = [rng.choice([-1, 1]) * v for v in rng.sample(range(1, var_num + 1), 3)]
+                solver.add_clause(lit_list)
+                clause_list.append(lit_list)
+            assumption_list = [rng.choice([-1, 1]) * v for v in rng.sample(range(1, var_num + 1), 2)]
+            result, model = solver.solve(assumption_list)
+            expected = solve_from_scratch(var_num, clause_list, assumption_list)
+            assert result == (SatBool3.B3True if expected else SatBool3.B3False)
+            if result == SatBool3.B3True :
+                for lit_list in clause_list + [[lit] for lit in assumption_list] :
+                    assert any(model[abs(lit)] == (SatBool3.B3True if lit > 0 else SatBool3.B3False) \
+                               for lit in lit_list)
+
+    print('OK')
@@ -0,0 +1,82 @@
+#! /usr/bin/env python3
+#
+# @file label_bench.py
+# @brief ラベルの符号化方法を比較するベンチマーク
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+#
+# NlCnfEncoder の label_encoding を変えて
+# 変数の数，節の数，CNF 式の生成時間，解くのにかかった時間を比較する．
+# 解が得られた場合は終端のラベルと model_to_labels() の値も確かめる．
+#
+# USAGE: label_bench.py ?<satprog>? ?<time_limit>? ?<problem_file> ...?
+#
+# satprog を省略するか '-' とした場合はプロセス内の CDCL ソルバを用いる．
+# 問題ファイルを省略した場合は gen_problem で生成した問題を用いる．
+
+
+import sys
+import time
+import nl3d
+from nl3d.nlcnfencoder import LABEL_ENCODING_LIST
+from nl3d.sat import SatBool3, SatSolver
+from gen_problem import gen_problem
+
+
+## @brief 解が問題と model_to_labels() の結果に合っているか調べる．
+def check_solution(problem, graph, solution, label_list) :
+    for net_id, (label, s, e) in enumerate(problem.net_list()) :
+        assert solution.val(s.x, s.y, s.z) == net_id + 1
+        assert solution.val(e.x, e.y, e.z) == net_id + 1
+    for node_id in range(0, graph.node_num) :
+        x, y, z = graph.node_coord(node_id)
+        val = solution.val(x, y, z)
+        if val > 0 and graph.via_id_array[node_id] < 0 :
+            assert label_list[node_id] == val
+
+
+if __name__ == '__main__' :
+
+    if len(sys.argv) > 1 and sys.argv[1] != '-' :
+        solver_args = {'satprog': sys.argv[1], 'backend': 'dimacs'}
+    else :
+        solver_args = {'backend': 'cdcl'}
+    time_limit = float(sys.argv[2]) if len(sys.argv) > 2 else 60.0
+
+    # (名前, 問題) のリスト
+    problem_list = []
+    if len(sys.argv) > 3 :
+        reader = nl3d.ADC2016_Reader()
+        for filename in sys.argv[3:] :
+            with open(filename, 'rt') as fin :
+                problem_list.append((filename, reader.read_problem(fin)))
+    else :
+        # (width, height, depth, net_num, via_num)
+        # 線分の少ない問題と多い問題を混ぜておく．
+        size_list = [(8, 8, 2, 4, 1),
+                     (8, 8, 2, 8, 2),
+                     (10, 10, 2, 12, 4),
+                     (10, 10, 3, 20, 12)]
+        for width, height, depth, net_num, via_num in size_list :
+            name = '{}x{}x{}/{}'.format(width, height, depth, net_num)
+            problem_list.append((name, gen_problem(width, height, depth, net_num, via_num)))
+
+    print('{:>12s} {:>8s} {:>8s} {:>9s} {:>8s} {:>8s} {:>6s}'.format('problem', 'encoding', 'vars', 'clauses', 'enc[s]', 'sat[s]', 'result'))
+    for name, problem in problem_list :
+        graph = nl3d.NlGraph(problem)
+        for label_encoding in LABEL_ENCODING_LIST :
+            solver = SatSolver(**solver_args)
+            start = time.perf_counter()
+            enc = nl3d.NlCnfEncoder(graph, solver, prune_domain = True, label_encoding = label_encoding)
+            enc.make_base_constraint(False)
+            enc.make_detour_constraint(3)
+            t_enc = time.perf_counter() - start
+
+            start = time.perf_counter()
+            result, model = solver.solve(time_limit = time_limit)
+            t_sat = time.perf_counter() - start
+            if result == SatBool3.B3True :
+                check_solution(problem, graph, enc.model_to_solution(model), enc.model_to_labels(model))
+            print('{:>12s} {:>8s} {:8d} {:9d} {:8.3f} {:8.2f} {:>6s}'.format(name[-12:], label_encoding, solver.var_num, solver.clause_num, t_enc, t_sat, repr(result)))
@@ -0,0 +1,60 @@
+#! /usr/bin/env python3
+#
+# @file lazy_bench.py
+# @brief 回り道の制約を最初に作る場合と必要な分だけ追加する場合の比較
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+#
+# gen_problem で生成した問題を solve_nlink() の lazy = False/True で解き，
+# 解いた回数，節の数，追加した節の数，時間を比較する．
+#
+# USAGE: lazy_bench.py ?<backend>? ?<time_limit>?
+#
+# backend を省略した場合は 'inprocess' を用いる．
+
+
+import sys
+import time
+import nl3d
+from gen_problem import gen_problem
+
+
+if __name__ == '__main__' :
+
+    backend = sys.argv[1] if len(sys.argv) > 1 else 'inprocess'
+    time_limit = float(sys.argv[2]) if len(sys.argv) > 2 else 60.0
+
+    # (width, height, depth, net_num, via_num)
+    size_list = [(8, 8, 2, 8, 2),
+                 (10, 10, 2, 12, 4),
+                 (10, 10, 3, 20, 12)]
+
+    print('{:>10s} {:>5s} {:>4s} {:>5s} {:>8s} {:>8s} {:>6s} {:>6s} {:>7s} {:>7s} {:>10s}'.format('size', 'lazy', 'plan', 'iter', 'clauses', 'final', 'cycle', 'detour', 'enc[s]', 'sat[s]', 'result'))
+    for width, height, depth, net_num, via_num in size_list :
+        problem = gen_problem(width, height, depth, net_num, via_num)
+        graph = nl3d.NlGraph(problem)
+        size = '{}x{}x{}'.format(width, height, depth)
+        for lazy in (False, True) :
+            stats = {}
+            status, solution = nl3d.solve_nlink(graph, backend = backend, time_limit = time_limit,
+                                                lazy = lazy, stats = stats)
+            if status == 'OK' :
+                # 終端に正しいラベルがついているか調べる．
+                for net_id, (label, s, e) in enumerate(problem.net_list()) :
+                    assert solution.val(s.x, s.y, s.z) == net_id + 1
+                    assert solution.val(e.x, e.y, e.z) == net_id + 1
+            for plan in ('plan_A', 'plan_B') :
+                plan_stats = stats[plan]
+                if not plan_stats :
+                    continue
+                print('{:>10s} {:>5s} {:>4s} {:5d} {:8d} {:8d} {:6d} {:6d} {:7.3f} {:7.2f} {:>10s}'.format(size, str(lazy), plan[-1],
+                                                                                                         plan_stats['iterations'],
+                                                                                                         plan_stats['initial_clauses'],
+                                                                                                         plan_stats['final_clauses'],
+                                                                                                         plan_stats['cycle_clauses'],
+                                                                                                         plan_stats['detour_clauses'],
+                                                                                                         plan_stats['encode_time'],
+                                                                                                         plan_stats['solve_time'],
+                                                                                                         repr(plan_stats['result'])))
@@ -0,0 +1,51 @@
+#! /usr/bin/env python3
+#
+# @file nvvar_count.py
+# @brief ビアと線分の割り当て変数の数を数えるプログラム
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+#
+# gen_problem で生成した問題に対して
+# - 全ての組み合わせ(net_num * via_num)
+# - 層番号の条件を満たす組み合わせ
+# - さらに終端の層で空きマスを通ってつながる組み合わせ(実際に作られる変数)
+# の数と CNF 式全体の変数の数を表示する．
+
+
+import time
+import nl3d
+from nl3d.sat import SatSolver
+from gen_problem import gen_problem
+
+
+## @brief 層番号の条件だけを満たす組み合わせの数を数える．
+def count_layer_pairs(problem) :
+    n = 0
+    for via in problem.via_list() :
+        for label, s, e in problem.net_list() :
+            if s.z != e.z and via.z1 <= s.z <= via.z2 and via.z1 <= e.z <= via.z2 :
+                n += 1
+    return n
+
+
+if __name__ == '__main__' :
+
+    # (width, height, depth, net_num, via_num)
+    size_list = [(10, 10, 3, 20, 12),
+                 (16, 16, 6, 40, 40),
+                 (36, 36, 4, 120, 40),
+                 (72, 72, 8, 300, 100),
+                 (72, 72, 8, 800, 400)]
+
+    print('{:>10s} {:>5s} {:>5s} {:>8s} {:>8s} {:>8s} {:>10s} {:>10s} {:>8s}'.format('size', 'nets', 'vias', 'full', 'layer', 'reach', 'vars(old)', 'vars(new)', 'time[s]'))
+    for width, height, depth, net_num, via_num in size_list :
+        problem = gen_problem(width, height, depth, net_num, via_num)
+        start = time.perf_counter()
+        graph = nl3d.NlGraph(problem)
+        t = time.perf_counter() - start
+        solver = SatSolver()
+        enc = nl3d.NlCnfEncoder(graph, solver)
+        full = graph.net_num * graph.via_num
+        print('{:>10s} {:5d} {:5d} {:8d} {:8d} {:8d} {:10d} {:10d} {:8.2f}'.format('{}x{}x{}'.format(width, height, depth), graph.net_num, graph.via_num, full, count_layer_pairs(problem), enc.nv_var_num, solver.var_num - enc.nv_var_num + full, solver.var_num, t))
@@ -0,0 +1,105 @@
+#! /usr/bin/env python3
+#
+# @file reader_test.py
+# @brief ADC2016_Reader のテスト
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+#
+# 問題と解を出力したものを様々な形で読み込んで元に戻ることと，
+# 誤りのある解答ファイルが None となることを確かめる．
+
+
+import contextlib
+import io
+import os
+import random
+import tempfile
+import nl3d
+import nl3d.adc2016_reader
+import nl3d.nlsolution
+from gen_problem import gen_problem
+
+
+## @brief print() の結果を文字列で返す．
+def to_text(obj) :
+    fout = io.StringIO()
+    obj.print(fout)
+    return fout.getvalue()
+
+
+if __name__ == '__main__' :
+
+    problem = gen_problem(12, 9, 3, 10, 3)
+    problem_text = to_text(problem)
+    rng = random.Random(0)
+    solution = nl3d.NlSolution()
+    solution.set_size(12, 9, 3)
+    for z in range(0, 3) :
+        solution.set_layer(z, [rng.randrange(0, 11) for i in range(0, 12 * 9)])
+    solution_text = to_text(solution)
+
+    with tempfile.TemporaryDirectory() as dirname :
+        problem_file = os.path.join(dirname, 'problem.txt')
+        solution_file = os.path.join(dirname, 'solution.txt')
+        with open(problem_file, 'wt') as fout :
+            fout.write(problem_text)
+        with open(solution_file, 'wt', newline = '\r\n') as fout :
+            fout.write(solution_text)
+
+        numpy = nl3d.adc2016_reader.numpy
+        for use_numpy in (True, False) :
+            if use_numpy and numpy is None :
+                continue
+            nl3d.adc2016_reader.numpy = numpy if use_numpy else None
+            nl3d.nlsolution.numpy = numpy if use_numpy else None
+            reader = nl3d.ADC2016_Reader()
+
+            for src in (io.StringIO(problem_text), problem_text, problem_text.encode()) :
+                assert to_text(reader.read_problem(src)) == problem_text
+            assert to_text(reader.read_problem_file(problem_file)) == problem_text
+
+            for src in (io.StringIO(solution_text), solution_text, solution_text.encode()) :
+                assert to_text(reader.read_solution(src)) == solution_text
+            assert to_text(reader.read_solution_file(solution_file)) == solution_text
+
+            # 要素の数が合わない行がある．
+            # エラーメッセージは捨てる．
+            bad_text = solution_text.replace('\n', ',00\n', 5)
+            with contextlib.redirect_stdout(io.StringIO()) as fout :
+                assert reader.read_solution(bad_text) is None
+            assert fout.getvalue().startswith('Error at line 3: # of elements mismatch')
+
+            # int16 に収まらない値がある．
+            bad_text = solution_text.replace('LAYER 1\n', 'LAYER 1\n40000', 1)
+            with contextlib.redirect_stdout(io.StringIO()) as fout :
+                assert reader.read_solution(bad_text) is None
+            assert fout.getvalue().startswith('Error at line 3: value out of range')
+
+            # 空白だけの要素や符号だけの要素がある．
+            # 1行ずつ処理した場合と同じく int() の ValueError となる．
+            pos = solution_text.index('LAYER 1\n') + len('LAYER 1\n')
+            for bad_val in (' ', '', '+', '- 3') :
+                bad_text = solution_text[:pos] + bad_val + solution_text[pos + 2:]
+                try :
+                    reader.read_solution(bad_text)
+                    assert False
+                except ValueError :
+                    pass
+
+            # 1つの層にしかないビア
+            bad_text = problem_text + 'VIA#zz (0,0,1)\n'
+            with contextlib.redirect_stdout(io.StringIO()) as fout :
+                assert reader.read_problem(bad_text) is None
+            assert 'VIA#zz has only one layer' in fout.getvalue()
+
+            # 空のファイル
+            empty_file = os.path.join(dirname, 'empty.txt')
+            open(empty_file, 'wt').close()
+            with contextlib.redirect_stdout(io.StringIO()) as fout :
+                assert reader.read_solution_file(empty_file) is not None
+        nl3d.adc2016_reader.numpy = numpy
+        nl3d.nlsolution.numpy = numpy
+
+    print('OK')
@@ -0,0 +1,79 @@
+#! /usr/bin/env python3
+#
+# @file satmodel_test.py
+# @brief SatModel のテスト
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+#
+# numpy を使う場合と使わない場合で同じ結果になることを確かめ，
+# 大きな割り当てを解析する時間を表示する．
+
+
+import random
+import time
+import nl3d
+import nl3d.sat.satmodel
+from nl3d.sat import SatBool3, SatModel
+
+
+## @brief 割り当てを表す文字列を作る．
+def make_text(rng, var_num) :
+    lits = []
+    for varid in range(1, var_num + 1) :
+        r = rng.randrange(3)
+        if r == 1 :
+            lits.append(varid)
+        elif r == 2 :
+            lits.append(-varid)
+    rng.shuffle(lits)
+    return ' '.join(str(lit) for lit in lits) + ' 0\n', lits
+
+
+if __name__ == '__main__' :
+
+    rng = random.Random(0)
+    numpy = nl3d.sat.satmodel.numpy
+    for var_num in (1, 10, 1000, 1000000) :
+        text, lits = make_text(rng, var_num)
+        expected = [SatBool3.B3X] * (var_num + 1)
+        for lit in lits :
+            expected[abs(lit)] = SatBool3.B3True if lit > 0 else SatBool3.B3False
+
+        model_list = []
+        for use_numpy in (True, False) :
+            if use_numpy and numpy is None :
+                continue
+            nl3d.sat.satmodel.numpy = numpy if use_numpy else None
+            start = time.perf_counter()
+            model = SatModel.from_dimacs(text, var_num)
+            t = time.perf_counter() - start
+            print('var_num = {:8d}, numpy = {:5s}: {:.3f}s'.format(var_num, str(use_numpy), t))
+            assert len(model) == var_num + 1
+            assert list(model) == expected
+            model_list.append(model)
+        nl3d.sat.satmodel.numpy = numpy
+
+        # 誤りのある割り当ては numpy の有無によらず ValueError となる．
+        for bad_text in ('1 x 0\n', '1 2.5 0\n', '{} 0\n'.format(var_num + 1), '-{} 0\n'.format(var_num + 1)) :
+            for use_numpy in (True, False) :
+                if use_numpy and numpy is None :
+                    continue
+                nl3d.sat.satmodel.numpy = numpy if use_numpy else None
+                try :
+                    SatModel.from_dimacs(bad_text, var_num)
+                    assert False
+                except ValueError :
+                    pass
+            nl3d.sat.satmodel.numpy = numpy
+
+        # SatBool3 のリストからの変換
+        model = SatModel.from_model(expected)
+        assert model.raw == model_list[0].raw
+        for varid in range(1, var_num + 1) :
+            assert model[varid] == expected[varid]
+            assert model.value(varid) == expected[varid].value
+            assert model.is_true(varid) == (expected[varid] == SatBool3.B3True)
+
+    print('OK')
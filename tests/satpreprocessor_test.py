@@ -0,0 +1,66 @@
+#! /usr/bin/env python3
+#
+# @file satpreprocessor_test.py
+# @brief SatPreprocessor のテスト
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+#
+# 単一リテラル節や重複した節を多く含むランダムな CNF 式を
+# 簡単化してから解いた結果と，そのまま解いた結果を比較する．
+
+
+import random
+import nl3d
+from nl3d.sat import SatBool3, SatSolver, CdclSolver
+
+
+## @brief ランダムな節を作る．
+def random_clause(rng, var_num) :
+    n = rng.choice((1, 1, 2, 2, 3, 3, 3, 4))
+    return [rng.randint(1, var_num) * rng.choice((1, -1)) for i in range(n)]
+
+
+if __name__ == '__main__' :
+
+    rng = random.Random(0)
+    n_sat = 0
+    n_unsat = 0
+    removed = 0
+    for count in range(2000) :
+        var_num = rng.randint(1, 12)
+        clause_list = [random_clause(rng, var_num) for i in range(rng.randint(0, var_num * 3))]
+        # 重複した節を混ぜる．
+        clause_list += rng.sample(clause_list, len(clause_list) // 4)
+        assumption_list = [rng.randint(1, var_num) * rng.choice((1, -1)) for i in range(rng.randint(0, 2))]
+
+        solver = SatSolver(backend = 'cdcl', preprocess = True)
+        for i in range(var_num) :
+            solver.new_variable()
+        for lit_list in clause_list :
+            solver.add_clause(lit_list)
+        result, model = solver.solve(assumption_list)
+
+        ref = CdclSolver()
+        ref.reserve_var(var_num)
+        for lit_list in clause_list :
+            ref.add_clause(lit_list)
+        ans = ref.solve(assumption_list)
+
+        if ans :
+            n_sat += 1
+            assert result == SatBool3.B3True
+            assert len(model) == var_num + 1
+            for lit_list in clause_list + [[lit] for lit in assumption_list] :
+                assert any(model[abs(lit)] == (SatBool3.B3True if lit > 0 else SatBool3.B3False) \
+                           for lit in lit_list)
+            stats = solver.preprocessor.stats()
+            assert stats['clauses_before'] - stats['removed_clauses'] == stats['clauses_after']
+            removed += stats['removed_clauses']
+        else :
+            n_unsat += 1
+            assert result == SatBool3.B3False
+
+    print('SAT: {}, UNSAT: {}, removed clauses: {}'.format(n_sat, n_unsat, removed))
+    print('OK')
@@ -8,13 +8,17 @@
 # All rights reserved.
 
 
+import sys
 import nl3d
 from nl3d.sat import SatBool3, SatSolver
 
 
 if __name__ == '__main__' :
 
-    solver = SatSolver('minisat_static')
+    # 引数でバックエンドを指定できる(省略時は 'dimacs')
+    backend = sys.argv[1] if len(sys.argv) > 1 else 'dimacs'
+
+    solver = SatSolver('minisat_static', backend)
     solver._debug = True
 
     v1 = solver.new_variable()
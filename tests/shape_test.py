@@ -0,0 +1,85 @@
+#! /usr/bin/env python3
+#
+# @file shape_test.py
+# @brief 回り道を禁止する制約(U字，2x3，2x4)のテスト
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+#
+# numpy を使う場合と使わない場合で同じ節の集合が得られることを確かめ，
+# それぞれの生成時間を表示する．
+
+
+import time
+import nl3d
+import nl3d.nlcnfencoder
+import nl3d.sat.satsolver
+import nl3d.sat.clausestore
+import nl3d.sat.clausefolder
+from nl3d.sat import SatSolver
+from gen_problem import gen_problem
+
+
+## @brief numpy を使うかどうかを切り替える．
+def set_numpy(numpy) :
+    nl3d.nlcnfencoder.numpy = numpy
+    nl3d.sat.satsolver.numpy = numpy
+    nl3d.sat.clausestore.numpy = numpy
+    nl3d.sat.clausefolder.numpy = numpy
+
+
+if __name__ == '__main__' :
+
+    numpy = nl3d.nlcnfencoder.numpy
+    # (width, height, depth, net_num, via_num)
+    size_list = [(2, 2, 1, 1, 0),
+                 (3, 5, 1, 2, 0),
+                 (12, 9, 2, 10, 3),
+                 (36, 36, 4, 120, 40),
+                 (72, 72, 8, 300, 100)]
+    for width, height, depth, net_num, via_num in size_list :
+        problem = gen_problem(width, height, depth, net_num, via_num)
+        graph = nl3d.NlGraph(problem)
+        clause_set_list = []
+        for use_numpy in (True, False) :
+            if use_numpy and numpy is None :
+                continue
+            set_numpy(numpy if use_numpy else None)
+            solver = SatSolver()
+            enc = nl3d.NlCnfEncoder(graph, solver)
+            start = time.perf_counter()
+            enc.make_ushape_constraint()
+            enc.make_wshape_constraint()
+            enc.make_w2shape_constraint()
+            t = time.perf_counter() - start
+            print('{:>10s}, numpy = {:5s}: {:8d} clauses, {:.3f}s'.format('{}x{}x{}'.format(width, height, depth),
+                                                                       str(use_numpy), solver.clause_num, t))
+            clause_list = [tuple(sorted(lit_list)) for lit_list in solver._clause_store]
+            assert len(clause_list) == solver.clause_num
+            clause_set_list.append(sorted(clause_list))
+        set_numpy(numpy)
+        for clause_set in clause_set_list[1:] :
+            assert clause_set == clause_set_list[0]
+
+        # make_detour_constraint(3) は上の3つの制約と同じになる．
+        solver = SatSolver()
+        enc = nl3d.NlCnfEncoder(graph, solver)
+        enc.make_detour_constraint(3)
+        clause_list = [tuple(sorted(lit_list)) for lit_list in solver._clause_store]
+        assert sorted(clause_list) == clause_set_list[0]
+
+    # 不正なリテラルを含む節は追加されない．
+    solver = SatSolver()
+    for i in range(0, 3) :
+        solver.new_variable()
+    solver.add_clauses([[1, -2], [3, 4], [2, 3]])
+    assert solver.clause_num == 2
+    if numpy is not None :
+        solver.add_clauses(numpy.array([[1, 2], [-3, 1]]))
+        assert solver.clause_num == 4
+        solver.add_clauses(numpy.array([[1, 2], [-4, 1]]))
+        assert solver.clause_num == 4
+    assert [list(lit_list) for lit_list in solver._clause_store][:2] == [[1, -2], [2, 3]]
+
+    print('OK')
@@ -0,0 +1,55 @@
+#! /usr/bin/env python3
+#
+# @file slots_bench.py
+# @brief NlPoint, NlVia, NlNode, NlEdge のメモリ量とアクセス時間を測るベンチマーク
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+#
+# 各クラスのオブジェクトを N 個作った時の1個あたりのメモリ量と，
+# 全ノードの座標と枝をたどる時間を表示する．
+
+
+import time
+import tracemalloc
+import nl3d
+from gen_problem import gen_problem
+
+
+## @brief func() が確保したメモリ量(バイト)を返す．
+def measure_memory(func) :
+    tracemalloc.start()
+    obj = func()
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, obj
+
+
+if __name__ == '__main__' :
+
+    N = 100000
+    print('{:>10s} {:>10s}'.format('class', 'bytes/obj'))
+    size, obj = measure_memory(lambda : [nl3d.NlPoint(i, i, i) for i in range(N)])
+    print('{:>10s} {:10.1f}'.format('NlPoint', size / N))
+    size, obj = measure_memory(lambda : [nl3d.NlVia('a', i, i, 0, 1) for i in range(N)])
+    print('{:>10s} {:10.1f}'.format('NlVia', size / N))
+
+    problem = gen_problem(72, 72, 8, 300, 100)
+    graph = nl3d.NlGraph(problem)
+    size, obj = measure_memory(lambda : graph.node_list)
+    print('{:>10s} {:10.1f}'.format('NlNode', size / graph.node_num))
+    size, obj = measure_memory(lambda : graph.edge_list)
+    print('{:>10s} {:10.1f}'.format('NlEdge', size / graph.edge_num))
+
+    # 全ノードの座標と隣接ノードをたどる時間
+    start = time.perf_counter()
+    n = 0
+    for node in graph.node_list :
+        n += node.x + node.y + node.z
+        for edge in node.edge_list :
+            node1 = edge.alt_node(node)
+            if node1.is_block :
+                n += 1
+    t = time.perf_counter() - start
+    print('traverse: {:.3f}s'.format(t))
@@ -0,0 +1,98 @@
+#! /usr/bin/env python3
+#
+# @file solution_test.py
+# @brief NlSolution のテスト
+# @author Yusuke Matsunaga (松永 裕介)
+#
+# Copyright (C) 2017 Yusuke Matsunaga
+# All rights reserved.
+#
+# numpy を使う場合と使わない場合で値の設定と取得，出力と読み込みの
+# 結果が一致することを確かめる．
+
+
+import io
+from array import array
+import random
+import nl3d
+import nl3d.nlsolution
+from nl3d import NlSolution
+
+
+## @brief ADC2016 形式の文字列を作る．
+def to_text(solution) :
+    fout = io.StringIO()
+    solution.print(fout)
+    return fout.getvalue()
+
+
+if __name__ == '__main__' :
+
+    width, height, depth = 5, 4, 3
+    rng = random.Random(0)
+    val_list = [rng.randrange(0, 12) for i in range(0, width * height * depth)]
+
+    numpy = nl3d.nlsolution.numpy
+    text_list = []
+    for use_numpy in (True, False) :
+        if use_numpy and numpy is None :
+            continue
+        nl3d.nlsolution.numpy = numpy if use_numpy else None
+
+        # set_val() で設定したものと set_row() で設定したものは等しい．
+        solution1 = NlSolution()
+        solution1.set_size(width, height, depth)
+        for x in range(0, width) :
+            for y in range(0, height) :
+                for z in range(0, depth) :
+                    solution1.set_val(x, y, z, val_list[(x * height + y) * depth + z])
+        solution2 = NlSolution()
+        solution2.set_size(width, height, depth)
+        for y in range(0, height) :
+            for z in range(0, depth) :
+                solution2.set_row(y, z, [val_list[(x * height + y) * depth + z] for x in range(0, width)])
+        assert solution1.equals(solution2)
+        # 形や型の合わない配列は set_grid_array() で受け付けない．
+        solution4 = NlSolution()
+        if use_numpy :
+            bad_list = [numpy.zeros((width, height, depth + 1), dtype = numpy.int16),
+                        numpy.zeros((width, height, depth), dtype = numpy.int32)]
+        else :
+            bad_list = [array('h', bytes(2 * width * height * (depth + 1))),
+                        array('i', bytes(4 * width * height * depth))]
+        for bad_array in bad_list :
+            try :
+                solution4.set_grid_array(width, height, depth, bad_array)
+                accepted = True
+            except AssertionError :
+                accepted = False
+            assert not accepted
+
+        # == は従来通りオブジェクトの同一性で比較し，集合にも入れられる．
+        assert solution1 != solution2
+        assert len({solution1, solution2}) == 2
+        assert list(solution1.node_array()) == val_list
+        assert solution1.row(2, 1) == [val_list[(x * height + 2) * depth + 1] for x in range(0, width)]
+
+        solution2.set_val(0, 0, 0, 99)
+        assert not solution1.equals(solution2)
+        assert solution2.val(0, 0, 0) == 99
+
+        # 負の値は表を使わずに出力する．
+        solution2.set_val(1, 0, 0, -5)
+        assert to_text(solution2).splitlines()[2].startswith('99,-5,')
+
+        # 出力したものを読み込むと元に戻る．
+        text = to_text(solution1)
+        reader = nl3d.ADC2016_Reader()
+        solution3 = reader.read_solution(io.StringIO(text))
+        assert solution3.equals(solution1)
+        text_list.append(text)
+    nl3d.nlsolution.numpy = numpy
+
+    for text in text_list[1:] :
+        assert text == text_list[0]
+    assert text_list[0].splitlines()[:3] == ['SIZE 5X4X3', 'LAYER 1',
+                                             ','.join('{:02d}'.format(val_list[(x * height) * depth]) for x in range(0, width))]
+
+    print('OK')